@@ -5,148 +5,69 @@ Ilya Seletsky 2015
 TODO (known issues):
 -Preview plane size setting (Width and Height)
 -Handle when scene is closed while window open to reset things if possible
--Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
 -Save settings between runs.
 -Fix window not shrinking properly when switching between plane modes.
 -Figure out what else crashes
 
 Stretch goals:
--Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
--Interactive plane mode.  Move a plane around in real time
 -See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
--Auto compute preview plane size and position based on selected joints.
 -Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
 
+from __future__ import absolute_import
+
 import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import maya.utils
 import functools
 
-import mayaUtil
+#everything is imported through the package so there's only ever one copy of each module no matter how the tool was started,
+#with from imports since the tool class below takes the package's name in this module
+from CoplanarJointOrient import mayaUtil
+from CoplanarJointOrient import jointCoplanarizer
+from CoplanarJointOrient import jointPreview
+from CoplanarJointOrient import jointPreviewLocator
+from CoplanarJointOrient import previewPlane
+from CoplanarJointOrient import sessionTrace
+
+import CoplanarJointOrient.SceneBackend.SceneBackend
 
-import PlaneMode.AdvancedPlaneMode
-import PlaneMode.Automatic3PointPlaneMode
-import PlaneMode.AutomaticOrientedPlaneMode
-import PlaneMode.AxisAlignedPlaneMode
+import CoplanarJointOrient.PlaneMode.AdvancedPlaneMode
+import CoplanarJointOrient.PlaneMode.Automatic3PointPlaneMode
+import CoplanarJointOrient.PlaneMode.AutomaticOrientedPlaneMode
+import CoplanarJointOrient.PlaneMode.AxisAlignedPlaneMode
+import CoplanarJointOrient.PlaneMode.BestFitPlaneMode
+import CoplanarJointOrient.PlaneMode.InteractivePlaneMode
+import CoplanarJointOrient.PlaneMode.PiecewisePlaneMode
 
-import MayaUIValue.AxisValue
-import MayaUIValue.BoolValue
-import MayaUIValue.JointValue
-import MayaUIValue.NormalModeValue
+import CoplanarJointOrient.MayaUIValue.AxisValue
+import CoplanarJointOrient.MayaUIValue.BoolValue
+import CoplanarJointOrient.MayaUIValue.ChangeScheduler
+import CoplanarJointOrient.MayaUIValue.JointValue
+import CoplanarJointOrient.MayaUIValue.NormalModeValue
 
-import mayaMathUtil
+from CoplanarJointOrient import SceneBackend
+from CoplanarJointOrient import PlaneMode
+from CoplanarJointOrient import MayaUIValue
+
+from CoplanarJointOrient import mayaMathUtil
 
 SELECTION_MESSAGE = "Select 2 joints, one of which is a descendant of another in the parent heirarchy"
 WINDOW_WIDTH = 600
    
 maya_useNewAPI = True
-   
-"""
-Creates a plane in the maya scene for visualization
-"""
-def createDebugVisualizerPlane(plane, position = None, name = None):
-    if(plane is None):
-        return None
-
-    #TODO: for now this creates a plane that ends up affecting the scene history, so undo/redo actions end up recreating the plane
-    #figure out how to draw this plane without this happening
-    debugPlane = cmds.polyPlane(name = name if name else "debugPlane", width=100, height=100, axis=[plane.normal().x, plane.normal().y, plane.normal().z], constructionHistory=False)
-    cmds.toggle(debugPlane, state=True, template=True)  #make plane unselectable and undeletable so users can't accidentally delete it and break things
-
-    createPos = om.MVector()
-
-    if(position is None):
-        if(plane.normal().x != 0):
-            #automatically compute a position where we find x for if y and z were 0
-            createPos = om.MVector(-plane.distance() / plane.normal().x, 0, 0)
-        elif(plane.normal().y != 0):
-            #automatically compute a position where we find y for if x and z were 0
-            createPos = om.MVector(0, -plane.distance() / plane.normal().y, 0)
-        elif(plane.normal().z != 0):
-            #automatically compute a position where we find z for if x and y were 0
-            createPos = om.MVector(0, 0, -plane.distance() / plane.normal().z)
-        else:
-            print("Invalid plane normal, all components are 0")
-    else:
-        createPos = position  
-
-    cmds.xform(debugPlane, absolute=True, worldSpace=True, translation=[createPos.x, createPos.y, createPos.z])
-
-    return debugPlane
-
-"""
-Now that the UI did all the hard work of configuring the alignment plane, requiring like > 1000 lines of code, all the real work happens here in this one function
-(Well technically a few outside util methods are called as well...)
-"""
-def coplanarizeJoints(chainEnd, chainRoot, plane, forwardAxis = mayaMathUtil.Axis(axis=0), rotationAxis = mayaMathUtil.Axis(axis=2)):    
-    if(chainRoot is None or chainEnd is None or plane is None):
-        return
-
-    currJoint = chainEnd
-    lastJoint = None
-    
-    while currJoint:        
-        currChildren = mayaUtil.getObjectChildren(currJoint)
-        
-        #unparent all children so this joint can move safely without affecting children
-        if(currChildren is not None):
-            for child in currChildren:
-                cmds.parent(child, world=True)
-                
-        oldPos = mayaUtil.getJointWorldPosition(currJoint)
-        oldOrient = mayaUtil.getObjectWorldOrientation(currJoint)
-                
-        #cmds.makeIdentity(currJoint, apply=True, translate=True, rotate=True, scale=True, jointOrient=True)
-        
-        #project the joint to the plane
-        newPos = mayaMathUtil.closestPointOnPlane(plane=plane, point=oldPos)
-                        
-        cmds.xform(currJoint, absolute=True, worldSpace=True, translation=[newPos.x, newPos.y, newPos.z])
-                                
-        #now orient the joint
-        #don't orient if this is the last child in the chain and it has children of its own
-        if(lastJoint is not None or (lastJoint is None and currChildren is None)):
-            deleteAimTarget = False
-            aimTarget = lastJoint
-            
-            #if no lastJoint, this is the last child in the joint chain so project its previous aim direction to a point on the plane and aim it in that direction to keep it approximately the same
-            #there's probably a more mathematically correct way to do this but whatever...
-            if(lastJoint is None):
-                deleteAimTarget = True
-                aimLocation = mayaMathUtil.closestPointOnPlane(plane=plane, point=oldPos + mayaMathUtil.eulerToDirectionVector(oldOrient, forwardAxis) * 10)
-                aimTarget = cmds.spaceLocator()
-                cmds.xform(aimTarget, worldSpace=True, absolute=True, translation=[aimLocation.x, aimLocation.y, aimLocation.z])
-            
-            aimVector = mayaMathUtil.forwardVector(forwardAxis)
-            turnVector = mayaMathUtil.forwardVector(rotationAxis)
-    
-            #not sure how else to do this easily, the idea is taken from Comet Joint Orient
-            tempAimConstraint = cmds.aimConstraint(aimTarget, currJoint, weight=1, aimVector=[aimVector.x, aimVector.y, aimVector.z], upVector=[turnVector.x, turnVector.y, turnVector.z], worldUpVector=[plane.normal().x, plane.normal().y, plane.normal().z], worldUpType="vector")        
-            cmds.delete(tempAimConstraint)
-            
-            #delete the temporary locator we created if lastJoint was None
-            if(deleteAimTarget):
-                cmds.delete(aimTarget)
-        
-        cmds.joint(currJoint, edit=True, zeroScaleOrient=True)
-                
-        if(currChildren is not None):
-            for child in currChildren:
-                cmds.parent(child, currJoint)
-                cmds.makeIdentity(child, apply=True, jointOrient=False)
-        
-        if(currJoint == chainRoot):
-            return
-            
-        lastJoint = currJoint
-        currJoint = mayaUtil.getObjectParent(currJoint)
-
-    return
-
 
+#the solve and apply live in jointCoplanarizer so they can run without Maya, these are kept here for scripts that call them from this module
+coplanarizeJoints = jointCoplanarizer.coplanarizeJoints
+coplanarizeJointChains = jointCoplanarizer.coplanarizeJointChains
+ChainSpec = jointCoplanarizer.ChainSpec
+   
 class CoplanarJointOrient(object):
-    def __init__(self):
+    """
+    With showUI off there's no window and the values are only set from code, like when replaying a recorded session headless
+    """
+    def __init__(self, showUI=True):
         #for the UI
         self.joint1 = None
         self.joint2 = None
@@ -167,17 +88,39 @@ class CoplanarJointOrient(object):
         self.axisAlignedPlaneMode = PlaneMode.AxisAlignedPlaneMode.AxisAlignedPlaneMode(self)
         self.automatic3PointPlaneMode = PlaneMode.Automatic3PointPlaneMode.Automatic3PointPlaneMode(self)
         self.automaticOrientedPlaneMode = PlaneMode.AutomaticOrientedPlaneMode.AutomaticOrientedPlaneMode(self)
+        self.piecewisePlaneMode = PlaneMode.PiecewisePlaneMode.PiecewisePlaneMode(self)
+        self.bestFitPlaneMode = PlaneMode.BestFitPlaneMode.BestFitPlaneMode(self)
+        self.interactivePlaneMode = PlaneMode.InteractivePlaneMode.InteractivePlaneMode(self)
         
         self.currentPlaneMode = None
 
         self.previewPlaneSetting = None
         self.previewJointsSetting = None
 
+        #chains queued up to be applied together, as ChainSpec objects
+        self.batchSpecs = []
+
         #preview plane should be deleted on cancel or when the tick mark is turned off
-        self.previewPlane = None
-        self.previewJoints = None
+        self.previewPlane = previewPlane.PreviewPlane()
         
-        self.setupUI()
+        #solves the chain for the joint preview without touching it, redrawn whenever something the solve depends on changes
+        self.jointPreview = jointPreview.JointPreview()
+        self.jointPreviewDisplay = jointPreviewLocator.JointPreviewDisplay()
+        
+        #rereads the chain into the joint preview when its joints move, made the first time there's a chain to watch
+        self.jointPreviewWatcher = None
+        
+        self.mainWindow = None
+        
+        if(showUI):
+            self.setupUI()
+            
+            #with a window to keep responsive the joint preview is solved on a worker thread and drawn once Maya gets back to the main thread
+            self.jointPreview.startWorker(self.jointPreviewDisplay.show, maya.utils.executeDeferred)
+        else:
+            self.setupValues()
+            
+        self.connectValues()
         self.loadSettings()
                 
     def setupUI(self):
@@ -193,9 +136,6 @@ class CoplanarJointOrient(object):
 
         self.joint1 = MayaUIValue.JointValue.JointValue(label="Joint 1", parentUI=endJoints_layout)
         self.joint2 = MayaUIValue.JointValue.JointValue(label="Joint 2", parentUI=endJoints_layout)
-        
-        self.joint1.onChangeFunc = functools.partial(CoplanarJointOrient.onJointNameChanged, self)
-        self.joint2.onChangeFunc = functools.partial(CoplanarJointOrient.onJointNameChanged, self)
 
         cmds.formLayout(endJoints_layout, edit=True, attachForm=[ (endJoints_label, "left", 0),
                                                                     (endJoints_label, "top", 0),
@@ -219,14 +159,10 @@ class CoplanarJointOrient(object):
         
         self.aimAxis = MayaUIValue.AxisValue.AxisValue(label="Aim Axis", parentUI=options_layout)
         self.turnAxis = MayaUIValue.AxisValue.AxisValue(label="Turn Axis", parentUI=options_layout)
-        self.aimAxis.onChangeFunc = functools.partial(CoplanarJointOrient.onAimAxisChanged, self)
-        self.turnAxis.onChangeFunc = functools.partial(CoplanarJointOrient.onTurnAxisChanged, self)
         
         self.previewPlaneSetting = MayaUIValue.BoolValue.BoolValue(label="Preview Plane", parentUI=options_layout)
-        self.previewPlaneSetting.onChangeFunc = functools.partial(CoplanarJointOrient.onPreviewPlaneChanged, self)
         
-        #TODO: I currently am not displaying a preview of joints yet
-        #self.previewJointsSetting = MayaUIValue.BoolValue.BoolValue(label="Preview Joints", parentUI=options_layout)
+        self.previewJointsSetting = MayaUIValue.BoolValue.BoolValue(label="Preview Joints", parentUI=options_layout)
         
         cmds.formLayout(options_layout, edit=True, attachForm=[(options_separator, "left", 0),
                                                                     (options_separator, "top", 5),
@@ -244,8 +180,8 @@ class CoplanarJointOrient(object):
                                                                     (self.previewPlaneSetting.rootUI, "right", 20),
                                                                     (self.previewPlaneSetting.rootUI, "top", 30),
                                                                     
-                                                                    #(self.previewJointsSetting.rootUI, "right", 20),
-                                                                    #(self.previewJointsSetting.rootUI, "top", 50),
+                                                                    (self.previewJointsSetting.rootUI, "right", 20),
+                                                                    (self.previewJointsSetting.rootUI, "top", 50),
                                                                     ])
         
         #plane mode
@@ -262,6 +198,12 @@ class CoplanarJointOrient(object):
                                             command = functools.partial(CoplanarJointOrient.updatePlaneMode, self, self.axisAlignedPlaneMode))
         planeMode_advanced = cmds.button(label="Advanced", width = WINDOW_WIDTH * .4, height = 30, 
                                          command = functools.partial(CoplanarJointOrient.updatePlaneMode, self, self.advancedPlaneMode))
+        planeMode_piecewise = cmds.button(label="Piecewise for long chains", width = WINDOW_WIDTH * .4, height = 30, 
+                                          command = functools.partial(CoplanarJointOrient.updatePlaneMode, self, self.piecewisePlaneMode))
+        planeMode_bestFit = cmds.button(label="Best fit to all joints", width = WINDOW_WIDTH * .4, height = 30, 
+                                        command = functools.partial(CoplanarJointOrient.updatePlaneMode, self, self.bestFitPlaneMode))
+        planeMode_interactive = cmds.button(label="Interactive handle", width = WINDOW_WIDTH * .4, height = 30, 
+                                            command = functools.partial(CoplanarJointOrient.updatePlaneMode, self, self.interactivePlaneMode))
                 
         cmds.formLayout(planeMode_layout, edit=True, attachForm=[ (planeMode_separator, "left", 0),
                                                                     (planeMode_separator, "top", 5),
@@ -280,7 +222,16 @@ class CoplanarJointOrient(object):
                                                                     (planeMode_axisAligned, "top", 65),
                                                                     
                                                                     (planeMode_advanced, "right", WINDOW_WIDTH * .05),
-                                                                    (planeMode_advanced, "top", 65)
+                                                                    (planeMode_advanced, "top", 65),
+                                                                    
+                                                                    (planeMode_piecewise, "left", WINDOW_WIDTH * .05),
+                                                                    (planeMode_piecewise, "top", 100),
+                                                                    
+                                                                    (planeMode_bestFit, "right", WINDOW_WIDTH * .05),
+                                                                    (planeMode_bestFit, "top", 100),
+                                                                    
+                                                                    (planeMode_interactive, "left", WINDOW_WIDTH * .05),
+                                                                    (planeMode_interactive, "top", 135)
                                                                     ])
         
         #auto position plane options
@@ -299,6 +250,58 @@ class CoplanarJointOrient(object):
         advancedOpts_layout = cmds.formLayout(parent=mainColLayout, width=WINDOW_WIDTH, visible=False)
         self.advancedPlaneMode.setupUI(advancedOpts_layout)
         
+        #best fit plane options
+        bestFitOpts_layout = cmds.formLayout(parent=mainColLayout, width=WINDOW_WIDTH, visible=False)
+        self.bestFitPlaneMode.setupUI(bestFitOpts_layout)
+        
+        #piecewise plane options
+        piecewiseOpts_layout = cmds.formLayout(parent=mainColLayout, width=WINDOW_WIDTH, visible=False)
+        self.piecewisePlaneMode.setupUI(piecewiseOpts_layout)
+        
+        #interactive plane options
+        interactiveOpts_layout = cmds.formLayout(parent=mainColLayout, width=WINDOW_WIDTH, visible=False)
+        self.interactivePlaneMode.setupUI(interactiveOpts_layout)
+        
+        #batch of chains applied together
+        batch_layout = cmds.formLayout(parent=mainColLayout, width=WINDOW_WIDTH)
+        batch_separator = cmds.separator(style="in", height=3)
+        
+        batch_label = cmds.text(label="Batch (chains applied together in one step)")
+        
+        self.batchList = cmds.textScrollList(numberOfRows=5, allowMultiSelection=True, width=WINDOW_WIDTH * .65, height=90)
+        
+        batch_add = cmds.button(label="Add Current Chain", width = WINDOW_WIDTH * .25, 
+                                command = functools.partial(CoplanarJointOrient.addChainToBatch, self))
+        batch_remove = cmds.button(label="Remove Selected", width = WINDOW_WIDTH * .25, 
+                                   command = functools.partial(CoplanarJointOrient.removeSelectedFromBatch, self))
+        batch_clear = cmds.button(label="Clear", width = WINDOW_WIDTH * .25, 
+                                  command = functools.partial(CoplanarJointOrient.clearBatch, self))
+        self.applyBatchButton = cmds.button(label="Apply Batch", width = WINDOW_WIDTH * .25, enable=False,
+                                            command = functools.partial(CoplanarJointOrient.applyBatch, self))
+        
+        cmds.formLayout(batch_layout, edit=True, attachForm=[ (batch_separator, "left", 0),
+                                                                (batch_separator, "top", 5),
+                                                                (batch_separator, "right", 0),
+                                                               
+                                                                (batch_label, "left", 0),
+                                                                (batch_label, "top", 10),
+                                                                
+                                                                (self.batchList, "left", WINDOW_WIDTH * .05),
+                                                                (self.batchList, "top", 30),
+                                                                
+                                                                (batch_add, "right", WINDOW_WIDTH * .05),
+                                                                (batch_add, "top", 30),
+                                                                
+                                                                (batch_remove, "right", WINDOW_WIDTH * .05),
+                                                                (batch_remove, "top", 52),
+                                                                
+                                                                (batch_clear, "right", WINDOW_WIDTH * .05),
+                                                                (batch_clear, "top", 74),
+                                                                
+                                                                (self.applyBatchButton, "right", WINDOW_WIDTH * .05),
+                                                                (self.applyBatchButton, "top", 96)
+                                                                ])
+        
         #bottom buttons
         cmds.text(parent=mainColLayout, label="") #Hack label to add space  
         self.applyButton = cmds.button(parent=mainColLayout, width=WINDOW_WIDTH, label="Apply", height=60,
@@ -306,13 +309,43 @@ class CoplanarJointOrient(object):
 
         cmds.showWindow(self.mainWindow)
         
+    """
+    Same values setupUI makes but without any UI
+    """
+    def setupValues(self):
+        self.joint1 = MayaUIValue.JointValue.JointValue()
+        self.joint2 = MayaUIValue.JointValue.JointValue()
+        
+        self.aimAxis = MayaUIValue.AxisValue.AxisValue()
+        self.turnAxis = MayaUIValue.AxisValue.AxisValue()
+        
+        self.previewPlaneSetting = MayaUIValue.BoolValue.BoolValue()
+        self.previewJointsSetting = MayaUIValue.BoolValue.BoolValue()
+        
+        for planeMode in self.getPlaneModes():
+            planeMode.setupUI(None)
+            
+    def connectValues(self):
+        self.joint1.onChangeFunc = functools.partial(CoplanarJointOrient.onJointNameChanged, self)
+        self.joint2.onChangeFunc = functools.partial(CoplanarJointOrient.onJointNameChanged, self)
+        
+        self.aimAxis.onChangeFunc = functools.partial(CoplanarJointOrient.onAimAxisChanged, self)
+        self.turnAxis.onChangeFunc = functools.partial(CoplanarJointOrient.onTurnAxisChanged, self)
+        
+        self.previewPlaneSetting.onChangeFunc = functools.partial(CoplanarJointOrient.onPreviewPlaneChanged, self)
+        self.previewJointsSetting.onChangeFunc = functools.partial(CoplanarJointOrient.onPreviewJointsChanged, self)
+        
+    def getPlaneModes(self):
+        return [self.advancedPlaneMode, self.axisAlignedPlaneMode, self.automatic3PointPlaneMode, self.automaticOrientedPlaneMode, self.piecewisePlaneMode, self.bestFitPlaneMode, 
+                self.interactivePlaneMode]
+        
     def loadSettings(self):
         #For now just set things to default values
         self.aimAxis.setValue(mayaMathUtil.Axis(axis=0, negative=False))
         self.turnAxis.setValue(mayaMathUtil.Axis(axis=2, negative=False))
         
         self.previewPlaneSetting.setValue(True)
-        #self.previewJointsSetting.setValue(True)
+        self.previewJointsSetting.setValue(False)
         
         self.axisAlignedPlaneMode.normalAxis.setValue(mayaMathUtil.Axis())
         self.axisAlignedPlaneMode.worldOffset.setValue(om.MVector())
@@ -324,12 +357,23 @@ class CoplanarJointOrient(object):
         self.advancedPlaneMode.planeNormalPoint1.setValue(om.MVector())
         self.advancedPlaneMode.planeNormalPoint2.setValue(om.MVector())
         
+        self.piecewisePlaneMode.windowSize.setValue(8)
+        self.piecewisePlaneMode.windowOverlap.setValue(3)
+        self.piecewisePlaneMode.blendWindows.setValue(True)
+        
+        self.bestFitPlaneMode.keepEndJoints.setValue(True)
+        
+        self.interactivePlaneMode.planePosition.setValue(om.MVector())
+        self.interactivePlaneMode.planeNormalVector.setValue(om.MVector(om.MVector.kYaxisVector))
+        
         self.updatePlaneMode(self.automatic3PointPlaneMode, None)
         
     def onAimAxisChanged(self, value):
         #see if turn axis is same, and force it to change
         if(self.turnAxis.value.axis == value.axis):
             self.turnAxis.setValue(mayaMathUtil.Axis(axis = (0 if value.axis != 0 else 1), negative=self.turnAxis.value.negative))
+            
+        self.scheduleJointPreview()
     
     def onTurnAxisChanged(self, value):
         #see if aim axis is same, and force it to change
@@ -338,16 +382,20 @@ class CoplanarJointOrient(object):
         
         self.advancedPlaneMode.planeNormalVector.forwardDirectionAxis = value
         self.automaticOrientedPlaneMode.planeNormalVector.forwardDirectionAxis = value
+        
+        self.scheduleJointPreview()
     
     def onJointNameChanged(self, unusedChange):                
         if(self.joint1.value is None or self.joint2.value is None):
             self.chainRoot = None
             self.chainEnd = None
         else:    
-            if(mayaUtil.isDescendant(parent = self.joint1.value, child = self.joint2.value)):
+            backend = SceneBackend.SceneBackend.getSceneBackend()
+            
+            if(backend.isDescendant(parent = self.joint1.value, child = self.joint2.value)):
                 self.chainRoot = self.joint1.value
                 self.chainEnd = self.joint2.value
-            elif(mayaUtil.isDescendant(parent = self.joint2.value, child = self.joint1.value)):
+            elif(backend.isDescendant(parent = self.joint2.value, child = self.joint1.value)):
                 self.chainRoot = self.joint2.value
                 self.chainEnd = self.joint1.value
             else:
@@ -358,6 +406,16 @@ class CoplanarJointOrient(object):
         self.advancedPlaneMode.coplanarizerChainUpdated()
         self.automatic3PointPlaneMode.coplanarizerChainUpdated()
         self.automaticOrientedPlaneMode.coplanarizerChainUpdated()
+        self.piecewisePlaneMode.coplanarizerChainUpdated()
+        self.bestFitPlaneMode.coplanarizerChainUpdated()
+        self.interactivePlaneMode.coplanarizerChainUpdated()
+        
+        #the preview is sized to the chain even if the current plane didn't change
+        MayaUIValue.ChangeScheduler.getChangeScheduler().markDirty(self.updatePreviewPlane, self.updatePreviewPlane)
+        self.updateJointPreviewChain()
+        
+        if(self.mainWindow is None):
+            return
                 
         if(self.chainRoot is None or self.chainEnd is None):
             cmds.text(self.endJoints_instructions, edit=True, enableBackground=True)
@@ -368,59 +426,220 @@ class CoplanarJointOrient(object):
             
     def onPreviewPlaneChanged(self, value):
         self.updatePreviewPlane()
+        
+    def onPreviewJointsChanged(self, value):
+        self.updateJointPreviewChain()
             
+    @sessionTrace.recordedAction
     def updatePlaneMode(self, planeMode, unused):        
         if(self.currentPlaneMode == planeMode):
             return
         
         #hide advanced options UI
-        if(self.currentPlaneMode is not None and self.currentPlaneMode.advancedSettingsUI is not None):
-            cmds.layout(self.currentPlaneMode.advancedSettingsUI, edit=True, visible=False)
+        if(self.currentPlaneMode is not None):
+            self.currentPlaneMode.deactivate()
+            
+            if(self.currentPlaneMode.advancedSettingsUI is not None):
+                cmds.layout(self.currentPlaneMode.advancedSettingsUI, edit=True, visible=False)
         
         self.currentPlaneMode = planeMode
+        self.currentPlaneMode.activate()
         
         #show advanced options UI
         if(self.currentPlaneMode.advancedSettingsUI is not None):
             cmds.layout(self.currentPlaneMode.advancedSettingsUI, edit=True, visible=True)
             
         self.updatePreviewPlane()
+        self.scheduleJointPreview()
             
     def planeUpdated(self, planeMode):        
         if(planeMode == self.currentPlaneMode):
-            self.updatePreviewPlane()
+            #once for everything that changed together, not once per value
+            MayaUIValue.ChangeScheduler.getChangeScheduler().markDirty(self.updatePreviewPlane, self.updatePreviewPlane)
+            self.scheduleJointPreview()
             
+    @MayaUIValue.ChangeScheduler.flushesChanges
+    @sessionTrace.recordedAction
     def apply(self, unused):        
         #This is where the magic happens.  FINALLY!!!!
         if(self.chainEnd is not None and self.chainRoot is not None):
-            coplanarizeJoints(chainEnd=self.chainEnd, chainRoot=self.chainRoot, plane=self.currentPlaneMode.alignmentPlane, forwardAxis=self.aimAxis.value, rotationAxis=self.turnAxis.value)
+            numWritten, numSkipped = coplanarizeJoints(chainEnd=self.chainEnd, chainRoot=self.chainRoot, plane=self.currentPlaneMode.alignmentPlane, forwardAxis=self.aimAxis.value, rotationAxis=self.turnAxis.value, 
+                                                       jointPlanes=self.currentPlaneMode.getJointPlanes())
+            om.MGlobal.displayInfo("Coplanarized " + str(numWritten) + " joints, skipped " + str(numSkipped) + " already on the plane")
+            
+            return (numWritten, numSkipped)
+        
+        return (0, 0)
     
-    def updatePreviewPlane(self):
-        self.deletePreviewPlane()
+    """
+    Queues the current chain with a snapshot of the current plane and axes so it can be applied later along with other chains
+    """
+    @MayaUIValue.ChangeScheduler.flushesChanges
+    @sessionTrace.recordedAction
+    def addChainToBatch(self, unused):
+        if(self.chainEnd is None or self.chainRoot is None or self.currentPlaneMode is None):
+            return
+        
+        currentPlane = self.currentPlaneMode.alignmentPlane
+        plane = om.MPlane()
+        plane.setPlane(currentPlane.normal(), currentPlane.distance())
+        
+        self.batchSpecs.append(ChainSpec(chainEnd=self.chainEnd, chainRoot=self.chainRoot, plane=plane, 
+                                         forwardAxis=mayaMathUtil.Axis(axis=self.aimAxis.value.axis, negative=self.aimAxis.value.negative), 
+                                         rotationAxis=mayaMathUtil.Axis(axis=self.turnAxis.value.axis, negative=self.turnAxis.value.negative),
+                                         jointPlanes=self.currentPlaneMode.getJointPlanes()))
+        
+        self.updateBatchList()
+        
+    def removeSelectedFromBatch(self, unused):
+        #list indices are 1 based
+        self.removeFromBatch([index - 1 for index in cmds.textScrollList(self.batchList, query=True, selectIndexedItem=True) or []])
+        
+    @sessionTrace.recordedAction
+    def removeFromBatch(self, indices):
+        for index in sorted(indices, reverse=True):
+            del self.batchSpecs[index]
+                
+        self.updateBatchList()
+        
+    @sessionTrace.recordedAction
+    def clearBatch(self, unused):
+        self.batchSpecs = []
+        self.updateBatchList()
+        
+    def updateBatchList(self):
+        if(self.mainWindow is None):
+            return
+        
+        cmds.textScrollList(self.batchList, edit=True, removeAll=True)
+        
+        for spec in self.batchSpecs:
+            cmds.textScrollList(self.batchList, edit=True, append="%s -> %s" % (spec.chainRoot.shortName(), spec.chainEnd.shortName()))
             
+        cmds.button(self.applyBatchButton, edit=True, enable=len(self.batchSpecs) > 0)
+        
+    @MayaUIValue.ChangeScheduler.flushesChanges
+    @sessionTrace.recordedAction
+    def applyBatch(self, unused):
+        results = coplanarizeJointChains(self.batchSpecs)
+        
+        numWritten = sum([result[0] for result in results])
+        numSkipped = sum([result[1] for result in results])
+        om.MGlobal.displayInfo("Coplanarized " + str(numWritten) + " joints in " + str(len(results)) + " chains, skipped " + str(numSkipped) + " already on the plane")
+        
+        return results
+    
+    def updatePreviewPlane(self):
         if(self.previewPlaneSetting.value and self.currentPlaneMode is not None):
-            self.previewPlane = createDebugVisualizerPlane(self.currentPlaneMode.alignmentPlane, self.currentPlaneMode.alignmentPlanePreviewLocation)
+            self.previewPlane.update(self.currentPlaneMode.alignmentPlane, self.currentPlaneMode.alignmentPlanePreviewLocation, self.getChainPositions())
         else:
-            self.previewPlane = None
+            self.previewPlane.hide()
+            
+    """
+    World positions of the joints in the chain in UI units, or None if there's no chain or it was broken up by reparenting
+    """
+    def getChainPositions(self):
+        if(self.chainRoot is None or self.chainEnd is None):
+            return None
+        
+        backend = SceneBackend.SceneBackend.getSceneBackend()
+        joints = backend.getWholeParentChain(self.chainRoot, self.chainEnd)
+        
+        if(joints is None):
+            return None
+        
+        return backend.getWorldPositions(joints)
     
+    """
+    Reads the chain into the joint preview and watches it for moves while the preview is on, then redraws it
+    """
+    def updateJointPreviewChain(self):
+        backend = SceneBackend.SceneBackend.getSceneBackend()
+        joints = None
+        
+        if(self.previewJointsSetting.value and self.chainRoot is not None and self.chainEnd is not None):
+            joints = backend.getWholeParentChain(self.chainRoot, self.chainEnd)
+            
+            if(joints is not None):
+                joints.reverse()
+            
+        if(self.jointPreviewWatcher is None):
+            self.jointPreviewWatcher = backend.watchTransforms(functools.partial(CoplanarJointOrient.onJointPreviewChainMoved, self))
+            
+        if(joints is None):
+            self.jointPreviewWatcher.clear()
+        else:
+            self.jointPreviewWatcher.watch(joints)
+            
+        self.jointPreview.setChain(joints, backend)
+        self.scheduleJointPreview()
+        
+    def onJointPreviewChainMoved(self, unusedChangedIndices):
+        self.jointPreview.setChain(self.jointPreview.getJoints(), SceneBackend.SceneBackend.getSceneBackend())
+        self.scheduleJointPreview()
+        
+    def scheduleJointPreview(self):
+        MayaUIValue.ChangeScheduler.getChangeScheduler().markDirty(self.updateJointPreview, self.updateJointPreview)
+        
+    def updateJointPreview(self):
+        if(not self.previewJointsSetting.value or not self.jointPreview.hasChain() or self.currentPlaneMode is None):
+            self.jointPreview.cancelRefresh()
+            self.jointPreviewDisplay.hide()
+            return
+        
+        planeNormal, planeDistance = jointCoplanarizer.getPlaneNormalAndDistance(self.currentPlaneMode.alignmentPlane)
+        
+        #planes are set up in UI units but the snapshot is in internal units
+        uiToInternal = SceneBackend.SceneBackend.getSceneBackend().uiToInternal()
+        jointPlanes = self.currentPlaneMode.getJointPlanes()
+        
+        if(jointPlanes is not None):
+            jointPlanes = (jointPlanes[0], [distance * uiToInternal for distance in jointPlanes[1]])
+            
+        if(self.jointPreview.worker is not None):
+            self.jointPreview.requestRefresh(planeNormal, planeDistance * uiToInternal, self.aimAxis.value, self.turnAxis.value, jointPlanes)
+        else:
+            self.jointPreviewDisplay.show(self.jointPreview.refresh(planeNormal, planeDistance * uiToInternal, self.aimAxis.value, self.turnAxis.value, jointPlanes))
+        
+    """
+    Sets the values from changes still waiting to go into them, like typed values or a moved plane handle
+    """
+    def flushChanges(self):
+        MayaUIValue.ChangeScheduler.getChangeScheduler().flush()
+        
     def cancel(self):
+        if(sessionTrace.getRecorder() is not None and sessionTrace.getRecorder().tool is self):
+            sessionTrace.stopRecording()
+            
+        MayaUIValue.ChangeScheduler.getChangeScheduler().clear()
         self.deletePreviewPlane()
+        self.jointPreview.stopWorker()
+        self.jointPreviewDisplay.delete()
+        
+        if(self.jointPreviewWatcher is not None):
+            self.jointPreviewWatcher.clear()
+        
+        for planeMode in self.getPlaneModes():
+            planeMode.release()
+            
+        mayaUtil.releaseSkeletonIndex()
             
     def deletePreviewPlane(self):
-        #delete current plane
-        if(self.previewPlane is not None):
-            try:
-                #It's possible a new scene was opened while this window is still open and the preview plane no longer exists
-                cmds.delete(self.previewPlane)
-            except:
-                pass
+        self.previewPlane.delete()
 
 
 ####### Main script #######
-def main():
+"""
+Opens the tool.  If recordPath is given everything done in it is recorded there as a session trace, see sessionTrace.
+"""
+def main(recordPath = None):
     #auto populate selected joints fields
     selection = cmds.ls(orderedSelection=True, type="joint")
     
     tool = CoplanarJointOrient()
+    
+    if(recordPath is not None):
+        sessionTrace.startRecording(tool, recordPath)
 
     #automatically populate selections
     if(len(selection) > 0):
@@ -0,0 +1,189 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import collections
+import functools
+import timeit
+
+import maya.cmds as cmds
+
+"""
+Holds back changes typed into the UI until the artist stops typing, so a value's change function runs once for a burst of keystrokes instead of once per keystroke.
+
+Values hand their UI changes to the scheduler with ValueBase.scheduleChange.  Anything else with an applyScheduledChange method can be scheduled the same way, like a plane handle moved in the viewport.  Once nothing has changed for QUIET_PERIOD seconds every value that changed has its change function called once,
+in the order they first changed.  That all happens in a batch, and anything the change functions mark dirty with markDirty, like the preview plane, runs once at the end of the batch.
+
+Setting values from code isn't held back, only changes that come from the UI.  Actions that read the values, like Apply, call flush first so they see what's in the UI.
+The quiet period needs a Qt timer.  Without Qt, pending changes go out the next time Maya is idle, which still collects everything from one UI event.
+"""
+
+#seconds without any changes before the pending ones go out
+QUIET_PERIOD = 0.25
+
+#scheduler the values use, made the first time it's needed
+_scheduler = None
+
+def getChangeScheduler():
+    global _scheduler
+    
+    if(_scheduler is None):
+        _scheduler = ChangeScheduler()
+        
+    return _scheduler
+
+"""
+Decorator for tool methods that read values, flushes changes that are still waiting before running
+"""
+def flushesChanges(func):
+    @functools.wraps(func)
+    def wrapper(*args):
+        getChangeScheduler().flush()
+        return func(*args)
+    
+    return wrapper
+
+"""
+Qt single shot timer that calls func, or None if Qt isn't around
+"""
+def createTimer(func):
+    #PySide6 from Maya 2025, PySide2 from Maya 2017 and PySide before that
+    try:
+        from PySide6 import QtCore
+    except ImportError:
+        try:
+            from PySide2 import QtCore
+        except ImportError:
+            try:
+                from PySide import QtCore
+            except ImportError:
+                return None
+
+    timer = QtCore.QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(func)
+    
+    return timer
+
+class ChangeScheduler(object):
+    def __init__(self, quietPeriod=QUIET_PERIOD):
+        self.quietPeriod = quietPeriod
+        
+        #values waiting to have their change function called, an ordered dict used as an ordered set
+        self.pendingValues = collections.OrderedDict()
+        
+        #key to function of everything marked dirty during the current batch
+        self.dirtyFuncs = collections.OrderedDict()
+        self.batchDepth = 0
+        
+        self.timer = None
+        self.flushScheduled = False
+        self.lastChangeTime = None
+        
+    """
+    Holds back a value's change until the UI goes quiet, restarting the wait.  value is anything with applyScheduledChange.
+    """
+    def scheduleChange(self, value):
+        self.pendingValues[value] = True
+        self.lastChangeTime = timeit.default_timer()
+        
+        if(self.timer is None):
+            self.timer = createTimer(self.flush)
+            
+        if(self.timer is not None):
+            #restarts the timer if it's already going
+            self.timer.start(int(self.quietPeriod * 1000))
+        elif(not self.flushScheduled):
+            self.flushScheduled = True
+            cmds.evalDeferred(self.onIdle, lowestPriority=True)
+            
+    def onIdle(self):
+        self.flushScheduled = False
+        self.flush()
+        
+    def hasPendingChanges(self):
+        return len(self.pendingValues) > 0
+    
+    """
+    Calls the change function of every value that has a change waiting, all in one batch
+    """
+    def flush(self):
+        if(self.timer is not None):
+            self.timer.stop()
+            
+        if(not self.pendingValues):
+            return
+        
+        values = list(self.pendingValues)
+        self.pendingValues.clear()
+        
+        with self.batch():
+            for value in values:
+                value.applyScheduledChange()
+                
+    """
+    Drops any changes that are waiting, like when the tool is closed
+    """
+    def clear(self):
+        if(self.timer is not None):
+            self.timer.stop()
+            
+        self.pendingValues.clear()
+        self.dirtyFuncs.clear()
+        
+    """
+    Runs func once at the end of the current batch no matter how many times it's marked dirty under the same key, or right away if there's no batch going
+    """
+    def markDirty(self, key, func):
+        if(self.batchDepth == 0):
+            func()
+        elif(key not in self.dirtyFuncs):
+            self.dirtyFuncs[key] = func
+            
+    def batch(self):
+        return ChangeBatch(self)
+    
+    def beginBatch(self):
+        self.batchDepth += 1
+        
+    def endBatch(self):
+        self.batchDepth -= 1
+        
+        if(self.batchDepth > 0):
+            return
+        
+        #whatever these mark dirty runs right away since the batch is over
+        while self.dirtyFuncs:
+            unusedKey, func = self.dirtyFuncs.popitem(last=False)
+            func()
+            
+"""
+Context manager for ChangeScheduler.batch
+"""
+class ChangeBatch(object):
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        
+    def __enter__(self):
+        self.scheduler.beginBatch()
+        return self.scheduler
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        self.scheduler.endBatch()
+        return False
@@ -23,6 +23,7 @@ import maya.cmds as cmds
 import CoplanarJointOrient.MayaUIValue.VectorValue
 import CoplanarJointOrient.mayaUtil
 import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.SceneBackend.SceneBackend
 import functools
 
 class DirectionVectorValue(CoplanarJointOrient.MayaUIValue.VectorValue.VectorValue):
@@ -38,8 +39,8 @@ class DirectionVectorValue(CoplanarJointOrient.MayaUIValue.VectorValue.VectorVal
         self.computeFromSelections()
         
     def computeFromNodes(self, nodes):
-        self.setValue(CoplanarJointOrient.mayaUtil.getAverageNodeDirectionVector(nodes, self.forwardDirectionAxis))
+        self.setValue(CoplanarJointOrient.mayaMathUtil.getAverageDirectionVector(CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend().getWorldDirections(nodes, self.forwardDirectionAxis)))
         
     def computeFromSelections(self):
-        self.computeFromNodes(cmds.ls(selection=True))
+        self.setValue(CoplanarJointOrient.mayaUtil.getSelectionDirectionVector(self.forwardDirectionAxis))
         
\ No newline at end of file
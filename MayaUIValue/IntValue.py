@@ -0,0 +1,54 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+
+import maya.cmds as cmds
+import CoplanarJointOrient.MayaUIValue.ValueBase
+import functools
+
+class IntValue(CoplanarJointOrient.MayaUIValue.ValueBase.ValueBase):
+    def __init__(self, label=None, parentUI=None, minValue=None):
+        super(IntValue, self).__init__()
+        self.value = 0
+        self.minValue = minValue
+        
+        if(parentUI is not None):
+            self.rootUI = cmds.intFieldGrp(label=label, parent=parentUI, numberOfFields=1, value1=0, columnWidth2=[100, 60],
+                                           changeCommand = functools.partial(IntValue.onFieldChange, self))
+                
+    def setValue(self, value):
+        if(self.minValue is not None):
+            value = max(self.minValue, value)
+            
+        if(self.rootUI is not None):
+            cmds.intFieldGrp(self.rootUI, edit=True, value1=value)
+            
+        self.value = value
+        self.callChangeFunc()
+            
+    def onFieldChange(self, *unused):
+        self.setValue(cmds.intFieldGrp(self.rootUI, query=True, value1=True))
+        
+    def setEnabled(self, enabled):
+        if(self.rootUI is not None):        
+            if(enabled):
+                cmds.intFieldGrp(self.rootUI, edit=True, enable=True)
+            else:
+                cmds.intFieldGrp(self.rootUI, edit=True, enable=False)
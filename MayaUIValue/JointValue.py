@@ -24,23 +24,36 @@ import CoplanarJointOrient.MayaUIValue.ValueBase
 import functools
 import CoplanarJointOrient.mayaUtil
 import CoplanarJointOrient.CoplanarJointOrient
+import CoplanarJointOrient.SceneBackend.SceneBackend
 
 class JointValue(CoplanarJointOrient.MayaUIValue.ValueBase.ValueBase):
     def __init__(self, label=None, parentUI=None):
         super(JointValue, self).__init__()
         
+        #text typed in the field that hasn't been looked up yet
+        self.pendingName = None
+        
         if(parentUI is not None):
             #TODO: figure out how to make eclipse stop complaining about WINDOW_WIDTH, has no issues with maya though
             self.rootUI = cmds.textFieldButtonGrp(label=label, parent=parentUI, buttonLabel="Selection", columnWidth3 = [50, CoplanarJointOrient.CoplanarJointOrient.WINDOW_WIDTH - 150, 100],
                                                                 buttonCommand = functools.partial(JointValue.onSelectionPressed, self), 
                                                                 textChangedCommand = functools.partial(JointValue.onJointNameChanged, self))
                         
+    """
+    Takes a joint name or NodeHandle.  The value is kept as a NodeHandle, or None if the name isn't exactly one joint.
+    """
     def setValue(self, value):
         if(self.rootUI is not None):
-            cmds.textFieldButtonGrp(self.rootUI, edit=True, text=value)
+            cmds.textFieldButtonGrp(self.rootUI, edit=True, text=CoplanarJointOrient.mayaUtil.getNodeName(value) or "")
             
-        self.value = value
+        self.value = self.resolveJoint(value)
         self.callChangeFunc()
+        
+    def resolveJoint(self, name):
+        backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+        node = backend.resolveNode(name)
+        
+        return node if node is not None and backend.isJoint(node) else None
             
     def onSelectionPressed(self):
         selection = CoplanarJointOrient.mayaUtil.getFirstSelectedObject()
@@ -49,7 +62,13 @@ class JointValue(CoplanarJointOrient.MayaUIValue.ValueBase.ValueBase):
             cmds.textFieldButtonGrp(self.rootUI, edit=True, text=selection)
             
     def onJointNameChanged(self, value):
-        self.value = value
+        #looked up once typing stops rather than on every keystroke
+        self.pendingName = value
+        self.scheduleChange()
+        
+    def applyScheduledChange(self):
+        #the name only gets looked up here, everything downstream works off the handle
+        self.value = self.resolveJoint(self.pendingName)
         self.callChangeFunc()
         
     def setEnabled(self, enabled):
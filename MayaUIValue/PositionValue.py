@@ -20,6 +20,7 @@ Stretch goals:
 """
 import maya.cmds as cmds
 import CoplanarJointOrient.mayaUtil
+import CoplanarJointOrient.SceneBackend.SceneBackend
 import CoplanarJointOrient.MayaUIValue.VectorValue
 import functools
 
@@ -35,8 +36,8 @@ class PositionValue(CoplanarJointOrient.MayaUIValue.VectorValue.VectorValue):
         self.computeFromSelections()
         
     def computeFromNodes(self, nodes):
-        self.setValue(CoplanarJointOrient.mayaUtil.getAverageNodePositions(nodes))
+        self.setValue(CoplanarJointOrient.mayaUtil.getAveragePoint(CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend().getWorldPositions(nodes)))
         
     def computeFromSelections(self):
-        self.computeFromNodes(cmds.ls(selection=True))
+        self.setValue(CoplanarJointOrient.mayaUtil.getSelectionAveragePosition())
         
\ No newline at end of file
@@ -18,6 +18,8 @@ Stretch goals:
 -Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
+import CoplanarJointOrient.sessionTrace
+import CoplanarJointOrient.MayaUIValue.ChangeScheduler
 
 """
 Wrapper around some value and its associated UI, and makes the two stay in sync
@@ -33,7 +35,21 @@ class ValueBase(object):
     
     def callChangeFunc(self):
         if(self.onChangeFunc is not None):
-            self.onChangeFunc(self.value)
+            #recorded if a session is being recorded, see sessionTrace
+            with CoplanarJointOrient.sessionTrace.recordValueChange(self):
+                self.onChangeFunc(self.value)
+                
+    """
+    For changes coming from the UI.  The change function is called once the UI goes quiet instead of right away, see ChangeScheduler.
+    """
+    def scheduleChange(self):
+        CoplanarJointOrient.MayaUIValue.ChangeScheduler.getChangeScheduler().scheduleChange(self)
+        
+    """
+    Called by the ChangeScheduler when a scheduled change goes out
+    """
+    def applyScheduledChange(self):
+        self.callChangeFunc()
             
     def setEnabled(self, enabled):
         pass
\ No newline at end of file
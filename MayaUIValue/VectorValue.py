@@ -51,15 +51,15 @@ class VectorValue(CoplanarJointOrient.MayaUIValue.ValueBase.ValueBase):
             
     def onXFieldChange(self, value):
         self.value.x = float(value)
-        self.callChangeFunc()
+        self.scheduleChange()
         
     def onYFieldChange(self, value):
         self.value.y = float(value)
-        self.callChangeFunc()
+        self.scheduleChange()
         
     def onZFieldChange(self, value):
         self.value.z = float(value)
-        self.callChangeFunc()
+        self.scheduleChange()
         
     def setEnabled(self, enabled):
         if(self.rootUI is not None):        
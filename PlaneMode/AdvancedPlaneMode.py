@@ -28,6 +28,8 @@ import CoplanarJointOrient.MayaUIValue.PositionValue
 import CoplanarJointOrient.MayaUIValue.DirectionVectorValue
 
 import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.SceneBackend.SceneBackend
+import CoplanarJointOrient.instrumentation
 
 class AdvancedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):    
     def __init__(self, coplanarizer):
@@ -43,6 +45,10 @@ class AdvancedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
                 
         self.planeNormalMode = None
         
+        #average turn direction of the chain only depends on the chain and turn axis, so it's kept around between plane updates
+        self.averageChainNormal = None
+        self.averageChainNormalKey = None
+        
     def setupUI(self, parentUI):
         self.setupValues(parentUI)
 
@@ -97,6 +103,7 @@ class AdvancedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
         self.planeNormalPoint1.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.AdvancedPlaneMode.AdvancedPlaneMode.onPoint01Change, self)
         self.planeNormalPoint2.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.AdvancedPlaneMode.AdvancedPlaneMode.onPoint2Change, self)
 
+    @CoplanarJointOrient.instrumentation.instrumented("AdvancedPlaneMode.updatePlane")
     def updatePlane(self):
         planeNormal = om.MVector(om.MVector.kXaxisVector)
         
@@ -113,7 +120,7 @@ class AdvancedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
         if(self.planeNormalMode.value == CoplanarJointOrient.MayaUIValue.NormalModeValue.NormalModeValue.PLANE_NORMAL_MODE_3POINT or
            self.planeNormalMode.value == CoplanarJointOrient.MayaUIValue.NormalModeValue.NormalModeValue.PLANE_NORMAL_MODE_2POINT_VECTOR):            
             if(self.coplanarizer.chainRoot is not None and self.coplanarizer.chainEnd is not None):
-                averageNormal = CoplanarJointOrient.mayaUtil.getAverageNodeDirectionVector(CoplanarJointOrient.mayaUtil.getWholeParentChain(self.coplanarizer.chainRoot, self.coplanarizer.chainEnd), self.coplanarizer.turnAxis.value)
+                averageNormal = self.getAverageChainNormal()
                 
                 #just a dot product
                 if(planeNormal * averageNormal < 0):
@@ -125,6 +132,23 @@ class AdvancedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
         
         super(AdvancedPlaneMode, self).updatePlane()
         
+    """
+    Average direction of the turn axis over the whole chain.
+    Only recomputed when the chain or turn axis changes, or when a chain dependant mode sees the chain move, since it needs the world orientation of every joint.
+    """
+    def getAverageChainNormal(self):
+        turnAxis = self.coplanarizer.turnAxis.value
+        key = (self.coplanarizer.chainRoot, self.coplanarizer.chainEnd, turnAxis.axis, turnAxis.negative)
+        
+        if(self.averageChainNormal is None or self.averageChainNormalKey != key):
+            backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+            joints = backend.getWholeParentChain(self.coplanarizer.chainRoot, self.coplanarizer.chainEnd) or []
+            
+            self.averageChainNormal = CoplanarJointOrient.mayaMathUtil.getAverageDirectionVector(backend.getWorldDirections(joints, turnAxis))
+            self.averageChainNormalKey = key
+            
+        return self.averageChainNormal
+        
     def onNormalModeChange(self, value):
         if(self.planeNormalMode.value == CoplanarJointOrient.MayaUIValue.NormalModeValue.NormalModeValue.PLANE_NORMAL_MODE_VECTOR):
             self.planeNormalVector.setEnabled(True)
@@ -19,7 +19,6 @@ Stretch goals:
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
 import maya.cmds as cmds
-import CoplanarJointOrient.mayaUtil
 
 import CoplanarJointOrient.PlaneMode.ChainDependantPlaneMode
 import CoplanarJointOrient.MayaUIValue.NormalModeValue
@@ -42,11 +41,15 @@ class Automatic3PointPlaneMode(CoplanarJointOrient.PlaneMode.ChainDependantPlane
             
             self.advancedSettingsUI = parentUI
             
-    def coplanarizerChainUpdated(self):
-        super(Automatic3PointPlaneMode, self).coplanarizerChainUpdated()
+    def chainJointsChanged(self, changedIndices):
+        numJoints = len(self.chainJoints)
         
-        if(self.currentCoplanarizerChainRoot is not None and self.currentCoplanarizerChainEnd is not None):
-            self.planePosition.computeFromNodes([self.currentCoplanarizerChainRoot])
-            self.planeNormalPoint0.computeFromNodes([self.currentCoplanarizerChainRoot])
-            self.planeNormalPoint1.computeFromNodes(CoplanarJointOrient.mayaUtil.getInnerParentChain(self.currentCoplanarizerChainRoot, self.currentCoplanarizerChainEnd))
-            self.planeNormalPoint2.computeFromNodes([self.currentCoplanarizerChainEnd])
\ No newline at end of file
+        if(self.anyJointsChanged(changedIndices, [0])):
+            self.planePosition.computeFromNodes(self.chainJoints[:1])
+            self.planeNormalPoint0.computeFromNodes(self.chainJoints[:1])
+            
+        if(self.anyJointsChanged(changedIndices, range(1, numJoints - 1))):
+            self.planeNormalPoint1.computeFromNodes(self.chainJoints[1:-1])
+            
+        if(self.anyJointsChanged(changedIndices, [numJoints - 1])):
+            self.planeNormalPoint2.computeFromNodes(self.chainJoints[-1:])
\ No newline at end of file
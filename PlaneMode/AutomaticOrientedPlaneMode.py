@@ -19,7 +19,6 @@ Stretch goals:
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
 import maya.cmds as cmds
-import CoplanarJointOrient.mayaUtil
 
 import CoplanarJointOrient.PlaneMode.ChainDependantPlaneMode
 import CoplanarJointOrient.MayaUIValue.NormalModeValue
@@ -42,11 +41,14 @@ class AutomaticOrientedPlaneMode(CoplanarJointOrient.PlaneMode.ChainDependantPla
             
             self.advancedSettingsUI = parentUI
             
-    def coplanarizerChainUpdated(self):
-        super(AutomaticOrientedPlaneMode, self).coplanarizerChainUpdated()
-        
-        if(self.currentCoplanarizerChainRoot is not None and self.currentCoplanarizerChainEnd is not None):
-            self.planePosition.computeFromNodes([self.currentCoplanarizerChainRoot])
-            self.planeNormalVector.computeFromNodes(CoplanarJointOrient.mayaUtil.getWholeParentChain(self.currentCoplanarizerChainRoot, self.currentCoplanarizerChainEnd))
-            self.planeNormalPoint0.computeFromNodes([self.currentCoplanarizerChainRoot])
-            self.planeNormalPoint1.computeFromNodes([self.currentCoplanarizerChainEnd])
\ No newline at end of file
+    def chainJointsChanged(self, changedIndices):
+        if(self.anyJointsChanged(changedIndices, [0])):
+            self.planePosition.computeFromNodes(self.chainJoints[:1])
+            self.planeNormalPoint0.computeFromNodes(self.chainJoints[:1])
+            
+        #any joint turning changes the average direction, the joints that didn't move come out of the world transform cache
+        if(changedIndices is None or changedIndices):
+            self.planeNormalVector.computeFromNodes(self.chainJoints)
+            
+        if(self.anyJointsChanged(changedIndices, [len(self.chainJoints) - 1])):
+            self.planeNormalPoint1.computeFromNodes(self.chainJoints[-1:])
\ No newline at end of file
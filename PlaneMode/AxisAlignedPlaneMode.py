@@ -26,6 +26,7 @@ import CoplanarJointOrient.mayaMathUtil
 
 import CoplanarJointOrient.MayaUIValue.AxisValue
 import CoplanarJointOrient.MayaUIValue.PositionValue
+import CoplanarJointOrient.instrumentation
 
 class AxisAlignedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
     def __init__(self, coplanarizer):
@@ -62,6 +63,7 @@ class AxisAlignedPlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
 
         self.advancedSettingsUI = parentUI
         
+    @CoplanarJointOrient.instrumentation.instrumented("AxisAlignedPlaneMode.updatePlane")
     def updatePlane(self):
         self.alignmentPlanePreviewLocation = None
 
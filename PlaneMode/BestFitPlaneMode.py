@@ -0,0 +1,93 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import functools
+
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+import CoplanarJointOrient.PlaneMode.ChainDependantPlaneMode
+import CoplanarJointOrient.MayaUIValue.NormalModeValue
+import CoplanarJointOrient.MayaUIValue.BoolValue
+import CoplanarJointOrient.instrumentation
+
+"""
+Fits the plane to all the joints of the chain at once with least squares, so how the inner joints are spread out counts too.
+Can optionally force the plane through both end joints so they stay exactly where they are.
+"""
+class BestFitPlaneMode(CoplanarJointOrient.PlaneMode.ChainDependantPlaneMode.ChainDependantPlaneMode):
+    def __init__(self, coplanarizer):
+        super(BestFitPlaneMode, self).__init__(coplanarizer)
+        
+        self.keepEndJoints = None
+        
+        #chain positions from root to end, read in one go when the chain changes or any of its joints move
+        self.chainPositions = None
+        
+    def setupUI(self, parentUI):
+        self.setupValues(None)
+        self.planeNormalMode.setValue(CoplanarJointOrient.MayaUIValue.NormalModeValue.NormalModeValue.PLANE_NORMAL_MODE_VECTOR)
+        
+        self.keepEndJoints = CoplanarJointOrient.MayaUIValue.BoolValue.BoolValue(label="Keep end joints on the plane", parentUI=parentUI)
+        self.keepEndJoints.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.BestFitPlaneMode.BestFitPlaneMode.onKeepEndJointsChanged, self)
+
+        if(parentUI is not None):        
+            label = cmds.text(label="Best fit plane mode set", parent=parentUI)
+            
+            cmds.formLayout(parentUI, edit=True, attachForm=[
+                                                             (label, "left", 0),
+                                                             (label, "top", 10),
+                                                             
+                                                             (self.keepEndJoints.rootUI, "left", 0),
+                                                             (self.keepEndJoints.rootUI, "top", 30),
+                                                             ])
+            
+            self.advancedSettingsUI = parentUI
+            
+    @CoplanarJointOrient.instrumentation.instrumented("BestFitPlaneMode.coplanarizerChainUpdated")
+    def coplanarizerChainUpdated(self):
+        if(self.coplanarizer.chainRoot is None or self.coplanarizer.chainEnd is None):
+            self.chainPositions = None
+        
+        super(BestFitPlaneMode, self).coplanarizerChainUpdated()
+        
+    def chainJointsChanged(self, changedIndices):
+        #every joint counts towards the fit, the ones that didn't move come out of the world transform cache
+        self.chainPositions = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend().getWorldPositions(self.chainJoints)
+        self.computeFromChain()
+            
+    def computeFromChain(self):
+        if(self.chainPositions is None):
+            return
+        
+        normal, position = CoplanarJointOrient.chainSolver.fitPlane(self.chainPositions, self.keepEndJoints.value)
+        planeNormal = om.MVector(normal.tolist())
+        
+        #face the same way as the chain's turn axes on average like the other modes do
+        if(planeNormal * self.getAverageChainNormal() < 0):
+            planeNormal *= -1
+        
+        self.planePosition.setValue(om.MVector(position.tolist()))
+        self.planeNormalVector.setValue(planeNormal)
+        
+    def onKeepEndJointsChanged(self, value):
+        self.computeFromChain()
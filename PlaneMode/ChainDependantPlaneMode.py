@@ -18,17 +18,75 @@ Stretch goals:
 -Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
+import functools
+
 import CoplanarJointOrient.PlaneMode.AdvancedPlaneMode
+import CoplanarJointOrient.PlaneMode.WatchedChain
+import CoplanarJointOrient.instrumentation
 
+"""
+Plane mode whose values are computed from the joints of the chain.
+Watches the chain's joints so the values follow along when they're moved, recomputing only the values that depend on the joints that moved.
+"""
 class ChainDependantPlaneMode(CoplanarJointOrient.PlaneMode.AdvancedPlaneMode.AdvancedPlaneMode):
     def __init__(self, coplanarizer):
         super(ChainDependantPlaneMode, self).__init__(coplanarizer)
-        self.currentCoplanarizerChainRoot = None
-        self.currentCoplanarizerChainEnd = None
+        self.watchedChain = CoplanarJointOrient.PlaneMode.WatchedChain.WatchedChain(functools.partial(CoplanarJointOrient.PlaneMode.ChainDependantPlaneMode.ChainDependantPlaneMode.onChainJointsMoved, self))
+        
+        #scene backend nodes of the chain from root to end, NodeHandles for the Maya scene
+        self.chainJoints = None
+        
+        #set while recomputing values from the chain so the plane is only updated once at the end instead of once per value
+        self.deferPlaneUpdate = False
 
+    @CoplanarJointOrient.instrumentation.instrumented("ChainDependantPlaneMode.coplanarizerChainUpdated")
     def coplanarizerChainUpdated(self):
-        if(self.currentCoplanarizerChainRoot == self.coplanarizer.chainRoot and self.currentCoplanarizerChainEnd == self.coplanarizer.chainEnd):
+        if(not self.watchedChain.setChain(self.coplanarizer.chainRoot, self.coplanarizer.chainEnd)):
             return
         
-        self.currentCoplanarizerChainRoot = self.coplanarizer.chainRoot
-        self.currentCoplanarizerChainEnd = self.coplanarizer.chainEnd
+        self.chainJoints = self.watchedChain.joints
+        
+        if(self.chainJoints is not None):
+            self.recomputeFromChain(None)
+            
+    def onChainJointsMoved(self, changedIndices):
+        self.recomputeFromChain(changedIndices)
+        
+    @CoplanarJointOrient.instrumentation.instrumented("ChainDependantPlaneMode.recomputeFromChain")
+    def recomputeFromChain(self, changedIndices):
+        if(self.chainJoints is None):
+            return
+        
+        #the turn axes of the joints that moved might be pointing somewhere else now
+        self.averageChainNormal = None
+        
+        self.deferPlaneUpdate = True
+        
+        try:
+            self.chainJointsChanged(changedIndices)
+        finally:
+            self.deferPlaneUpdate = False
+            
+        self.updatePlane()
+        
+    """
+    Recomputes the values that depend on the chain joints at changedIndices, indices into chainJoints from root to end.
+    changedIndices is None when the whole chain is new.
+    """
+    def chainJointsChanged(self, changedIndices):
+        pass
+    
+    """
+    Whether any of the chain joints at the given indices are in changedIndices, or True if everything changed
+    """
+    def anyJointsChanged(self, changedIndices, indices):
+        return changedIndices is None or not set(changedIndices).isdisjoint(indices)
+    
+    def updatePlane(self):
+        if(self.deferPlaneUpdate):
+            return
+        
+        super(ChainDependantPlaneMode, self).updatePlane()
+        
+    def release(self):
+        self.watchedChain.release()
@@ -0,0 +1,338 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import functools
+import numpy as np
+
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.nodeHandle
+import CoplanarJointOrient.previewPlane
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+import CoplanarJointOrient.PlaneMode.PlaneMode
+import CoplanarJointOrient.MayaUIValue.ChangeScheduler
+import CoplanarJointOrient.MayaUIValue.PositionValue
+import CoplanarJointOrient.MayaUIValue.DirectionVectorValue
+import CoplanarJointOrient.instrumentation
+
+#size of the handle in UI units when there's no chain to size it from
+DEFAULT_HANDLE_SIZE = 25.0
+
+"""
+Plane set by moving and rotating a handle in the viewport with the regular move and rotate tools.  The handle's Y axis is the plane normal.
+
+While the handle is dragged the plane follows it directly on every drag event, which is one read of the handle's matrix and then the plane and previews updated from that,
+without going through the position and normal values.  Those are set once when the drag is released, so the fields and anything recording the session see the final plane.
+The handle can also be moved without dragging it, like from the channel box or with undo, so every move is handed to the change scheduler too.
+That sets the values once the handle stops moving, and right away when something like Apply flushes the scheduler.
+Typing into the fields moves the handle.
+
+The handle is made with undo off and never saved with the scene, but moving it is undoable like moving anything else, so undo puts the plane back too.
+It's only made when the tool has a window.
+"""
+class InteractivePlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
+    def __init__(self, coplanarizer):
+        super(InteractivePlaneMode, self).__init__(coplanarizer)
+        
+        self.planePosition = None
+        self.planeNormalVector = None
+        
+        #NodeHandle of the handle's transform while it exists
+        self.handle = None
+        self.handleCallbackId = None
+        self.dragReleaseJob = None
+        
+        #world matrix the handle was last seen at, so events that didn't move it are skipped
+        self.handleMatrix = None
+        
+        #set while the handle is moved to match the values, and while the values are set from the handle, so the two don't chase each other
+        self.movingHandle = False
+        self.committing = False
+        
+        #whether the handle moved since the values were last set from it
+        self.dragged = False
+        
+        self.currentCoplanarizerChainRoot = None
+        self.currentCoplanarizerChainEnd = None
+        
+    def setupUI(self, parentUI):
+        self.planePosition = CoplanarJointOrient.MayaUIValue.PositionValue.PositionValue(label="Position", parentUI=parentUI)
+        self.planePosition.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.InteractivePlaneMode.InteractivePlaneMode.onValueChanged, self)
+        
+        self.planeNormalVector = CoplanarJointOrient.MayaUIValue.DirectionVectorValue.DirectionVectorValue(label="Normal", parentUI=parentUI)
+        self.planeNormalVector.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.InteractivePlaneMode.InteractivePlaneMode.onValueChanged, self)
+        
+        if(parentUI is not None):
+            label = cmds.text(label="Interactive plane mode set.  Move and rotate the handle in the viewport, its Y axis is the plane normal.", parent=parentUI)
+            selectButton = cmds.button(label="Select Handle", parent=parentUI, 
+                                       command = functools.partial(CoplanarJointOrient.PlaneMode.InteractivePlaneMode.InteractivePlaneMode.onSelectHandlePressed, self))
+            fitButton = cmds.button(label="Fit To Chain", parent=parentUI, 
+                                    command = functools.partial(CoplanarJointOrient.PlaneMode.InteractivePlaneMode.InteractivePlaneMode.onFitToChainPressed, self))
+            
+            cmds.formLayout(parentUI, edit=True, attachForm=[
+                                                             (label, "left", 0),
+                                                             (label, "top", 10),
+                                                             
+                                                             (self.planePosition.rootUI, "right", 10),
+                                                             (self.planePosition.rootUI, "top", 35),
+                                                             
+                                                             (self.planeNormalVector.rootUI, "right", 10),
+                                                             (self.planeNormalVector.rootUI, "top", 65),
+                                                             
+                                                             (selectButton, "left", 10),
+                                                             (selectButton, "top", 95),
+                                                             
+                                                             (fitButton, "left", 110),
+                                                             (fitButton, "top", 95),
+                                                             ])
+            
+            self.advancedSettingsUI = parentUI
+            
+    @CoplanarJointOrient.instrumentation.instrumented("InteractivePlaneMode.updatePlane")
+    def updatePlane(self):
+        self.setPlane(om.MVector(self.planeNormalVector.value).normal(), om.MVector(self.planePosition.value))
+        
+        super(InteractivePlaneMode, self).updatePlane()
+        
+    def setPlane(self, normal, position):
+        self.alignmentPlane.setPlane(normal, 0)
+        CoplanarJointOrient.mayaMathUtil.setPlaneWorldPosition(self.alignmentPlane, position)
+        self.alignmentPlanePreviewLocation = position
+        
+    """
+    Starts the plane off as the best fit plane of a new chain, facing the way the joints' turn axes point on average
+    """
+    def coplanarizerChainUpdated(self):
+        if(self.currentCoplanarizerChainRoot == self.coplanarizer.chainRoot and self.currentCoplanarizerChainEnd == self.coplanarizer.chainEnd):
+            return
+        
+        self.currentCoplanarizerChainRoot = self.coplanarizer.chainRoot
+        self.currentCoplanarizerChainEnd = self.coplanarizer.chainEnd
+        
+        self.fitToChain()
+        
+    def fitToChain(self):
+        if(self.coplanarizer.chainRoot is None or self.coplanarizer.chainEnd is None):
+            return
+        
+        backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+        joints = backend.getWholeParentChain(self.coplanarizer.chainRoot, self.coplanarizer.chainEnd)
+        
+        #the end might have been reparented out from under the root since the chain was picked
+        if(joints is None):
+            return
+        
+        normal, position = CoplanarJointOrient.chainSolver.fitPlane(backend.getWorldPositions(joints))
+        normal = om.MVector(*normal)
+        
+        if(normal * CoplanarJointOrient.mayaMathUtil.getAverageDirectionVector(backend.getWorldDirections(joints, self.coplanarizer.turnAxis.value)) < 0):
+            normal *= -1
+            
+        #the plane and previews are updated once for both values
+        with CoplanarJointOrient.MayaUIValue.ChangeScheduler.getChangeScheduler().batch():
+            self.planePosition.setValue(om.MVector(*position))
+            self.planeNormalVector.setValue(normal)
+            
+    def onValueChanged(self, unusedValue):
+        #the plane is already where the handle is
+        if(self.committing):
+            return
+        
+        self.moveHandle()
+        self.updatePlane()
+        
+    def onSelectHandlePressed(self, unused):
+        if(self.handle is not None and self.handle.isValid()):
+            cmds.select(self.handle.longName(), replace=True)
+            
+    def onFitToChainPressed(self, unused):
+        self.fitToChain()
+        
+    """
+    Shows the handle and starts following it
+    """
+    def activate(self):
+        if(self.advancedSettingsUI is None):
+            return
+        
+        if(self.handle is None or not self.handle.isValid()):
+            self.createHandle()
+            
+        self.setHandleVisible(True)
+        self.moveHandle()
+        
+        if(self.handleCallbackId is None):
+            self.handleCallbackId = om.MNodeMessage.addAttributeChangedCallback(self.handle.getObject(), self.onHandleAttributeChanged)
+            
+        if(self.dragReleaseJob is None):
+            self.dragReleaseJob = cmds.scriptJob(event=["DragRelease", self.commitHandle])
+            
+    def deactivate(self):
+        self.commitHandle()
+        self.removeCallbacks()
+        self.setHandleVisible(False)
+        
+    def release(self):
+        self.removeCallbacks()
+        
+        if(self.handle is not None and self.handle.isValid()):
+            name = self.handle.longName()
+            
+            with CoplanarJointOrient.previewPlane.UndoDisabled():
+                cmds.delete(name)
+                
+        self.handle = None
+        
+    def removeCallbacks(self):
+        if(self.handleCallbackId is not None):
+            try:
+                om.MMessage.removeCallback(self.handleCallbackId)
+            except RuntimeError:
+                #the handle was deleted along with its callbacks
+                pass
+            
+            self.handleCallbackId = None
+            
+        if(self.dragReleaseJob is not None):
+            if(cmds.scriptJob(exists=self.dragReleaseJob)):
+                cmds.scriptJob(kill=self.dragReleaseJob, force=True)
+                
+            self.dragReleaseJob = None
+            
+    def onHandleAttributeChanged(self, message, unusedPlug, unusedOtherPlug, unusedClientData):
+        if(message & om.MNodeMessage.kAttributeSet and not self.movingHandle):
+            self.onHandleMoved()
+            
+    """
+    Called for every drag event.  Only reads the handle's matrix and updates the plane and previews from it, the values wait for the drag to be released.
+    """
+    @CoplanarJointOrient.instrumentation.instrumented("InteractivePlaneMode.onHandleMoved")
+    def onHandleMoved(self):
+        dagPath = self.handle.getDagPath() if self.handle is not None else None
+        
+        if(dagPath is None):
+            return
+        
+        CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.TRANSFORM_READ)
+        matrix = dagPath.inclusiveMatrix()
+        
+        if(matrix == self.handleMatrix):
+            return
+        
+        self.handleMatrix = matrix
+        self.dragged = True
+        CoplanarJointOrient.MayaUIValue.ChangeScheduler.getChangeScheduler().scheduleChange(self)
+        
+        self.setPlane(*getHandlePlane(matrix))
+        super(InteractivePlaneMode, self).updatePlane()
+        
+    """
+    Sets the values to wherever the handle ended up, if it moved
+    """
+    def commitHandle(self):
+        if(not self.dragged):
+            return
+        
+        self.dragged = False
+        normal, position = getHandlePlane(self.handleMatrix)
+        
+        self.committing = True
+        
+        try:
+            self.planePosition.setValue(position)
+            self.planeNormalVector.setValue(normal)
+        finally:
+            self.committing = False
+            
+    """
+    Called by the change scheduler once the handle stops moving or when the values are about to be read
+    """
+    def applyScheduledChange(self):
+        self.commitHandle()
+        
+    """
+    Puts the handle where the values say the plane is
+    """
+    def moveHandle(self):
+        dagPath = self.handle.getDagPath() if self.handle is not None else None
+        
+        if(dagPath is None):
+            return
+        
+        CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.WRITE)
+        
+        self.movingHandle = True
+        
+        try:
+            fnTransform = om.MFnTransform(dagPath)
+            fnTransform.setTranslation(om.MVector(self.planePosition.value) * om.MDistance.uiToInternal(1.0), om.MSpace.kTransform)
+            fnTransform.setRotation(om.MVector.kYaxisVector.rotateTo(om.MVector(self.planeNormalVector.value).normal()), om.MSpace.kTransform)
+        finally:
+            self.movingHandle = False
+            
+        self.handleMatrix = dagPath.inclusiveMatrix()
+        
+    """
+    Makes the handle, a square on the plane with a line sticking out along the normal, sized to the chain
+    """
+    def createHandle(self):
+        size = DEFAULT_HANDLE_SIZE
+        
+        if(self.coplanarizer.chainRoot is not None and self.coplanarizer.chainEnd is not None):
+            backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+            joints = backend.getWholeParentChain(self.coplanarizer.chainRoot, self.coplanarizer.chainEnd)
+            
+            if(joints is not None):
+                positions = np.asarray(backend.getWorldPositions(joints))
+                size = max(float(np.linalg.norm(positions.max(axis=0) - positions.min(axis=0))) * 0.5, 1.0)
+            
+        with CoplanarJointOrient.previewPlane.UndoDisabled():
+            transform = cmds.curve(name="coplanarPlaneHandle", degree=1, point=[(-size, 0, -size), (size, 0, -size), (size, 0, size), (-size, 0, size), (-size, 0, -size)])
+            normalLine = cmds.curve(degree=1, point=[(0, 0, 0), (0, size, 0)])
+            
+            cmds.parent(cmds.listRelatives(normalLine, shapes=True, fullPath=True), transform, shape=True, relative=True)
+            cmds.delete(normalLine)
+            
+            #scaling the handle would only change how big it's drawn
+            cmds.setAttr(transform + ".scale", lock=True)
+            
+        self.handle = CoplanarJointOrient.nodeHandle.NodeHandle.fromName(transform)
+        
+        #never saved with the scene
+        for name in [transform] + (cmds.listRelatives(transform, shapes=True, fullPath=True) or []):
+            selection = om.MSelectionList()
+            selection.add(name)
+            om.MFnDependencyNode(selection.getDependNode(0)).setDoNotWrite(True)
+            
+    def setHandleVisible(self, visible):
+        if(self.handle is not None and self.handle.isValid()):
+            om.MFnDependencyNode(self.handle.getObject()).findPlug("visibility", False).setBool(visible)
+            
+"""
+Plane normal and position in UI units of a handle's world matrix, its Y axis and translation
+"""
+def getHandlePlane(matrix):
+    normal = om.MVector(matrix[4], matrix[5], matrix[6]).normal()
+    position = om.MVector(matrix[12], matrix[13], matrix[14]) * om.MDistance.internalToUI(1.0)
+    
+    return normal, position
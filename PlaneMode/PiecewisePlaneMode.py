@@ -0,0 +1,144 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import functools
+
+import CoplanarJointOrient.PlaneMode.PlaneMode
+import CoplanarJointOrient.PlaneMode.WatchedChain
+import CoplanarJointOrient.MayaUIValue.IntValue
+import CoplanarJointOrient.MayaUIValue.BoolValue
+
+import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.SceneBackend.SceneBackend
+import CoplanarJointOrient.instrumentation
+
+"""
+For long chains like tails, tentacles and ropes where one plane for the whole chain is wrong.
+Splits the chain into overlapping windows of joints and fits a best fit plane to each window, optionally blending between windows so the planes change smoothly.
+The preview plane shows the best fit plane of the whole chain.
+"""
+class PiecewisePlaneMode(CoplanarJointOrient.PlaneMode.PlaneMode.PlaneMode):
+    def __init__(self, coplanarizer):
+        super(PiecewisePlaneMode, self).__init__(coplanarizer)
+        
+        self.windowSize = None
+        self.windowOverlap = None
+        self.blendWindows = None
+        
+        #the chain is watched so the planes follow along when joints are moved
+        self.watchedChain = CoplanarJointOrient.PlaneMode.WatchedChain.WatchedChain(functools.partial(CoplanarJointOrient.PlaneMode.PiecewisePlaneMode.PiecewisePlaneMode.onChainJointsMoved, self))
+        
+        #scene backend nodes of the chain from root to end
+        self.chainJoints = None
+        
+        #world matrices of the chain from root to end, read when the chain changes or any of its joints move
+        self.chainWorldMatrices = None
+        
+        self.jointPlanes = None
+        
+    def setupUI(self, parentUI):
+        self.windowSize = CoplanarJointOrient.MayaUIValue.IntValue.IntValue(label="Joints per window", parentUI=parentUI, minValue=3)
+        self.windowOverlap = CoplanarJointOrient.MayaUIValue.IntValue.IntValue(label="Window overlap", parentUI=parentUI, minValue=0)
+        self.blendWindows = CoplanarJointOrient.MayaUIValue.BoolValue.BoolValue(label="Blend between windows", parentUI=parentUI)
+        
+        self.windowSize.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.PiecewisePlaneMode.PiecewisePlaneMode.onSettingChanged, self)
+        self.windowOverlap.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.PiecewisePlaneMode.PiecewisePlaneMode.onSettingChanged, self)
+        self.blendWindows.onChangeFunc = functools.partial(CoplanarJointOrient.PlaneMode.PiecewisePlaneMode.PiecewisePlaneMode.onSettingChanged, self)
+        
+        if(parentUI is not None):
+            separator = cmds.separator(style="in", height=3, parent=parentUI)        
+            label = cmds.text(label="Piecewise Plane Mode Options", parent=parentUI)
+            
+            cmds.formLayout(parentUI, edit=True, attachForm=[
+                                                             (separator, "left", 0),
+                                                             (separator, "top", 5),
+                                                             (separator, "right", 0),
+                                                             
+                                                             (label, "left", 0),
+                                                             (label, "top", 10),
+                                                             
+                                                             (self.windowSize.rootUI, "left", 0),
+                                                             (self.windowSize.rootUI, "top", 30),
+                                                             
+                                                             (self.windowOverlap.rootUI, "left", 0),
+                                                             (self.windowOverlap.rootUI, "top", 55),
+                                                             
+                                                             (self.blendWindows.rootUI, "right", 20),
+                                                             (self.blendWindows.rootUI, "top", 30),
+                                                             ])
+
+        self.advancedSettingsUI = parentUI
+        
+    @CoplanarJointOrient.instrumentation.instrumented("PiecewisePlaneMode.coplanarizerChainUpdated")
+    def coplanarizerChainUpdated(self):
+        if(not self.watchedChain.setChain(self.coplanarizer.chainRoot, self.coplanarizer.chainEnd)):
+            return
+        
+        self.chainJoints = self.watchedChain.joints
+        self.chainWorldMatrices = None
+        
+        if(self.chainJoints is not None):
+            self.chainWorldMatrices = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend().getWorldMatrices(self.chainJoints)
+            
+        self.updatePlane()
+        
+    @CoplanarJointOrient.instrumentation.instrumented("PiecewisePlaneMode.onChainJointsMoved")
+    def onChainJointsMoved(self, changedIndices):
+        if(self.chainJoints is None):
+            return
+        
+        #every window overlapping a moved joint changes, the joints that didn't move come out of the world transform cache
+        self.chainWorldMatrices = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend().getWorldMatrices(self.chainJoints)
+        self.updatePlane()
+        
+    @CoplanarJointOrient.instrumentation.instrumented("PiecewisePlaneMode.updatePlane")
+    def updatePlane(self):
+        if(self.chainWorldMatrices is None or self.windowSize is None):
+            self.jointPlanes = None
+        else:
+            #world matrices are in internal units but planes are set up in UI units
+            toUIUnits = om.MDistance.internalToUI(1.0)
+            positions = [[value * toUIUnits for value in matrix[12:15]] for matrix in self.chainWorldMatrices]
+            
+            #flip the planes to face the same way as the chain's turn axes on average like the other modes do
+            referenceNormal = CoplanarJointOrient.chainSolver.worldAxisDirections(self.chainWorldMatrices, self.coplanarizer.turnAxis.value).sum(axis=0)
+            
+            self.jointPlanes = CoplanarJointOrient.chainSolver.fitWindowPlanes(positions, self.windowSize.value, self.windowOverlap.value, self.blendWindows.value, referenceNormal)
+            
+            normals, centroids = CoplanarJointOrient.chainSolver.fitPlanes([positions])
+            normal = normals[0] if normals[0].dot(referenceNormal) >= 0 else -normals[0]
+            
+            self.alignmentPlanePreviewLocation = om.MVector(centroids[0].tolist())
+            self.alignmentPlane.setPlane(om.MVector(normal.tolist()), 0)
+            CoplanarJointOrient.mayaMathUtil.setPlaneWorldPosition(self.alignmentPlane, self.alignmentPlanePreviewLocation)
+        
+        super(PiecewisePlaneMode, self).updatePlane()
+        
+    def getJointPlanes(self):
+        return self.jointPlanes
+        
+    def release(self):
+        self.watchedChain.release()
+        
+    def onSettingChanged(self, value):
+        self.updatePlane()
@@ -20,6 +20,8 @@ Stretch goals:
 """
 import maya.api.OpenMaya as om
 
+import CoplanarJointOrient.instrumentation
+
 class PlaneMode(object):
     def __init__(self, coplanarizer):
         self.coplanarizer = coplanarizer
@@ -37,6 +39,32 @@ class PlaneMode(object):
         
     def coplanarizerChainUpdated(self):
         pass
+        
+    """
+    Called when the tool switches to this mode, for modes that show something of their own in the scene while they're in use
+    """
+    def activate(self):
+        pass
+        
+    """
+    Called when the tool switches away from this mode
+    """
+    def deactivate(self):
+        pass
+            
+    """
+    Modes that give each joint of the chain its own plane return them here as (normals, distances) like chainSolver.solveChain takes.
+    None means every joint uses alignmentPlane.
+    """
+    def getJointPlanes(self):
+        return None
+        
+    """
+    Lets go of anything the mode is holding on to in the scene, like callbacks, when the tool is closed
+    """
+    def release(self):
+        pass
             
+    @CoplanarJointOrient.instrumentation.instrumented("PlaneMode.updatePlane")
     def updatePlane(self):
         self.coplanarizer.planeUpdated(self)
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+"""
+The coplanarizer's chain as scene backend nodes, watched so plane modes computed from the chain's joints can follow along when they move.
+"""
+class WatchedChain(object):
+    def __init__(self, onJointsMovedFunc):
+        #called with a sorted list of indices into joints of the joints that moved
+        self.onJointsMovedFunc = onJointsMovedFunc
+        
+        self.chainRoot = None
+        self.chainEnd = None
+        
+        #scene backend nodes of the chain from root to end, NodeHandles for the Maya scene.  None if there's no chain.
+        self.joints = None
+        
+        #made by the scene backend each time there's a new chain to watch
+        self.watcher = None
+        
+    """
+    Reads and starts watching the chain between a root and end, replacing the one watched before.
+    Returns False without doing anything if it's the same chain as before.
+    """
+    def setChain(self, chainRoot, chainEnd):
+        if(self.chainRoot == chainRoot and self.chainEnd == chainEnd):
+            return False
+        
+        self.chainRoot = chainRoot
+        self.chainEnd = chainEnd
+        
+        self.joints = None
+        self.release()
+        
+        if(chainRoot is not None and chainEnd is not None):
+            backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+            joints = backend.getWholeParentChain(chainRoot, chainEnd)
+            
+            #the end might have been reparented out from under the root since the chain was picked
+            if(joints is not None):
+                joints.reverse()
+                
+                self.joints = backend.resolveNodes(joints)
+                
+                self.watcher = backend.watchTransforms(self.onJointsMovedFunc)
+                self.watcher.watch(self.joints)
+                
+        return True
+    
+    def release(self):
+        if(self.watcher is not None):
+            self.watcher.clear()
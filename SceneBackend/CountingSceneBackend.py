@@ -0,0 +1,232 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+"""
+Raised by SceneCallCounts.assertWithin when an operation goes over its budget.  An AssertionError so test runners report it as a failure rather than an error.
+"""
+class SceneCallBudgetExceeded(AssertionError):
+    pass
+
+"""
+How many times an operation went to the scene, split into reads, writes, node creations and deletions.
+Reads and writes are counted both as calls, meaning round trips, and as nodes, so a batched read of N nodes is 1 read and N read nodes.
+"""
+class SceneCallCounts(object):
+    def __init__(self):
+        self.reads = 0
+        self.readNodes = 0
+        self.writes = 0
+        self.writtenNodes = 0
+        self.created = 0
+        self.deleted = 0
+        
+        #calls per backend method name
+        self.calls = {}
+        
+    def countRead(self, methodName, numNodes=1):
+        self.reads += 1
+        self.readNodes += numNodes
+        self.calls[methodName] = self.calls.get(methodName, 0) + 1
+        
+    def countWrite(self, methodName, numNodes=1):
+        self.writes += 1
+        self.writtenNodes += numNodes
+        self.calls[methodName] = self.calls.get(methodName, 0) + 1
+        
+    def onNodeCreated(self, unusedName):
+        self.created += 1
+        
+    def onNodeDeleted(self, unusedName):
+        self.deleted += 1
+        
+    def toDict(self):
+        return {"reads" : self.reads, "readNodes" : self.readNodes, "writes" : self.writes, "writtenNodes" : self.writtenNodes, 
+                "created" : self.created, "deleted" : self.deleted, "calls" : dict(self.calls)}
+        
+    """
+    Descriptions of every count over its limit, limits given as keyword arguments named like the counts.  Limits that are None aren't checked.
+    """
+    def getBudgetViolations(self, **limits):
+        counts = self.toDict()
+        violations = []
+        
+        for name, limit in sorted(limits.items()):
+            if(name not in counts or name == "calls"):
+                raise ValueError("No scene call count named " + name)
+            
+            if(limit is not None and counts[name] > limit):
+                violations.append("%s %d over budget of %d" % (name, counts[name], limit))
+                
+        return violations
+    
+    """
+    Raises SceneCallBudgetExceeded if any count is over its limit, like assertWithin(created=0, deleted=0, readNodes=4 * numJoints, writes=1)
+    """
+    def assertWithin(self, **limits):
+        violations = self.getBudgetViolations(**limits)
+        
+        if(violations):
+            raise SceneCallBudgetExceeded(", ".join(violations) + " (calls: " + str(self.calls) + ")")
+
+"""
+Wraps another scene backend and counts every call made through it, for checking how many round trips to the scene an operation makes.
+Node creations and deletions come from the wrapped backend's watchNodeLifetimes while counting is on, so they're caught whether or not they go through the backend.
+
+proxy = CountingSceneBackend(backend)
+with proxy.counting() as counts:
+    jointCoplanarizer.coplanarizeJoints(chainEnd, chainRoot, plane, backend=proxy)
+counts.assertWithin(created=0, deleted=0, readNodes=4 * numJoints, writes=1)
+
+Plane modes use the current backend, so set the proxy with SceneBackend.setSceneBackend to count those.
+"""
+class CountingSceneBackend(CoplanarJointOrient.SceneBackend.SceneBackend.SceneBackend):
+    def __init__(self, backend):
+        self.backend = backend
+        self.counts = SceneCallCounts()
+        self.lifetimeWatcher = None
+        
+    """
+    Anything else, like MemorySceneBackend.addNode, goes straight to the wrapped backend without being counted
+    """
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+    
+    """
+    Starts counting from zero and returns the new counts
+    """
+    def resetCounts(self):
+        self.counts = SceneCallCounts()
+        
+        if(self.lifetimeWatcher is not None):
+            self.lifetimeWatcher.clear()
+            
+        self.lifetimeWatcher = self.backend.watchNodeLifetimes(self.counts.onNodeCreated, self.counts.onNodeDeleted)
+        
+        return self.counts
+    
+    def stopCounting(self):
+        if(self.lifetimeWatcher is not None):
+            self.lifetimeWatcher.clear()
+            self.lifetimeWatcher = None
+            
+    """
+    Context manager that counts from zero for its duration and gives back the counts
+    """
+    def counting(self):
+        return CountingContext(self)
+    
+    def resolveNode(self, node):
+        self.counts.countRead("resolveNode")
+        return self.backend.resolveNode(node)
+    
+    def resolveNodes(self, nodes):
+        self.counts.countRead("resolveNodes", len(nodes))
+        return self.backend.resolveNodes(nodes)
+    
+    def getNodeName(self, node):
+        self.counts.countRead("getNodeName")
+        return self.backend.getNodeName(node)
+    
+    def isJoint(self, node):
+        self.counts.countRead("isJoint")
+        return self.backend.isJoint(node)
+    
+    def isDescendant(self, child, parent):
+        self.counts.countRead("isDescendant", 2)
+        return self.backend.isDescendant(child, parent)
+    
+    def getWholeParentChain(self, parent, child):
+        self.counts.countRead("getWholeParentChain", 2)
+        return self.backend.getWholeParentChain(parent, child)
+    
+    def getInnerParentChain(self, parent, child):
+        self.counts.countRead("getInnerParentChain", 2)
+        return self.backend.getInnerParentChain(parent, child)
+    
+    def getParent(self, node):
+        self.counts.countRead("getParent")
+        return self.backend.getParent(node)
+    
+    def getTransformChildren(self, node):
+        self.counts.countRead("getTransformChildren")
+        return self.backend.getTransformChildren(node)
+    
+    def hasChildren(self, node):
+        self.counts.countRead("hasChildren")
+        return self.backend.hasChildren(node)
+    
+    def getWorldMatrices(self, nodes):
+        self.counts.countRead("getWorldMatrices", len(nodes))
+        return self.backend.getWorldMatrices(nodes)
+    
+    def getParentWorldMatrices(self, nodes):
+        self.counts.countRead("getParentWorldMatrices", len(nodes))
+        return self.backend.getParentWorldMatrices(nodes)
+    
+    def getWorldPositions(self, nodes):
+        self.counts.countRead("getWorldPositions", len(nodes))
+        return self.backend.getWorldPositions(nodes)
+    
+    def getWorldDirections(self, nodes, axis):
+        self.counts.countRead("getWorldDirections", len(nodes))
+        return self.backend.getWorldDirections(nodes, axis)
+    
+    def getRotateOrders(self, nodes):
+        self.counts.countRead("getRotateOrders", len(nodes))
+        return self.backend.getRotateOrders(nodes)
+    
+    def getJointOrients(self, nodes):
+        self.counts.countRead("getJointOrients", len(nodes))
+        return self.backend.getJointOrients(nodes)
+    
+    def getTransformChannelsForLocalMatrices(self, nodes, localMatrices, zeroRotates):
+        self.counts.countRead("getTransformChannelsForLocalMatrices", len(nodes))
+        return self.backend.getTransformChannelsForLocalMatrices(nodes, localMatrices, zeroRotates)
+    
+    def isTransformSettable(self, node):
+        self.counts.countRead("isTransformSettable")
+        return self.backend.isTransformSettable(node)
+    
+    def applyTransformChannels(self, nodes, values):
+        self.counts.countWrite("applyTransformChannels", len(nodes))
+        self.backend.applyTransformChannels(nodes, values)
+        
+    #doesn't touch the scene
+    def uiToInternal(self):
+        return self.backend.uiToInternal()
+    
+    def watchTransforms(self, onChangeFunc):
+        return self.backend.watchTransforms(onChangeFunc)
+    
+    def watchNodeLifetimes(self, onCreatedFunc, onDeletedFunc):
+        return self.backend.watchNodeLifetimes(onCreatedFunc, onDeletedFunc)
+    
+class CountingContext(object):
+    def __init__(self, proxy):
+        self.proxy = proxy
+        
+    def __enter__(self):
+        return self.proxy.resetCounts()
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        self.proxy.stopCounting()
+        return False
@@ -0,0 +1,146 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import maya.api.OpenMaya as om
+
+import CoplanarJointOrient.SceneBackend.SceneBackend
+import CoplanarJointOrient.mayaUtil
+import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.transformWatcher
+
+"""
+The Maya scene, through mayaUtil.  Nodes are NodeHandles.
+"""
+class MayaSceneBackend(CoplanarJointOrient.SceneBackend.SceneBackend.SceneBackend):
+    def resolveNode(self, node):
+        return CoplanarJointOrient.mayaUtil.getNodeHandle(node)
+
+    def resolveNodes(self, nodes):
+        return CoplanarJointOrient.mayaUtil.getNodeHandles(nodes)
+
+    def getNodeName(self, node):
+        return CoplanarJointOrient.mayaUtil.getNodeName(node)
+
+    def isJoint(self, node):
+        return CoplanarJointOrient.mayaUtil.isJoint(node)
+
+    def isDescendant(self, child, parent):
+        return CoplanarJointOrient.mayaUtil.isDescendant(child, parent)
+
+    def getWholeParentChain(self, parent, child):
+        return CoplanarJointOrient.mayaUtil.getWholeParentChain(parent, child)
+
+    def getInnerParentChain(self, parent, child):
+        return CoplanarJointOrient.mayaUtil.getInnerParentChain(parent, child)
+
+    def getParent(self, node):
+        return CoplanarJointOrient.mayaUtil.getSkeletonIndexFor(node).getParent(self.getNodeName(node))
+
+    def getTransformChildren(self, node):
+        return CoplanarJointOrient.mayaUtil.getObjectTransformChildren(node)
+
+    def hasChildren(self, node):
+        return bool(CoplanarJointOrient.mayaUtil.getObjectChildren(node))
+
+    def getWorldMatrices(self, nodes):
+        return CoplanarJointOrient.mayaUtil.getObjectWorldMatrices(nodes)
+
+    def getParentWorldMatrices(self, nodes):
+        return CoplanarJointOrient.mayaUtil.getObjectWorldMatrices(nodes, parents=True)
+
+    def getWorldPositions(self, nodes):
+        return CoplanarJointOrient.mayaUtil.getNodeWorldPositions(nodes)
+
+    def getWorldDirections(self, nodes, axis):
+        forward = CoplanarJointOrient.mayaMathUtil.forwardVector(axis)
+
+        return [list(forward.rotateBy(rotation)) for rotation in CoplanarJointOrient.mayaUtil.getObjectWorldRotations(nodes)]
+
+    def getRotateOrders(self, nodes):
+        return [om.MFnDependencyNode(dagPath.node()).findPlug("rotateOrder", False).asInt() for dagPath in CoplanarJointOrient.mayaUtil.getNodeDagPaths(nodes)]
+
+    def getJointOrients(self, nodes):
+        res = []
+
+        for dagPath in CoplanarJointOrient.mayaUtil.getNodeDagPaths(nodes):
+            fnNode = om.MFnDependencyNode(dagPath.node())
+            res.append(CoplanarJointOrient.mayaUtil.getPlugValues(fnNode, "jointOrient") if fnNode.hasAttribute("jointOrient") else [0.0, 0.0, 0.0])
+
+        return res
+
+    def getTransformChannelsForLocalMatrices(self, nodes, localMatrices, zeroRotates):
+        return [CoplanarJointOrient.mayaUtil.getTransformChannelsForLocalMatrix(node, localMatrix, zeroRotate) for node, localMatrix, zeroRotate in zip(nodes, localMatrices, zeroRotates)]
+
+    def isTransformSettable(self, node):
+        return CoplanarJointOrient.mayaUtil.isTransformSettable(node)
+
+    def applyTransformChannels(self, nodes, values):
+        CoplanarJointOrient.mayaUtil.applyTransformChannels(nodes, values)
+
+    def uiToInternal(self):
+        return om.MDistance.uiToInternal(1.0)
+
+    def watchTransforms(self, onChangeFunc):
+        return CoplanarJointOrient.transformWatcher.TransformWatcher(onChangeFunc)
+
+    def watchNodeLifetimes(self, onCreatedFunc, onDeletedFunc):
+        return MayaNodeLifetimeWatcher(onCreatedFunc, onDeletedFunc)
+
+    def getSnapshot(self):
+        index = CoplanarJointOrient.mayaUtil.getSkeletonIndex()
+        nodes = []
+
+        #the index is in sorted long name order which already has parents before their children
+        for name, dagPath in zip(index.names, CoplanarJointOrient.mayaUtil.getNodeDagPaths(index.names)):
+            fnNode = om.MFnDependencyNode(dagPath.node())
+            joint = fnNode.hasAttribute("jointOrient")
+
+            nodes.append({"name" : name, "parent" : index.getParent(name),
+                          "translate" : CoplanarJointOrient.mayaUtil.getPlugValues(fnNode, "translate"),
+                          "rotate" : CoplanarJointOrient.mayaUtil.getPlugValues(fnNode, "rotate"),
+                          "jointOrient" : CoplanarJointOrient.mayaUtil.getPlugValues(fnNode, "jointOrient") if joint else [0.0, 0.0, 0.0],
+                          "rotateOrder" : fnNode.findPlug("rotateOrder", False).asInt(),
+                          "scale" : CoplanarJointOrient.mayaUtil.getPlugValues(fnNode, "scale"),
+                          "joint" : joint,
+                          "locked" : not CoplanarJointOrient.mayaUtil.isTransformSettable(name)})
+
+        return {"nodes" : nodes}
+
+"""
+Node added and removed callbacks for MayaSceneBackend.watchNodeLifetimes
+"""
+class MayaNodeLifetimeWatcher(object):
+    def __init__(self, onCreatedFunc, onDeletedFunc):
+        self.onCreatedFunc = onCreatedFunc
+        self.onDeletedFunc = onDeletedFunc
+
+        self.callbackIds = [om.MDGMessage.addNodeAddedCallback(self.onNodeAdded, "dagNode"),
+                            om.MDGMessage.addNodeRemovedCallback(self.onNodeRemoved, "dagNode")]
+
+    def onNodeAdded(self, node, unusedClientData):
+        self.onCreatedFunc(om.MFnDependencyNode(node).name())
+
+    def onNodeRemoved(self, node, unusedClientData):
+        self.onDeletedFunc(om.MFnDependencyNode(node).name())
+
+    def clear(self):
+        if(self.callbackIds):
+            om.MMessage.removeCallbacks(self.callbackIds)
+            self.callbackIds = []
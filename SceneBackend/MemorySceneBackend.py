@@ -0,0 +1,367 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import numpy as np
+
+import CoplanarJointOrient.SceneBackend.SceneBackend
+import CoplanarJointOrient.batchMathUtil
+import CoplanarJointOrient.skeletonIndex
+
+"""
+Skeleton held in numpy arrays instead of a Maya scene, for running the solver, apply and plane modes without Maya, like in benchmarks.
+Nodes are long names.  Joints have translate, rotate, jointOrient, rotateOrder and scale, other transforms the same minus jointOrient and without any pivots.
+UI units are centimeters so there's no unit conversion.
+
+Changes made through applyTransformChannels or setChannels are passed on to watchers when flushChanges is called, which stands in for Maya going idle.
+"""
+class MemorySceneBackend(CoplanarJointOrient.SceneBackend.SceneBackend.SceneBackend):
+    def __init__(self):
+        #long names in the order they were added, a node's index is its position in here
+        self.names = []
+        self.indices = {}
+        self.parentIndices = []
+        self.depths = []
+        self.children = []
+
+        self.joints = []
+        self.locked = []
+
+        #channels as [x, y, z] lists in internal units, copied into arrays when needed
+        self.translates = []
+        self.rotates = []
+        self.jointOrients = []
+        self.scales = []
+        self.rotateOrders = []
+
+        #derived from the above and thrown away whenever anything changes
+        self.hierarchyIndex = None
+        self.worldMatrices = None
+
+        self.watchers = []
+        self.lifetimeWatchers = []
+
+    """
+    Adds a node under parent, or under the world if parent is None, and returns its long name
+    """
+    def addNode(self, name, parent=None, translate=(0, 0, 0), rotate=(0, 0, 0), jointOrient=(0, 0, 0), rotateOrder=0, scale=(1, 1, 1), joint=True, locked=False):
+        parentIndex = self.nodeIndex(parent) if parent is not None else -1
+        longName = (self.names[parentIndex] if parentIndex >= 0 else "") + "|" + name
+
+        if(longName in self.indices):
+            raise ValueError("Node " + longName + " already exists")
+
+        self.indices[longName] = len(self.names)
+        self.names.append(longName)
+        self.parentIndices.append(parentIndex)
+        self.depths.append(self.depths[parentIndex] + 1 if parentIndex >= 0 else 0)
+        self.children.append([])
+
+        if(parentIndex >= 0):
+            self.children[parentIndex].append(self.indices[longName])
+
+        self.joints.append(joint)
+        self.locked.append(locked)
+        self.translates.append(list(translate))
+        self.rotates.append(list(rotate))
+        self.jointOrients.append(list(jointOrient) if joint else [0.0, 0.0, 0.0])
+        self.scales.append(list(scale))
+        self.rotateOrders.append(rotateOrder)
+
+        self.hierarchyIndex = None
+        self.worldMatrices = None
+
+        for watcher in list(self.lifetimeWatchers):
+            watcher.onCreatedFunc(longName)
+
+        return longName
+
+    def getSnapshot(self):
+        return {"nodes" : [{"name" : name, "parent" : self.names[parentIndex] if parentIndex >= 0 else None,
+                            "translate" : list(translate), "rotate" : list(rotate), "jointOrient" : list(jointOrient), "rotateOrder" : rotateOrder,
+                            "scale" : list(scale), "joint" : joint, "locked" : locked}
+                           for name, parentIndex, translate, rotate, jointOrient, rotateOrder, scale, joint, locked
+                           in zip(self.names, self.parentIndices, self.translates, self.rotates, self.jointOrients, self.rotateOrders, self.scales, self.joints, self.locked)]}
+
+    """
+    Adds every node in a snapshot from getSnapshot on any backend
+    """
+    def loadSnapshot(self, snapshot):
+        for node in snapshot["nodes"]:
+            self.addNode(node["name"].rsplit("|", 1)[-1], parent=node["parent"], translate=node["translate"], rotate=node["rotate"], jointOrient=node["jointOrient"],
+                         rotateOrder=node["rotateOrder"], scale=node["scale"], joint=node["joint"], locked=node["locked"])
+
+    """
+    Sets any of a node's channels like an artist moving it around, and lets watchers know
+    """
+    def setChannels(self, node, translate=None, rotate=None, jointOrient=None):
+        index = self.nodeIndex(node)
+
+        if(translate is not None):
+            self.translates[index] = list(translate)
+
+        if(rotate is not None):
+            self.rotates[index] = list(rotate)
+
+        if(jointOrient is not None and self.joints[index]):
+            self.jointOrients[index] = list(jointOrient)
+
+        self.transformsChanged([index])
+
+    def getChannels(self, node):
+        index = self.nodeIndex(node)
+
+        return self.translates[index] + self.rotates[index] + self.jointOrients[index]
+
+    def nodeIndex(self, node):
+        #long names don't need the hierarchy index, which keeps adding nodes one after another cheap
+        if(node in self.indices):
+            return self.indices[node]
+
+        index = self.getHierarchyIndex().indexOf(node)
+
+        if(index is None):
+            raise ValueError("No node named " + str(node))
+
+        return self.indices[self.hierarchyIndex.names[index]]
+
+    def nodeIndices(self, nodes):
+        return np.array([self.nodeIndex(node) for node in nodes], dtype=np.int64)
+
+    def getHierarchyIndex(self):
+        if(self.hierarchyIndex is None):
+            self.hierarchyIndex = CoplanarJointOrient.skeletonIndex.SkeletonIndex(self.names)
+
+        return self.hierarchyIndex
+
+    def resolveNode(self, node):
+        if(node in self.indices):
+            return node
+
+        index = self.getHierarchyIndex().indexOf(node)
+
+        return self.hierarchyIndex.names[index] if index is not None else None
+
+    def getNodeName(self, node):
+        return self.resolveNode(node)
+
+    def isJoint(self, node):
+        return self.resolveNode(node) is not None and self.joints[self.nodeIndex(node)]
+
+    def isDescendant(self, child, parent):
+        return self.getHierarchyIndex().isDescendant(child, parent)
+
+    def getWholeParentChain(self, parent, child):
+        return self.getHierarchyIndex().getWholeParentChain(parent, child)
+
+    def getInnerParentChain(self, parent, child):
+        return self.getHierarchyIndex().getInnerParentChain(parent, child)
+
+    def getParent(self, node):
+        parentIndex = self.parentIndices[self.nodeIndex(node)]
+
+        return self.names[parentIndex] if parentIndex >= 0 else None
+
+    def getTransformChildren(self, node):
+        return [self.names[childIndex] for childIndex in self.children[self.nodeIndex(node)]]
+
+    def hasChildren(self, node):
+        return len(self.children[self.nodeIndex(node)]) > 0
+
+    """
+    Nx4x4 world matrices of every node, computed a whole level of the hierarchy at a time
+    """
+    def getAllWorldMatrices(self):
+        if(self.worldMatrices is not None):
+            return self.worldMatrices
+
+        numNodes = len(self.names)
+        batchMathUtil = CoplanarJointOrient.batchMathUtil
+
+        #scale * rotate * jointOrient, with row vectors scaling the rows
+        localRotations = np.matmul(batchMathUtil.eulerToMatrices(self.rotates, self.rotateOrders), batchMathUtil.eulerToMatrices(self.jointOrients))
+        localRotations *= np.asarray(self.scales, dtype=float).reshape(-1, 3)[:, :, np.newaxis]
+
+        worldMatrices = np.zeros((numNodes, 4, 4))
+        worldMatrices[:, :3, :3] = localRotations
+        worldMatrices[:, 3, :3] = np.asarray(self.translates, dtype=float).reshape(-1, 3)
+        worldMatrices[:, 3, 3] = 1.0
+
+        depths = np.asarray(self.depths, dtype=np.int64)
+        parentIndices = np.asarray(self.parentIndices, dtype=np.int64)
+
+        #roots are already in world space, everything else goes on top of its parent one level at a time
+        for depth in range(1, int(depths.max()) + 1 if numNodes else 1):
+            level = np.nonzero(depths == depth)[0]
+            worldMatrices[level] = np.matmul(worldMatrices[level], worldMatrices[parentIndices[level]])
+
+        self.worldMatrices = worldMatrices
+
+        return worldMatrices
+
+    def getWorldMatrices(self, nodes):
+        return [matrix.flatten().tolist() for matrix in self.getAllWorldMatrices()[self.nodeIndices(nodes)]]
+
+    def getParentWorldMatrices(self, nodes):
+        parentIndices = np.asarray(self.parentIndices, dtype=np.int64)[self.nodeIndices(nodes)]
+        matrices = np.where((parentIndices >= 0)[:, np.newaxis, np.newaxis], self.getAllWorldMatrices()[parentIndices], np.identity(4))
+
+        return [matrix.flatten().tolist() for matrix in matrices]
+
+    def getWorldPositions(self, nodes):
+        return self.getAllWorldMatrices()[self.nodeIndices(nodes), 3, :3].tolist()
+
+    def getWorldDirections(self, nodes, axis):
+        forward = CoplanarJointOrient.batchMathUtil.forwardVectors([axis.axis], [axis.negative])[0]
+
+        return CoplanarJointOrient.batchMathUtil.normalizeVectors(np.einsum("i,nij->nj", forward, self.getAllWorldMatrices()[self.nodeIndices(nodes), :3, :3])).tolist()
+
+    def getRotateOrders(self, nodes):
+        return [self.rotateOrders[index] for index in self.nodeIndices(nodes)]
+
+    def getJointOrients(self, nodes):
+        return [list(self.jointOrients[index]) for index in self.nodeIndices(nodes)]
+
+    def getTransformChannelsForLocalMatrices(self, nodes, localMatrices, zeroRotates):
+        batchMathUtil = CoplanarJointOrient.batchMathUtil
+
+        indices = self.nodeIndices(nodes)
+        localMatrices = np.asarray(localMatrices, dtype=float).reshape(-1, 4, 4)
+        zeroRotates = np.asarray(zeroRotates, dtype=bool)
+
+        joints = np.asarray(self.joints, dtype=bool)[indices]
+        rotateOrders = np.asarray(self.rotateOrders, dtype=np.int64)[indices]
+        rotates = np.asarray(self.rotates, dtype=float).reshape(-1, 3)[indices]
+
+        #take the scale back out of the rows to get rotate * jointOrient
+        rotations = localMatrices[:, :3, :3] / np.asarray(self.scales, dtype=float).reshape(-1, 3)[indices][:, :, np.newaxis]
+
+        #joints keep their rotate, or zero it, and the rest goes into jointOrient
+        rotates = np.where((joints & zeroRotates)[:, np.newaxis], 0.0, rotates)
+        orientMatrices = np.matmul(np.transpose(batchMathUtil.eulerToMatrices(rotates, rotateOrders), (0, 2, 1)), rotations)
+        jointOrients = np.where(joints[:, np.newaxis], batchMathUtil.matricesToEuler(orientMatrices), 0.0)
+
+        #other transforms get all of it in rotate
+        rotates = np.where(joints[:, np.newaxis], rotates, batchMathUtil.matricesToEuler(rotations, rotateOrders))
+
+        return np.concatenate([localMatrices[:, 3, :3], rotates, jointOrients], axis=1).tolist()
+
+    def isTransformSettable(self, node):
+        return not self.locked[self.nodeIndex(node)]
+
+    def applyTransformChannels(self, nodes, values):
+        indices = self.nodeIndices(nodes)
+
+        for index, nodeValues in zip(indices, values):
+            self.translates[index] = list(nodeValues[0:3])
+            self.rotates[index] = list(nodeValues[3:6])
+
+            if(self.joints[index]):
+                self.jointOrients[index] = list(nodeValues[6:9])
+
+        self.transformsChanged(indices)
+
+    def watchTransforms(self, onChangeFunc):
+        return MemoryTransformWatcher(self, onChangeFunc)
+
+    """
+    Nodes are only created by addNode and never deleted, so onDeletedFunc never gets called
+    """
+    def watchNodeLifetimes(self, onCreatedFunc, onDeletedFunc):
+        return MemoryNodeLifetimeWatcher(self, onCreatedFunc, onDeletedFunc)
+
+    """
+    Throws away world matrices and queues up the watched nodes that moved, which is anything at or under the changed nodes
+    """
+    def transformsChanged(self, indices):
+        self.worldMatrices = None
+
+        for watcher in self.watchers:
+            watcher.nodesMoved(indices)
+
+    """
+    Whether the node at index is the node at ancestorIndex or somewhere under it
+    """
+    def isAtOrUnder(self, index, ancestorIndex):
+        hierarchyIndex = self.getHierarchyIndex()
+        position = hierarchyIndex.indices[self.names[index]]
+        ancestorPosition = hierarchyIndex.indices[self.names[ancestorIndex]]
+
+        return position == ancestorPosition or hierarchyIndex.isDescendantIndex(position, ancestorPosition)
+
+    """
+    Hands queued up changes to the watchers, like Maya going idle after a drag
+    """
+    def flushChanges(self):
+        for watcher in list(self.watchers):
+            watcher.flush()
+
+"""
+MemorySceneBackend version of transformWatcher.TransformWatcher
+"""
+class MemoryTransformWatcher(object):
+    def __init__(self, backend, onChangeFunc):
+        self.backend = backend
+        self.onChangeFunc = onChangeFunc
+
+        #backend indices of the watched nodes
+        self.watchedIndices = []
+        self.pendingIndices = set()
+
+    def watch(self, nodes):
+        self.clear()
+
+        self.watchedIndices = list(self.backend.nodeIndices(nodes))
+        self.backend.watchers.append(self)
+
+    def clear(self):
+        if(self in self.backend.watchers):
+            self.backend.watchers.remove(self)
+
+        self.watchedIndices = []
+        self.pendingIndices.clear()
+
+    def nodesMoved(self, changedIndices):
+        for position, watchedIndex in enumerate(self.watchedIndices):
+            if(any(self.backend.isAtOrUnder(watchedIndex, changedIndex) for changedIndex in changedIndices)):
+                self.pendingIndices.add(position)
+
+    def flush(self):
+        if(not self.pendingIndices):
+            return
+
+        changedIndices = sorted(self.pendingIndices)
+        self.pendingIndices.clear()
+
+        self.onChangeFunc(changedIndices)
+
+"""
+MemorySceneBackend version of MayaSceneBackend.MayaNodeLifetimeWatcher
+"""
+class MemoryNodeLifetimeWatcher(object):
+    def __init__(self, backend, onCreatedFunc, onDeletedFunc):
+        self.backend = backend
+        self.onCreatedFunc = onCreatedFunc
+        self.onDeletedFunc = onDeletedFunc
+
+        backend.lifetimeWatchers.append(self)
+
+    def clear(self):
+        if(self in self.backend.lifetimeWatchers):
+            self.backend.lifetimeWatchers.remove(self)
@@ -0,0 +1,189 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+
+#backend everything goes through, the Maya one unless something else was set
+_currentBackend = None
+
+"""
+The scene backend the tool reads from and writes to.  Defaults to the Maya scene the first time it's asked for.
+"""
+def getSceneBackend():
+    global _currentBackend
+
+    if(_currentBackend is None):
+        #only imported when it's needed so everything else can be imported without Maya
+        import CoplanarJointOrient.SceneBackend.MayaSceneBackend
+        _currentBackend = CoplanarJointOrient.SceneBackend.MayaSceneBackend.MayaSceneBackend()
+
+    return _currentBackend
+
+"""
+Switches the scene backend, like to a MemorySceneBackend for running without Maya.  None goes back to the Maya scene.
+Returns the backend that was set before.
+"""
+def setSceneBackend(backend):
+    global _currentBackend
+
+    previousBackend = _currentBackend
+    _currentBackend = backend
+
+    return previousBackend
+
+"""
+Everything the tool needs from a scene, so the solver, apply and plane modes don't care whether they're talking to Maya or to a skeleton held in memory.
+
+Nodes are whatever resolveNode returns for the backend, and anything that takes nodes also takes names.
+Matrices are flat lists of 16 values with Maya's row vector convention, and everything is in internal units (centimeters and radians) unless it says UI units.
+"""
+class SceneBackend(object):
+    """
+    Node for a name, resolved once so later queries don't have to look the name up again.  None if the name isn't exactly one node.
+    """
+    def resolveNode(self, node):
+        raise NotImplementedError()
+
+    def resolveNodes(self, nodes):
+        return [self.resolveNode(node) for node in nodes]
+
+    """
+    Current long name of a node
+    """
+    def getNodeName(self, node):
+        raise NotImplementedError()
+
+    def isJoint(self, node):
+        raise NotImplementedError()
+
+    """
+    Returns whether or not a child is a descendant of a parent node
+    """
+    def isDescendant(self, child, parent):
+        raise NotImplementedError()
+
+    """
+    Long names between the root and end of a parent heirarchy in order from end to root, including end and root.
+    None if the parent isn't an ancestor of the child.
+    """
+    def getWholeParentChain(self, parent, child):
+        raise NotImplementedError()
+
+    """
+    Long names between the root and end of a parent heirarchy in order from end to root, not including end and root.
+    None if the parent isn't an ancestor of the child.
+    """
+    def getInnerParentChain(self, parent, child):
+        raise NotImplementedError()
+
+    """
+    Long name of a node's parent or None if it has no parent
+    """
+    def getParent(self, node):
+        raise NotImplementedError()
+
+    """
+    Long names of a node's transform children, joints included
+    """
+    def getTransformChildren(self, node):
+        raise NotImplementedError()
+
+    """
+    Whether a node has any children at all, shapes included
+    """
+    def hasChildren(self, node):
+        raise NotImplementedError()
+
+    def getWorldMatrices(self, nodes):
+        raise NotImplementedError()
+
+    """
+    World matrices of the nodes' parents, identity for nodes with no parent
+    """
+    def getParentWorldMatrices(self, nodes):
+        raise NotImplementedError()
+
+    """
+    World positions as [x, y, z] lists in UI units like the plane settings
+    """
+    def getWorldPositions(self, nodes):
+        raise NotImplementedError()
+
+    """
+    Unit [x, y, z] lists of where a mayaMathUtil.Axis of each node points in world space
+    """
+    def getWorldDirections(self, nodes, axis):
+        raise NotImplementedError()
+
+    """
+    rotateOrder attribute values, which are also the MEulerRotation and batchMathUtil rotation order values
+    """
+    def getRotateOrders(self, nodes):
+        raise NotImplementedError()
+
+    """
+    jointOrient values as [x, y, z] lists, zeros for nodes that aren't joints
+    """
+    def getJointOrients(self, nodes):
+        raise NotImplementedError()
+
+    """
+    Translate, rotate and jointOrient values that would give each node a local matrix, 9 values per node like mayaUtil.getTransformChannelsForLocalMatrix.
+    zeroRotates says for each joint whether the rotation goes entirely into jointOrient.
+    """
+    def getTransformChannelsForLocalMatrices(self, nodes, localMatrices, zeroRotates):
+        raise NotImplementedError()
+
+    """
+    Whether translate and rotate of a node can be set directly
+    """
+    def isTransformSettable(self, node):
+        raise NotImplementedError()
+
+    """
+    Writes translate, rotate and jointOrient values from getTransformChannelsForLocalMatrices, all as one undoable step where the backend has undo
+    """
+    def applyTransformChannels(self, nodes, values):
+        raise NotImplementedError()
+
+    """
+    How many internal units are in one UI unit
+    """
+    def uiToInternal(self):
+        return 1.0
+
+    """
+    Something with watch(nodes) and clear() like transformWatcher.TransformWatcher that calls onChangeFunc with the indices of the watched nodes that moved
+    """
+    def watchTransforms(self, onChangeFunc):
+        raise NotImplementedError()
+
+    """
+    Every transform in the scene as a dict that can be saved as JSON, {"nodes" : [...]} with parents listed before their children.
+    Each node is a dict with its long name, parent long name or None, translate, rotate, jointOrient, rotateOrder, scale, joint and locked, in internal units.
+    MemorySceneBackend.loadSnapshot turns one of these back into a scene.
+    """
+    def getSnapshot(self):
+        raise NotImplementedError()
+
+    """
+    Something with clear() that calls onCreatedFunc or onDeletedFunc with the name of every DAG node created or deleted in the scene until it's cleared
+    """
+    def watchNodeLifetimes(self, onCreatedFunc, onDeletedFunc):
+        raise NotImplementedError()
@@ -0,0 +1,106 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import maya.api.OpenMaya as om
+import json
+import numpy as np
+
+"""
+Plugin with an undoable command that writes translate, rotate and jointOrient for a batch of nodes in one go.
+This way one Apply ends up as one entry in the undo queue instead of dozens per joint.
+
+Loaded automatically by mayaUtil.applyTransformChannels so there's no need to load it by hand.
+The command takes a single json string so it doesn't depend on sharing Python state with the tool:
+{"nodes": [names...], "values": [[tx, ty, tz, rx, ry, rz, jox, joy, joz]...]}
+Values are in internal units, so centimeters and radians.  jointOrient values are ignored for nodes that aren't joints.
+"""
+
+COMMAND_NAME = "coplanarJointOrientApplyChannels"
+
+CHANNEL_ATTRIBUTES = ["translate", "rotate", "jointOrient"]
+
+def maya_useNewAPI():
+    pass
+
+class ApplyChannelsCommand(om.MPxCommand):
+    def __init__(self):
+        super(ApplyChannelsCommand, self).__init__()
+
+        #flat list of plugs, one per value that gets written
+        self.plugs = []
+
+        #the undo record is just these two arrays
+        self.beforeValues = None
+        self.afterValues = None
+
+    @staticmethod
+    def creator():
+        return ApplyChannelsCommand()
+
+    def doIt(self, args):
+        changes = json.loads(args.asString(0))
+
+        afterValues = []
+
+        for node, values in zip(changes["nodes"], changes["values"]):
+            selection = om.MSelectionList()
+            selection.add(node)
+            fnNode = om.MFnDependencyNode(selection.getDependNode(0))
+
+            for attributeIndex, attribute in enumerate(CHANNEL_ATTRIBUTES):
+                if(not fnNode.hasAttribute(attribute)):
+                    continue
+
+                plug = fnNode.findPlug(attribute, False)
+
+                for childIndex in range(3):
+                    self.plugs.append(plug.child(childIndex))
+                    afterValues.append(values[attributeIndex * 3 + childIndex])
+
+        self.beforeValues = np.array([plug.asDouble() for plug in self.plugs])
+        self.afterValues = np.array(afterValues, dtype=float)
+
+        self.redoIt()
+
+    def redoIt(self):
+        self.applyValues(self.afterValues)
+
+    def undoIt(self):
+        self.applyValues(self.beforeValues)
+
+    def isUndoable(self):
+        return True
+
+    """
+    Writes all the values in one modifier so it's all one transaction
+    """
+    def applyValues(self, values):
+        modifier = om.MDGModifier()
+
+        for plug, value in zip(self.plugs, values.tolist()):
+            modifier.newPlugValueDouble(plug, value)
+
+        modifier.doIt()
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin, "Ilya Seletsky", "0.9.0").registerCommand(COMMAND_NAME, ApplyChannelsCommand.creator)
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
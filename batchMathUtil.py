@@ -0,0 +1,203 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import numpy as np
+
+"""
+Batched numpy versions of the mayaMathUtil primitives for working on thousands of points, planes or rotations at once.
+Nothing in here imports Maya so it can be used by offline tools too.
+
+Conventions match Maya and mayaMathUtil:
+-Vectors are rows, so a vector is rotated by a matrix with vector * matrix
+-Planes are a unit normal and a distance like MPlane stores them, normal . point + distance = 0.  N planes are Nx3 normals and N distances.
+-Euler rotations are in radians with rotation orders using the MEulerRotation enum values
+"""
+
+#MEulerRotation rotation order enum values, in the same order as the rotateOrder attribute
+ROT_ORDER_XYZ = 0
+ROT_ORDER_YZX = 1
+ROT_ORDER_ZXY = 2
+ROT_ORDER_XZY = 3
+ROT_ORDER_YXZ = 4
+ROT_ORDER_ZYX = 5
+
+ROT_ORDER_STRINGS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+
+#which axis gets applied first, second and third for each rotation order
+ROT_ORDER_AXES = np.array([[0, 1, 2], [1, 2, 0], [2, 0, 1], [0, 2, 1], [1, 0, 2], [2, 1, 0]])
+
+"""
+Axis is used to track if something is on the x, y, or z axis and if it's pointing in the negative direction
+"""
+class Axis(object):
+    def __init__(self, axis=0, negative=False):
+        self.axis = axis
+        self.negative = negative
+
+"""
+Given rotation order strings like xyz, zxy, etc...
+Returns an array of the EulerRotation rot order enum values
+"""
+def nodeRotOrdersToEulerRotOrders(rotOrderStrs):
+    return np.array([ROT_ORDER_STRINGS.index(rotOrderStr.lower()) for rotOrderStr in rotOrderStrs], dtype=int)
+
+"""
+Returns an Nx3 array of unit vectors along axes given as arrays of axis indices (0:x, 1:y, 2:z) and whether each one is negative
+"""
+def forwardVectors(axes, negatives=None):
+    axes = np.atleast_1d(np.asarray(axes, dtype=int))
+    negatives = np.zeros(len(axes), dtype=bool) if negatives is None else np.broadcast_to(np.asarray(negatives, dtype=bool), axes.shape)
+
+    vectors = np.zeros((len(axes), 3))
+    vectors[np.arange(len(axes)), axes] = np.where(negatives, -1.0, 1.0)
+
+    return vectors
+
+"""
+Normalizes rows of an Nx3 array, rows with 0 length are left as 0 like MVector.normalize does
+"""
+def normalizeVectors(vectors):
+    vectors = np.asarray(vectors, dtype=float)
+    lengths = np.linalg.norm(vectors, axis=-1)[..., np.newaxis]
+
+    return np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0)
+
+"""
+Returns normals for planes that would be formed from 3 points, for Nx3 arrays of points
+"""
+def get3PointNormals(points0, points1, points2):
+    points0 = np.asarray(points0, dtype=float)
+    points1 = np.asarray(points1, dtype=float)
+    points2 = np.asarray(points2, dtype=float)
+
+    return normalizeVectors(np.cross(points2 - points1, points1 - points0))
+
+"""
+Returns normals for planes that would be formed from 2 points and an additional normal vector, for Nx3 arrays
+"""
+def get2PointNormals(points0, points1, normals):
+    lineVecs = np.asarray(points1, dtype=float) - np.asarray(points0, dtype=float)
+
+    #find the normal between the line formed by 2 points and the passed in normal
+    firstNorms = normalizeVectors(np.cross(np.asarray(normals, dtype=float), lineVecs))
+
+    #now the cross between the line and firstNorm is the result
+    return normalizeVectors(np.cross(firstNorms, lineVecs))
+
+"""
+Gets the closest points on planes to other points in space, AKA projecting points onto planes.
+Points are Nx3, planes are a single normal and distance or one per point.
+"""
+def closestPointsOnPlanes(points, planeNormals, planeDistances):
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    planeNormals = np.asarray(planeNormals, dtype=float)
+
+    signedDistances = np.sum(points * planeNormals, axis=-1) + planeDistances
+
+    return points - signedDistances[:, np.newaxis] * planeNormals
+
+"""
+Takes planes with normals and puts them at world positions.
+Returns the distances that go with the normals.
+"""
+def setPlaneWorldPositions(planeNormals, positions):
+    return -np.sum(np.asarray(planeNormals, dtype=float) * np.asarray(positions, dtype=float), axis=-1)
+
+"""
+Rotation matrices for each axis for an array of angles, shape is angles.shape + (3, 3)
+"""
+def axisRotationMatrices(axis, angles):
+    angles = np.asarray(angles, dtype=float)
+    cosines = np.cos(angles)
+    sines = np.sin(angles)
+
+    matrices = np.zeros(angles.shape + (3, 3))
+
+    #the other two axes in order so the rotation is right handed
+    first = (axis + 1) % 3
+    second = (axis + 2) % 3
+
+    matrices[..., axis, axis] = 1.0
+    matrices[..., first, first] = cosines
+    matrices[..., first, second] = sines
+    matrices[..., second, first] = -sines
+    matrices[..., second, second] = cosines
+
+    return matrices
+
+"""
+Nx3x3 rotation matrices for Nx3 euler rotations in radians.
+rotOrders is one rotation order enum value for all of them or one per rotation.
+"""
+def eulerToMatrices(eulers, rotOrders=ROT_ORDER_XYZ):
+    eulers = np.asarray(eulers, dtype=float).reshape(-1, 3)
+    rotOrders = np.broadcast_to(np.asarray(rotOrders, dtype=int), (len(eulers),))
+
+    axisMatrices = np.stack([axisRotationMatrices(axis, eulers[:, axis]) for axis in range(3)], axis=1)
+
+    rows = np.arange(len(eulers))
+    orderAxes = ROT_ORDER_AXES[rotOrders]
+
+    #the first axis of the order is applied first, which is leftmost with row vectors
+    return np.matmul(np.matmul(axisMatrices[rows, orderAxes[:, 0]], axisMatrices[rows, orderAxes[:, 1]]), axisMatrices[rows, orderAxes[:, 2]])
+
+"""
+Returns direction vectors oriented by Nx3 euler rotations in radians
+axes and negatives pick which axis is forward for each one, see forwardVectors
+"""
+def eulerToDirectionVectors(eulers, rotOrders=ROT_ORDER_XYZ, axes=0, negatives=False):
+    matrices = eulerToMatrices(eulers, rotOrders)
+
+    axes = np.broadcast_to(np.asarray(axes, dtype=int), (len(matrices),))
+    vectors = forwardVectors(axes, negatives)
+
+    return normalizeVectors(np.einsum("ni,nij->nj", vectors, matrices))
+
+"""
+Nx3 euler rotations in radians for Nx3x3 rotation matrices, the inverse of eulerToMatrices.
+rotOrders is one rotation order enum value for all of them or one per matrix.
+At gimbal lock the last axis of the order is left at 0 and the first one takes all of the rotation.
+"""
+def matricesToEuler(matrices, rotOrders=ROT_ORDER_XYZ):
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 3, 3)
+    rotOrders = np.broadcast_to(np.asarray(rotOrders, dtype=int), (len(matrices),))
+
+    rows = np.arange(len(matrices))
+    orderAxes = ROT_ORDER_AXES[rotOrders]
+    first = orderAxes[:, 0]
+    second = orderAxes[:, 1]
+    third = orderAxes[:, 2]
+
+    #orders that go x to y, y to z or z to x have the opposite signs of the ones going the other way
+    signs = np.where((second - first) % 3 == 1, 1.0, -1.0)
+
+    sinSecond = np.clip(-signs * matrices[rows, first, third], -1.0, 1.0)
+    cosSecond = np.sqrt(1.0 - sinSecond * sinSecond)
+    locked = cosSecond < 1.0e-9
+
+    eulers = np.zeros((len(matrices), 3))
+
+    eulers[rows, second] = np.arcsin(sinSecond)
+    eulers[rows, first] = np.where(locked,
+                                   np.arctan2(-signs * matrices[rows, third, second], matrices[rows, second, second]),
+                                   np.arctan2(signs * matrices[rows, second, third], matrices[rows, third, third]))
+    eulers[rows, third] = np.where(locked, 0.0, np.arctan2(signs * matrices[rows, first, second], matrices[rows, first, first]))
+
+    return eulers
@@ -0,0 +1,600 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import argparse
+import cProfile
+import gc
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import timeit
+
+#only in Python 3, peak memory just isn't recorded without it
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import numpy as np
+
+import CoplanarJointOrient.batchMathUtil
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.jointCoplanarizer
+import CoplanarJointOrient.jointPreview
+import CoplanarJointOrient.skeletonGenerator
+
+import CoplanarJointOrient.SceneBackend.CountingSceneBackend
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+"""
+Benchmarks for Apply, plane mode updates and the hierarchy helpers, run on generated skeletons.
+
+Every operation is timed on a freshly built scene each repeat, with building the scene left out of the timing.
+On top of the wall times, one more run of each operation is made under cProfile to count the function calls it makes, one under tracemalloc for its peak memory,
+and one through a CountingSceneBackend to count its reads, writes, node creations and deletions.  Those are checked against a budget for the operation
+that grows with the size of the skeleton the way it's supposed to, so an extra round trip per joint fails the run even if it doesn't show in the timings yet.
+Runs are appended to a JSON history file and can be compared against a run stored as the baseline.
+
+The scene is a MemorySceneBackend by default so this runs on plain Python with numpy.  With --scene maya the skeletons are built as joints in a new Maya scene instead,
+which goes through mayaUtil for everything, and needs mayapy.  Plane modes need OpenMaya either way so they're left out when it can't be imported.
+
+From mayapy or with the folder this package is in on the path:
+python -m CoplanarJointOrient.benchmark --label before
+python -m CoplanarJointOrient.benchmark --baseline before
+"""
+
+DEFAULT_HISTORY_PATH = "benchmarkHistory.json"
+
+#operations this much slower than the baseline are reported as regressions
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
+#and also slower by at least this many seconds, so timer noise on operations that only take microseconds isn't reported
+MIN_REGRESSION_TIME = 1.0e-4
+
+"""
+Settings for generating one skeleton to run every operation on
+"""
+class Workload(object):
+    def __init__(self, name, chainLength=10, branchingFactor=1, childrenPerJoint=0, numCharacters=1, seed=0):
+        self.name = name
+        self.chainLength = chainLength
+        self.branchingFactor = branchingFactor
+        self.childrenPerJoint = childrenPerJoint
+        self.numCharacters = numCharacters
+        self.seed = seed
+        
+        #generated the first time it's needed and reused for every operation
+        self.description = None
+        
+    def getDescription(self):
+        if(self.description is None):
+            self.description = CoplanarJointOrient.skeletonGenerator.generateSkeleton(self.chainLength, self.branchingFactor, self.childrenPerJoint, self.numCharacters, self.seed)
+            
+        return self.description
+    
+    def getSettings(self):
+        return {"chainLength" : self.chainLength, "branchingFactor" : self.branchingFactor, "childrenPerJoint" : self.childrenPerJoint, 
+                "numCharacters" : self.numCharacters, "seed" : self.seed}
+
+DEFAULT_WORKLOADS = [
+    Workload("shortChain", chainLength=3),
+    Workload("limb", chainLength=10, childrenPerJoint=1),
+    Workload("tail", chainLength=200),
+    Workload("branchy", chainLength=25, branchingFactor=6, childrenPerJoint=3),
+    Workload("crowd", chainLength=10, branchingFactor=5, childrenPerJoint=1, numCharacters=50),
+    Workload("longChain", chainLength=2000),
+]
+
+"""
+Scene built from a workload for one run of an operation, along with whatever the operation's setup wants to hand over to it
+"""
+class BenchmarkState(object):
+    def __init__(self, backend, longNames, chains):
+        self.backend = backend
+        self.longNames = longNames
+        
+        #(root, end) long names of every chain
+        self.chains = chains
+        
+        #(normal, distance) pairs in UI units fit to each chain, only filled in for operations that apply
+        self.planes = None
+        
+        self.planeMode = None
+        
+        self.jointPreview = None
+        
+"""
+Stands in for the tool's window for plane modes, which only need the chain, the axes and to be told when the plane changes
+"""
+class BenchmarkCoplanarizer(object):
+    def __init__(self, chainRoot, chainEnd):
+        import CoplanarJointOrient.MayaUIValue.AxisValue
+        import CoplanarJointOrient.mayaMathUtil
+        
+        self.chainRoot = chainRoot
+        self.chainEnd = chainEnd
+        
+        self.aimAxis = CoplanarJointOrient.MayaUIValue.AxisValue.AxisValue()
+        self.turnAxis = CoplanarJointOrient.MayaUIValue.AxisValue.AxisValue()
+        self.turnAxis.value = CoplanarJointOrient.mayaMathUtil.Axis(axis=2)
+        
+        self.numPlaneUpdates = 0
+        
+    def planeUpdated(self, planeMode):
+        self.numPlaneUpdates += 1
+
+"""
+Something to benchmark.  setup(workload, sceneType) builds a BenchmarkState, run(state) is what's timed and teardown(state) cleans up after it.
+budget(workload) gives the most scene calls a run may make as SceneCallCounts.assertWithin limits.
+minReads is the fewest scene reads a run has to make, so an operation that should read the scene but never reached the counted backend isn't taken as free.
+"""
+class Operation(object):
+    def __init__(self, name, setup, run, teardown=None, budget=None, minReads=0):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.teardown = teardown
+        self.budget = budget
+        self.minReads = minReads
+        
+    def runTeardown(self, state):
+        if(self.teardown is not None):
+            self.teardown(state)
+            
+    def getBudget(self, workload):
+        return self.budget(workload) if self.budget is not None else {}
+    
+    def getBudgetViolations(self, workload, sceneCalls):
+        violations = sceneCalls.getBudgetViolations(**self.getBudget(workload))
+        
+        if(sceneCalls.reads < self.minReads):
+            violations.append("reads %d under the minimum of %d" % (sceneCalls.reads, self.minReads))
+            
+        return violations
+            
+def buildScene(workload, sceneType):
+    description = workload.getDescription()
+    
+    if(sceneType == "maya"):
+        import maya.cmds as cmds
+        
+        cmds.file(new=True, force=True)
+        longNames = CoplanarJointOrient.skeletonGenerator.buildMayaSkeleton(description)
+        
+        #no backend set means the Maya one
+        CoplanarJointOrient.SceneBackend.SceneBackend.setSceneBackend(None)
+        backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+    else:
+        backend, longNames = CoplanarJointOrient.skeletonGenerator.buildMemorySkeleton(description)
+        
+    #plane modes go through the current backend
+    CoplanarJointOrient.SceneBackend.SceneBackend.setSceneBackend(backend)
+    
+    return BenchmarkState(backend, longNames, [(longNames[root], longNames[end]) for root, end in description.chains])
+
+"""
+Plane through a chain's joints as a (normal, distance) pair in UI units, for applying with
+"""
+def fitChainPlane(backend, chain):
+    normal, point = CoplanarJointOrient.chainSolver.fitPlane(backend.getWorldPositions(backend.getWholeParentChain(chain[0], chain[1])))
+    
+    return normal.tolist(), -float(normal.dot(point))
+
+def setupApply(workload, sceneType, numChains=None):
+    state = buildScene(workload, sceneType)
+    state.planes = [fitChainPlane(state.backend, chain) for chain in state.chains[:numChains]]
+    
+    return state
+
+def setupWarmHierarchy(workload, sceneType):
+    state = buildScene(workload, sceneType)
+    
+    #the first query builds the hierarchy index, which the cold operation times
+    state.backend.getWholeParentChain(state.chains[0][0], state.chains[0][1])
+    
+    return state
+
+def runCoplanarizeJoints(state):
+    chainRoot, chainEnd = state.chains[0]
+    
+    CoplanarJointOrient.jointCoplanarizer.coplanarizeJoints(chainEnd, chainRoot, state.planes[0], backend=state.backend)
+    
+def runCoplanarizeJointChains(state):
+    CoplanarJointOrient.jointCoplanarizer.coplanarizeJointChains([CoplanarJointOrient.jointCoplanarizer.ChainSpec(chainEnd, chainRoot, plane) for (chainRoot, chainEnd), plane in zip(state.chains, state.planes)], 
+                                             backend=state.backend)
+    
+def setupJointPreview(workload, sceneType):
+    state = setupApply(workload, sceneType, 1)
+    
+    joints = state.backend.getWholeParentChain(state.chains[0][0], state.chains[0][1])
+    joints.reverse()
+    
+    #the whole chain every time, the frame budget is for checking against rather than for the preview to adapt to here
+    state.jointPreview = CoplanarJointOrient.jointPreview.JointPreview(frameBudget=float("inf"))
+    state.jointPreview.setChain(joints, state.backend)
+    
+    return state
+
+def runJointPreview(state):
+    normal, distance = state.planes[0]
+    
+    state.jointPreview.refresh(normal, distance * state.backend.uiToInternal(), CoplanarJointOrient.batchMathUtil.Axis(axis=0), CoplanarJointOrient.batchMathUtil.Axis(axis=2))
+    
+"""
+Preview already solved once, so what's timed is the refresh after dragging the plane along its normal
+"""
+def setupJointPreviewPlaneMoved(workload, sceneType):
+    state = setupJointPreview(workload, sceneType)
+    runJointPreview(state)
+    
+    normal, distance = state.planes[0]
+    state.planes[0] = (normal, distance + 1.0)
+    
+    return state
+    
+def runGetWholeParentChain(state):
+    for chainRoot, chainEnd in state.chains:
+        state.backend.getWholeParentChain(chainRoot, chainEnd)
+        
+def runGetInnerParentChain(state):
+    for chainRoot, chainEnd in state.chains:
+        state.backend.getInnerParentChain(chainRoot, chainEnd)
+        
+def runIsDescendant(state):
+    otherRoot = state.chains[-1][0]
+    
+    for chainRoot, chainEnd in state.chains:
+        state.backend.isDescendant(chainEnd, chainRoot)
+        state.backend.isDescendant(chainRoot, chainEnd)
+        state.backend.isDescendant(chainEnd, otherRoot)
+        
+def runGetTransformChildren(state):
+    for joint in state.backend.getWholeParentChain(state.chains[0][0], state.chains[0][1]):
+        state.backend.getTransformChildren(joint)
+        
+"""
+(name, class, readsChain) for every plane mode, or an empty list if OpenMaya can't be imported.
+readsChain is whether picking a chain reads the chain's joints from the scene.
+"""
+def getPlaneModeClasses():
+    try:
+        import CoplanarJointOrient.PlaneMode.AdvancedPlaneMode
+        import CoplanarJointOrient.PlaneMode.Automatic3PointPlaneMode
+        import CoplanarJointOrient.PlaneMode.AutomaticOrientedPlaneMode
+        import CoplanarJointOrient.PlaneMode.AxisAlignedPlaneMode
+        import CoplanarJointOrient.PlaneMode.BestFitPlaneMode
+        import CoplanarJointOrient.PlaneMode.InteractivePlaneMode
+        import CoplanarJointOrient.PlaneMode.PiecewisePlaneMode
+    except ImportError:
+        return []
+    
+    return [("AdvancedPlaneMode", CoplanarJointOrient.PlaneMode.AdvancedPlaneMode.AdvancedPlaneMode, False),
+            ("AxisAlignedPlaneMode", CoplanarJointOrient.PlaneMode.AxisAlignedPlaneMode.AxisAlignedPlaneMode, False),
+            ("Automatic3PointPlaneMode", CoplanarJointOrient.PlaneMode.Automatic3PointPlaneMode.Automatic3PointPlaneMode, True),
+            ("AutomaticOrientedPlaneMode", CoplanarJointOrient.PlaneMode.AutomaticOrientedPlaneMode.AutomaticOrientedPlaneMode, True),
+            ("PiecewisePlaneMode", CoplanarJointOrient.PlaneMode.PiecewisePlaneMode.PiecewisePlaneMode, True),
+            ("BestFitPlaneMode", CoplanarJointOrient.PlaneMode.BestFitPlaneMode.BestFitPlaneMode, True),
+            ("InteractivePlaneMode", CoplanarJointOrient.PlaneMode.InteractivePlaneMode.InteractivePlaneMode, True)]
+
+def setupPlaneMode(planeModeClass, chainUpdated, workload, sceneType):
+    state = buildScene(workload, sceneType)
+    
+    state.planeMode = planeModeClass(BenchmarkCoplanarizer(state.chains[0][0], state.chains[0][1]))
+    state.planeMode.setupUI(None)
+    
+    if(chainUpdated):
+        state.planeMode.coplanarizerChainUpdated()
+        
+    return state
+
+def teardownPlaneMode(state):
+    state.planeMode.release()
+
+"""
+Scene call budgets.  Nothing an operation does should create or delete nodes.
+Apply reads each chain in a handful of batched calls, and then makes a couple of reads per joint and child to find and check the children it has to compensate.
+Hierarchy queries are a single read each and plane modes read the whole chain in batches, so neither should grow with the chain length.
+"""
+def applyBudget(workload, numChains):
+    numJoints = numChains * workload.chainLength
+    numNodes = numJoints * (1 + workload.childrenPerJoint)
+    
+    return {"created" : 0, "deleted" : 0, "writes" : 1, "reads" : 2 * numNodes + 8 * numChains, "readNodes" : 8 * numNodes + 8 * numChains}
+
+def hierarchyBudget(workload, readsPerChain):
+    numChains = workload.numCharacters * workload.branchingFactor
+    
+    return {"created" : 0, "deleted" : 0, "writes" : 0, "reads" : readsPerChain * numChains}
+
+def planeModeBudget(workload):
+    return {"created" : 0, "deleted" : 0, "writes" : 0, "reads" : 8}
+
+"""
+Every operation there is to benchmark, leaving out plane modes when they can't run
+"""
+def getOperations():
+    operations = [
+        Operation("coplanarizeJoints", lambda workload, sceneType: setupApply(workload, sceneType, 1), runCoplanarizeJoints, 
+                  budget=lambda workload: applyBudget(workload, 1)),
+        Operation("coplanarizeJointChains", setupApply, runCoplanarizeJointChains, 
+                  budget=lambda workload: applyBudget(workload, workload.numCharacters * workload.branchingFactor)),
+        Operation("getWholeParentChain.cold", buildScene, runGetWholeParentChain, budget=lambda workload: hierarchyBudget(workload, 1)),
+        Operation("getWholeParentChain", setupWarmHierarchy, runGetWholeParentChain, budget=lambda workload: hierarchyBudget(workload, 1)),
+        Operation("getInnerParentChain", setupWarmHierarchy, runGetInnerParentChain, budget=lambda workload: hierarchyBudget(workload, 1)),
+        Operation("isDescendant", setupWarmHierarchy, runIsDescendant, budget=lambda workload: hierarchyBudget(workload, 3)),
+        Operation("getTransformChildren", setupWarmHierarchy, runGetTransformChildren, 
+                  budget=lambda workload: {"created" : 0, "deleted" : 0, "writes" : 0, "reads" : workload.chainLength + 1}),
+        Operation("JointPreview.refresh", setupJointPreview, runJointPreview, 
+                  budget=lambda workload: {"created" : 0, "deleted" : 0, "writes" : 0, "reads" : 0}),
+        Operation("JointPreview.refresh.planeMoved", setupJointPreviewPlaneMoved, runJointPreview, 
+                  budget=lambda workload: {"created" : 0, "deleted" : 0, "writes" : 0, "reads" : 0}),
+    ]
+    
+    for name, planeModeClass, readsChain in getPlaneModeClasses():
+        operations.append(Operation(name + ".coplanarizerChainUpdated", 
+                                    lambda workload, sceneType, planeModeClass=planeModeClass: setupPlaneMode(planeModeClass, False, workload, sceneType), 
+                                    lambda state: state.planeMode.coplanarizerChainUpdated(), teardownPlaneMode, planeModeBudget, 1 if readsChain else 0))
+        operations.append(Operation(name + ".updatePlane", 
+                                    lambda workload, sceneType, planeModeClass=planeModeClass: setupPlaneMode(planeModeClass, True, workload, sceneType), 
+                                    lambda state: state.planeMode.updatePlane(), teardownPlaneMode, planeModeBudget))
+        
+    return operations
+
+"""
+Times an operation over a number of repeats and takes one run each to count calls, peak memory and scene calls.
+Returns the results as a dictionary for the history file, times in seconds and memory in bytes, with any scene call budget violations in budgetViolations.
+"""
+def measureOperation(operation, workload, sceneType, repeats):
+    times = []
+    
+    for unused in range(repeats):
+        state = operation.setup(workload, sceneType)
+        
+        #garbage from building the scene shouldn't get collected in the middle of the timing
+        gc.collect()
+        
+        try:
+            start = timeit.default_timer()
+            operation.run(state)
+            times.append(timeit.default_timer() - start)
+        finally:
+            operation.runTeardown(state)
+        
+    state = operation.setup(workload, sceneType)
+    profiler = cProfile.Profile()
+    
+    try:
+        profiler.runcall(operation.run, state)
+    finally:
+        operation.runTeardown(state)
+        
+    calls = pstats.Stats(profiler).total_calls
+    
+    peakMemory = None
+    
+    if(tracemalloc is not None):
+        state = operation.setup(workload, sceneType)
+        gc.collect()
+        tracemalloc.start()
+        
+        try:
+            operation.run(state)
+            peakMemory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            operation.runTeardown(state)
+            
+    state = operation.setup(workload, sceneType)
+    
+    #plane modes get the current backend when they need it so they're counted too
+    state.backend = CoplanarJointOrient.SceneBackend.CountingSceneBackend.CountingSceneBackend(state.backend)
+    CoplanarJointOrient.SceneBackend.SceneBackend.setSceneBackend(state.backend)
+    
+    try:
+        with state.backend.counting() as sceneCalls:
+            operation.run(state)
+    finally:
+        operation.runTeardown(state)
+        
+    return {"minTime" : min(times), "medianTime" : float(np.median(times)), "meanTime" : float(np.mean(times)), "times" : times, 
+            "repeats" : repeats, "calls" : calls, "peakMemory" : peakMemory, 
+            "sceneCalls" : sceneCalls.toDict(), "budgetViolations" : operation.getBudgetViolations(workload, sceneCalls)}
+
+"""
+Runs every operation on every workload and returns the run as a dictionary for the history file.
+operationNames limits it to the operations with those names.  Progress is printed as it goes if verbose is set.
+"""
+def runBenchmarks(workloads=DEFAULT_WORKLOADS, sceneType="memory", repeats=5, operationNames=None, label=None, verbose=True):
+    operations = [operation for operation in getOperations() if operationNames is None or operation.name in operationNames]
+    
+    run = {"label" : label or time.strftime("%Y-%m-%d %H:%M:%S"), "timestamp" : time.time(), "scene" : sceneType, "environment" : getEnvironment(sceneType), "workloads" : {}}
+    
+    previousBackend = CoplanarJointOrient.SceneBackend.SceneBackend.setSceneBackend(None)
+    
+    try:
+        for workload in workloads:
+            results = {}
+            run["workloads"][workload.name] = {"settings" : workload.getSettings(), "numNodes" : len(workload.getDescription()), "operations" : results}
+            
+            for operation in operations:
+                results[operation.name] = measureOperation(operation, workload, sceneType, repeats)
+                
+                if(verbose):
+                    print("%-16s %-48s %10.3f ms %10d calls %6d scene reads" % (workload.name, operation.name, results[operation.name]["minTime"] * 1000.0, 
+                                                                          results[operation.name]["calls"], results[operation.name]["sceneCalls"]["reads"]))
+                    
+                    for violation in results[operation.name]["budgetViolations"]:
+                        print("    BUDGET: " + violation)
+    finally:
+        CoplanarJointOrient.SceneBackend.SceneBackend.setSceneBackend(previousBackend)
+        
+    return run
+
+def getEnvironment(sceneType):
+    environment = {"python" : platform.python_version(), "numpy" : np.__version__, "platform" : platform.platform(), "machine" : platform.machine()}
+    
+    if(sceneType == "maya"):
+        import maya.cmds as cmds
+        environment["maya"] = cmds.about(version=True)
+        
+    return environment
+
+"""
+History file contents, an empty history if the file doesn't exist yet
+"""
+def loadHistory(path):
+    if(not os.path.exists(path)):
+        return {"baseline" : None, "runs" : []}
+    
+    with open(path, "r") as historyFile:
+        return json.load(historyFile)
+    
+def saveHistory(path, history):
+    with open(path, "w") as historyFile:
+        json.dump(history, historyFile, indent=1, sort_keys=True)
+        
+"""
+Latest run in the history with the given label, or None if there isn't one
+"""
+def findRun(history, label):
+    for run in reversed(history["runs"]):
+        if(run["label"] == label):
+            return run
+        
+    return None
+
+"""
+Compares every operation the two runs have in common.
+Returns a list of dictionaries with the workload, operation, the ratio of the min times, calls and peak memory of both runs and whether it's a regression,
+meaning it got slower by more than threshold and MIN_REGRESSION_TIME or makes more calls.
+"""
+def compareRuns(baselineRun, run, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    comparisons = []
+    
+    for workloadName, workloadResults in sorted(run["workloads"].items()):
+        baselineWorkload = baselineRun["workloads"].get(workloadName)
+        
+        #same workload name but a different skeleton isn't comparable
+        if(baselineWorkload is None or baselineWorkload["settings"] != workloadResults["settings"]):
+            continue
+        
+        for operationName, results in sorted(workloadResults["operations"].items()):
+            baselineResults = baselineWorkload["operations"].get(operationName)
+            
+            if(baselineResults is None):
+                continue
+            
+            timeRatio = results["minTime"] / baselineResults["minTime"] if baselineResults["minTime"] > 0 else float("inf")
+            
+            comparisons.append({"workload" : workloadName, "operation" : operationName, "timeRatio" : timeRatio, 
+                                "baselineCalls" : baselineResults["calls"], "calls" : results["calls"],
+                                "baselinePeakMemory" : baselineResults["peakMemory"], "peakMemory" : results["peakMemory"],
+                                "regression" : (timeRatio > 1.0 + threshold and results["minTime"] - baselineResults["minTime"] > MIN_REGRESSION_TIME) 
+                                               or results["calls"] > baselineResults["calls"]})
+            
+    return comparisons
+
+def printComparisons(baselineRun, comparisons):
+    print("Compared against " + baselineRun["label"])
+    
+    for comparison in comparisons:
+        print("%-16s %-48s %6.2fx %10d -> %-10d calls%s" % (comparison["workload"], comparison["operation"], comparison["timeRatio"], 
+                                                       comparison["baselineCalls"], comparison["calls"], "  REGRESSION" if comparison["regression"] else ""))
+        
+def initializeMaya():
+    import maya.standalone
+    
+    try:
+        maya.standalone.initialize()
+    except RuntimeError:
+        #already running inside Maya
+        pass
+
+"""
+Every (workload, operation, violation) where an operation in a run went over its scene call budget
+"""
+def getBudgetViolations(run):
+    return [(workloadName, operationName, violation) for workloadName, workloadResults in sorted(run["workloads"].items()) 
+            for operationName, results in sorted(workloadResults["operations"].items()) for violation in results.get("budgetViolations", [])]
+
+"""
+Command line entry point.  Returns 1 if any operation went over its scene call budget, or if the run was compared against a baseline and anything regressed, 0 otherwise.
+"""
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the coplanar joint orient tool on generated skeletons")
+    parser.add_argument("--scene", choices=["memory", "maya"], default="memory", help="build the skeletons in memory or in a new Maya scene")
+    parser.add_argument("--workload", action="append", help="only run the default workload with this name, can be given more than once")
+    parser.add_argument("--chain-length", type=int, help="run a single custom workload with chains of this many joints instead of the default workloads")
+    parser.add_argument("--branching-factor", type=int, default=1, help="chains per character for the custom workload")
+    parser.add_argument("--children-per-joint", type=int, default=0, help="extra leaf joints under every chain joint for the custom workload")
+    parser.add_argument("--characters", type=int, default=1, help="characters for the custom workload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--operation", action="append", help="only run the operation with this name, can be given more than once")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="JSON file runs are added to")
+    parser.add_argument("--label", help="name to store the run under, the current time by default")
+    parser.add_argument("--baseline", help="label of a run in the history to compare against, the stored baseline by default")
+    parser.add_argument("--set-baseline", action="store_true", help="make this run the baseline future runs are compared against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="how much slower than the baseline counts as a regression, 0.1 being 10%%")
+    parser.add_argument("--no-save", action="store_true", help="don't add this run to the history")
+    options = parser.parse_args(args)
+    
+    if(options.chain_length is not None):
+        workloads = [Workload("custom", options.chain_length, options.branching_factor, options.children_per_joint, options.characters, options.seed)]
+    else:
+        workloads = [workload for workload in DEFAULT_WORKLOADS if options.workload is None or workload.name in options.workload]
+        
+    if(options.scene == "maya"):
+        initializeMaya()
+        
+    run = runBenchmarks(workloads, options.scene, options.repeats, options.operation, options.label)
+    
+    history = loadHistory(options.history)
+    baselineLabel = options.baseline or history["baseline"]
+    baselineRun = findRun(history, baselineLabel) if baselineLabel is not None else None
+    
+    res = 1 if getBudgetViolations(run) else 0
+    
+    if(baselineRun is not None):
+        comparisons = compareRuns(baselineRun, run, options.threshold)
+        printComparisons(baselineRun, comparisons)
+        
+        if(any(comparison["regression"] for comparison in comparisons)):
+            res = 1
+    elif(baselineLabel is not None):
+        print("No run labeled " + baselineLabel + " in " + options.history)
+        
+    if(not options.no_save):
+        history["runs"].append(run)
+        
+        if(options.set_baseline):
+            history["baseline"] = run["label"]
+            
+        saveHistory(options.history, history)
+        
+    return res
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import numpy as np
+
+import CoplanarJointOrient.batchMathUtil
+
+"""
+Vectorized solver for a whole joint chain.
+Everything in here works on plain arrays so it doesn't need Maya.  The scene is only touched by the caller when reading the chain and writing the results back.
+
+Matrices follow Maya's row vector convention, so row i of a rotation matrix is where local axis i points in world space.
+"""
+
+#direction vectors shorter than this are treated as degenerate and the joint is left unoriented
+DEGENERATE_EPSILON = 1.0e-9
+
+#joints that would move less than this many centimeters and turn less than this many radians are left alone
+DEFAULT_POSITION_EPSILON = 1.0e-4
+DEFAULT_ANGLE_EPSILON = 1.0e-5
+
+"""
+Returns a unit numpy vector for a mayaMathUtil.Axis
+"""
+def axisToVector(axis):
+    return CoplanarJointOrient.batchMathUtil.forwardVectors([axis.axis], [axis.negative])[0]
+
+"""
+World directions that a local axis points in for Nx4x4 world matrices (or a single one), as an Nx3 array of unit vectors
+"""
+def worldAxisDirections(worldMatrices, axis):
+    worldMatrices = np.asarray(worldMatrices, dtype=float).reshape(-1, 4, 4)
+
+    directions = worldMatrices[:, axis.axis, :3] * (-1.0 if axis.negative else 1.0)
+
+    return directions / np.linalg.norm(directions, axis=1)[:, np.newaxis]
+
+"""
+Projects an Nx3 array of points onto a plane given as a normal and distance like MPlane stores them (normal . point + distance = 0)
+Also works with one plane per point, with Nx3 normals and N distances.
+"""
+def projectPointsOnPlane(points, planeNormal, planeDistance):
+    return CoplanarJointOrient.batchMathUtil.closestPointsOnPlanes(points, planeNormal, planeDistance)
+
+"""
+Builds world rotation matrices that point the local aim axis along each direction and the local up axis as close as possible to the world up vector.
+This is the same frame an aimConstraint with worldUpType="vector" computes.
+directions is Nx3, worldUp is a single vector or one per direction.
+Returns Nx3x3 rotation matrices and a mask of which rows were valid.
+"""
+def aimFrames(directions, worldUp, aimVector, upVector):
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    worldUp = np.asarray(worldUp, dtype=float)
+
+    lengths = np.linalg.norm(directions, axis=1)
+    valid = lengths > DEGENERATE_EPSILON
+    aims = directions / np.where(valid, lengths, 1.0)[:, np.newaxis]
+
+    #remove the part of the world up that's along the aim direction
+    ups = worldUp - aims * np.sum(aims * worldUp, axis=-1)[:, np.newaxis]
+    upLengths = np.linalg.norm(ups, axis=1)
+    valid &= upLengths > DEGENERATE_EPSILON
+    ups /= np.where(upLengths > DEGENERATE_EPSILON, upLengths, 1.0)[:, np.newaxis]
+
+    worldFrames = np.stack((aims, ups, np.cross(aims, ups)), axis=1)
+
+    localFrame = np.array([aimVector, upVector, np.cross(aimVector, upVector)], dtype=float)
+
+    #local frame is orthonormal so its inverse is its transpose
+    rotations = np.einsum("ji,njk->nik", localFrame, worldFrames)
+    rotations[~valid] = np.identity(3)
+
+    return rotations, valid
+
+"""
+Solves a whole joint chain against a plane in one pass.
+
+positions: Nx3 world positions ordered from the chain root to the chain end
+planeNormal, planeDistance: the alignment plane, the same values MPlane.normal() and MPlane.distance() return.  Can also be Nx3 normals and N distances to give each joint its own plane.
+forwardAxis, rotationAxis: mayaMathUtil.Axis values for the aim and turn axes
+endAimDirection: world direction the chain end currently aims in.  Pass None if the end joint has children of its own and shouldn't be reoriented.
+
+Returns a tuple of:
+projected Nx3 positions on the plane,
+Nx3x3 world rotation matrices,
+a mask of which joints should be reoriented
+"""
+def solveChain(positions, planeNormal, planeDistance, forwardAxis, rotationAxis, endAimDirection=None):
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    normal = np.asarray(planeNormal, dtype=float)
+
+    projected = projectPointsOnPlane(positions, normal, planeDistance)
+
+    #every joint aims at its projected child
+    directions = np.empty_like(projected)
+    directions[:-1] = projected[1:] - projected[:-1]
+
+    #the last joint keeps its previous aim direction flattened onto the plane
+    if(endAimDirection is None):
+        directions[-1] = 0
+    else:
+        endAim = np.asarray(endAimDirection, dtype=float)
+        endNormal = normal.reshape(-1, 3)[-1]
+        directions[-1] = endAim - endNormal * endAim.dot(endNormal)
+
+    rotations, oriented = aimFrames(directions, normal, axisToVector(forwardAxis), axisToVector(rotationAxis))
+
+    return projected, rotations, oriented
+
+"""
+Fits a least squares plane to each of K sets of points at once, passed in as a KxMx3 array.
+Returns Kx3 unit normals and Kx3 centroids.  A plane's normal is the direction the points vary the least in.
+"""
+def fitPlanes(pointSets):
+    pointSets = np.asarray(pointSets, dtype=float)
+
+    centroids = pointSets.mean(axis=1)
+
+    #the last right singular vector of the centered points is the normal
+    unused, unused, vt = np.linalg.svd(pointSets - centroids[:, np.newaxis, :], full_matrices=False)
+
+    return vt[:, -1, :], centroids
+
+"""
+Fits a least squares plane to an Nx3 array of points.
+If keepEnds is set the plane is forced to pass exactly through the first and last points and only the rest are fit.
+Returns a unit normal and a point on the plane.
+"""
+def fitPlane(positions, keepEnds=False):
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+
+    if(not keepEnds):
+        normals, centroids = fitPlanes(positions[np.newaxis])
+
+        return normals[0], centroids[0]
+
+    #the normal has to be perpendicular to the line between the ends, so fit in the 2D space perpendicular to it
+    line = positions[-1] - positions[0]
+    line /= np.linalg.norm(line)
+
+    unused, unused, vt = np.linalg.svd(line[np.newaxis], full_matrices=True)
+    perpendicularBasis = vt[1:]
+
+    offsets = positions - positions[0]
+    unused, unused, vt = np.linalg.svd(offsets.dot(perpendicularBasis.T), full_matrices=False)
+
+    return vt[-1].dot(perpendicularBasis), positions[0].copy()
+
+"""
+Splits a chain into overlapping windows of windowSize joints and fits a plane to each window, all in one pass.
+Consecutive windows overlap by overlap joints and the last window is moved back so it ends at the chain end.
+Normals are flipped as needed so they all face the same way as the first window's normal, or referenceNormal if one is given.
+
+If blend is set, each joint gets a weighted average of the planes of every window it's in, weighted by how close to the middle of the window it is, so the planes change smoothly down the chain.
+Otherwise each joint takes the plane of the window it's most centered in.
+
+Returns one plane per joint as Nx3 normals and N distances, like solveChain takes.
+"""
+def fitWindowPlanes(positions, windowSize, overlap, blend=True, referenceNormal=None):
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    numJoints = len(positions)
+
+    windowSize = min(max(3, int(windowSize)), numJoints)
+    step = max(1, windowSize - max(0, int(overlap)))
+
+    starts = np.arange(0, max(numJoints - windowSize, 0) + step, step)
+    starts = np.unique(np.minimum(starts, numJoints - windowSize))
+
+    windowIndices = starts[:, np.newaxis] + np.arange(windowSize)
+    normals, centroids = fitPlanes(positions[windowIndices])
+
+    #SVD picks the sign of each normal arbitrarily, so make each one agree with the window before it
+    agreement = np.ones(len(normals))
+    agreement[1:] = np.where(np.sum(normals[1:] * normals[:-1], axis=1) < 0, -1.0, 1.0)
+    normals *= np.cumprod(agreement)[:, np.newaxis]
+
+    if(referenceNormal is not None and normals[0].dot(np.asarray(referenceNormal, dtype=float)) < 0):
+        normals *= -1.0
+
+    #tent weights that peak in the middle of each window and never hit 0
+    tent = np.minimum(np.arange(1, windowSize + 1), np.arange(windowSize, 0, -1)).astype(float)
+    weights = np.tile(tent, (len(starts), 1))
+
+    if(not blend):
+        #keep only the best window for each joint, scores are unique per joint so ties go to the later window
+        scores = weights * (len(starts) + 1) + np.arange(len(starts))[:, np.newaxis]
+        bestScores = np.zeros(numJoints)
+        np.maximum.at(bestScores, windowIndices.ravel(), scores.ravel())
+        weights = np.where(scores == bestScores[windowIndices], weights, 0.0)
+
+    jointNormals = np.zeros((numJoints, 3))
+    jointCentroids = np.zeros((numJoints, 3))
+    jointWeights = np.zeros(numJoints)
+
+    np.add.at(jointNormals, windowIndices.ravel(), (weights[:, :, np.newaxis] * normals[:, np.newaxis, :]).reshape(-1, 3))
+    np.add.at(jointCentroids, windowIndices.ravel(), (weights[:, :, np.newaxis] * centroids[:, np.newaxis, :]).reshape(-1, 3))
+    np.add.at(jointWeights, windowIndices.ravel(), weights.ravel())
+
+    jointNormals /= np.linalg.norm(jointNormals, axis=1)[:, np.newaxis]
+    jointCentroids /= jointWeights[:, np.newaxis]
+
+    return jointNormals, -np.sum(jointNormals * jointCentroids, axis=1)
+
+"""
+Returns a mask of which joints of a solved chain actually change, compared to their old world matrices.
+Joints that stay within positionEpsilon of their old position and within angleEpsilon radians of their old rotation count as unchanged.
+"""
+def changedJoints(oldWorldMatrices, newPositions, newRotations, oriented, positionEpsilon=DEFAULT_POSITION_EPSILON, angleEpsilon=DEFAULT_ANGLE_EPSILON):
+    oldWorldMatrices = np.asarray(oldWorldMatrices, dtype=float).reshape(-1, 4, 4)
+    oriented = np.asarray(oriented, dtype=bool)
+
+    moved = np.linalg.norm(newPositions - oldWorldMatrices[:, 3, :3], axis=1) > positionEpsilon
+
+    #strip scale so the old matrices are rotations, then the angle between two rotations comes from the trace of oldRotation^T * newRotation
+    oldRotations = oldWorldMatrices[:, :3, :3] / np.linalg.norm(oldWorldMatrices[:, :3, :3], axis=2)[:, :, np.newaxis]
+    cosAngles = (np.einsum("nij,nij->n", oldRotations, newRotations) - 1.0) * 0.5
+    turned = oriented & (np.arccos(np.clip(cosAngles, -1.0, 1.0)) > angleEpsilon)
+
+    return moved | turned
+
+"""
+Builds Nx4x4 world matrices for a solved chain from the chain's old world matrices.
+Every joint moves to its projected position and keeps its old world scale.  Joints that were oriented take their solved rotation, the rest keep their old rotation.
+If a changed mask is passed in, joints that aren't changed keep their old world matrix as is.
+"""
+def solvedWorldMatrices(oldWorldMatrices, newPositions, newRotations, oriented, changed=None):
+    oldWorldMatrices = np.asarray(oldWorldMatrices, dtype=float).reshape(-1, 4, 4)
+    oriented = np.asarray(oriented, dtype=bool)
+    changed = np.ones(len(oldWorldMatrices), dtype=bool) if changed is None else np.asarray(changed, dtype=bool)
+
+    result = oldWorldMatrices.copy()
+
+    scales = np.linalg.norm(oldWorldMatrices[:, :3, :3], axis=2)
+    rotated = oriented & changed
+    result[rotated, :3, :3] = newRotations[rotated] * scales[rotated][:, :, np.newaxis]
+    result[changed, 3, :3] = newPositions[changed]
+
+    return result
+
+"""
+Local matrices that keep nodes at their world matrices under some new parent world matrices.
+worldMatrices is Nx4x4 and parentWorldMatrices is either Nx4x4 or a single 4x4 shared by all nodes.
+"""
+def compensatingLocalMatrices(worldMatrices, parentWorldMatrices):
+    worldMatrices = np.asarray(worldMatrices, dtype=float).reshape(-1, 4, 4)
+    parentWorldMatrices = np.asarray(parentWorldMatrices, dtype=float)
+
+    if(parentWorldMatrices.size != 16):
+        parentWorldMatrices = parentWorldMatrices.reshape(-1, 4, 4)
+    else:
+        parentWorldMatrices = parentWorldMatrices.reshape(4, 4)
+
+    return np.matmul(worldMatrices, np.linalg.inv(parentWorldMatrices))
+
+"""
+Local matrices for every joint of a solved chain.
+Each joint is placed under its parent's new world matrix, the chain root's parent doesn't move so its current world matrix is passed in.
+"""
+def chainLocalMatrices(newWorldMatrices, rootParentWorldMatrix):
+    newWorldMatrices = np.asarray(newWorldMatrices, dtype=float).reshape(-1, 4, 4)
+
+    parentWorldMatrices = np.empty_like(newWorldMatrices)
+    parentWorldMatrices[0] = np.asarray(rootParentWorldMatrix, dtype=float).reshape(4, 4)
+    parentWorldMatrices[1:] = newWorldMatrices[:-1]
+
+    return compensatingLocalMatrices(newWorldMatrices, parentWorldMatrices)
+
+"""
+Keeps the last solution for a chain around so small changes don't need a full solve.
+Only what a change invalidates gets recomputed:
+-Moving the plane along its normal only shifts the projected positions, the frames stay the same.
+-Moving some joints only touches their projections and the frames of those joints and their parents, since each joint aims at its child.
+-Changing the end joint's aim only touches the end joint's frame.
+Changing the plane normal, the axes or the number of joints falls back to a full solve.
+Also works with one plane per joint like solveChain, where moving the planes falls back to a full solve too since they don't all move together.
+
+After solve or update, projected, rotations and oriented hold the same values solveChain would return.
+"""
+class IncrementalChainSolver(object):
+    def __init__(self):
+        self.positions = None
+        self.planeNormal = None
+        self.planeDistance = None
+        self.aimVector = None
+        self.upVector = None
+        self.endAimDirection = None
+
+        self.projected = None
+        self.directions = None
+        self.rotations = None
+        self.oriented = None
+
+    def hasSolution(self):
+        return self.projected is not None
+
+    """
+    Solves the whole chain from scratch, same arguments as solveChain.
+    Returns the indices of all joints since they all changed.
+    """
+    def solve(self, positions, planeNormal, planeDistance, forwardAxis, rotationAxis, endAimDirection=None):
+        return self.solveFromVectors(positions, planeNormal, planeDistance, axisToVector(forwardAxis), axisToVector(rotationAxis), endAimDirection)
+
+    def solveFromVectors(self, positions, planeNormal, planeDistance, aimVector, upVector, endAimDirection):
+        self.positions = np.array(positions, dtype=float).reshape(-1, 3)
+        self.planeNormal = np.array(planeNormal, dtype=float)
+        self.planeDistance = np.array(planeDistance, dtype=float)
+        self.aimVector = np.array(aimVector, dtype=float)
+        self.upVector = np.array(upVector, dtype=float)
+        self.endAimDirection = None if endAimDirection is None else np.array(endAimDirection, dtype=float)
+
+        self.projected = projectPointsOnPlane(self.positions, self.planeNormal, self.planeDistance)
+
+        self.directions = np.empty_like(self.projected)
+        self.directions[:-1] = self.projected[1:] - self.projected[:-1]
+        self.directions[-1] = self.getEndDirection()
+
+        self.rotations, self.oriented = aimFrames(self.directions, self.planeNormal, self.aimVector, self.upVector)
+
+        return np.arange(len(self.positions))
+
+    """
+    Brings the solution up to date with whatever inputs are passed in, anything left as None is unchanged.
+    Since None is also a valid end aim direction, set endAimChanged to clear it.
+    Returns the indices of the joints whose solution changed.
+    """
+    def update(self, positions=None, planeNormal=None, planeDistance=None, forwardAxis=None, rotationAxis=None, endAimDirection=None, endAimChanged=False):
+        newPositions = self.positions if positions is None else np.asarray(positions, dtype=float).reshape(-1, 3)
+        newNormal = self.planeNormal if planeNormal is None else np.asarray(planeNormal, dtype=float)
+        newDistance = self.planeDistance if planeDistance is None else np.array(planeDistance, dtype=float)
+        newAimVector = self.aimVector if forwardAxis is None else axisToVector(forwardAxis)
+        newUpVector = self.upVector if rotationAxis is None else axisToVector(rotationAxis)
+
+        endAimChanged = endAimChanged or endAimDirection is not None
+        newEndAimDirection = (None if endAimDirection is None else np.asarray(endAimDirection, dtype=float)) if endAimChanged else self.endAimDirection
+
+        distanceChanged = not np.array_equal(newDistance, self.planeDistance)
+
+        if(not self.hasSolution() or len(newPositions) != len(self.positions) or not np.array_equal(newNormal, self.planeNormal)
+           or not np.array_equal(newAimVector, self.aimVector) or not np.array_equal(newUpVector, self.upVector)
+           or (distanceChanged and (newDistance.ndim > 0 or self.planeDistance.ndim > 0))):
+            return self.solveFromVectors(newPositions, newNormal, newDistance, newAimVector, newUpVector, newEndAimDirection)
+
+        changedIndices = set()
+
+        if(distanceChanged):
+            #projections shift along the normal, directions between them and so the frames stay the same
+            self.projected -= self.planeNormal * (newDistance - self.planeDistance)
+            self.planeDistance = newDistance
+            changedIndices.update(range(len(self.projected)))
+
+        if(positions is not None):
+            movedIndices = np.flatnonzero(np.any(newPositions != self.positions, axis=1))
+
+            if(len(movedIndices) > 0):
+                changedIndices.update(self.moveJoints(movedIndices, newPositions[movedIndices]).tolist())
+
+        if(endAimChanged and not np.array_equal(self.getEndDirection(), self.flattenOntoPlane(newEndAimDirection))):
+            self.endAimDirection = newEndAimDirection
+            lastIndex = len(self.projected) - 1
+            self.directions[lastIndex] = self.getEndDirection()
+            self.updateFrames(np.array([lastIndex]))
+            changedIndices.add(lastIndex)
+
+        return np.array(sorted(changedIndices), dtype=int)
+
+    """
+    Moves some joints to new world positions and updates only what depends on them.
+    Returns the indices of the joints whose solution changed.
+    """
+    def moveJoints(self, indices, positions):
+        indices = np.asarray(indices, dtype=int)
+
+        self.positions[indices] = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.projected[indices] = projectPointsOnPlane(self.positions[indices], *self.jointPlanes(indices))
+
+        #a joint's direction depends on its own projection and its child's
+        lastIndex = len(self.projected) - 1
+        affected = np.union1d(indices, indices - 1)
+        affected = affected[affected >= 0]
+
+        inner = affected[affected < lastIndex]
+        self.directions[inner] = self.projected[inner + 1] - self.projected[inner]
+
+        if(affected[-1] == lastIndex):
+            self.directions[lastIndex] = self.getEndDirection()
+
+        self.updateFrames(affected)
+
+        return affected
+
+    def updateFrames(self, indices):
+        self.rotations[indices], self.oriented[indices] = aimFrames(self.directions[indices], self.jointPlanes(indices)[0], self.aimVector, self.upVector)
+
+    """
+    Plane normal and distance for the joints at indices, the one plane if every joint shares it
+    """
+    def jointPlanes(self, indices):
+        if(self.planeNormal.ndim == 1):
+            return self.planeNormal, self.planeDistance
+
+        return self.planeNormal[indices], self.planeDistance[indices]
+
+    """
+    End joint's aim direction flattened onto the plane, zero if the end joint isn't oriented
+    """
+    def getEndDirection(self):
+        return self.flattenOntoPlane(self.endAimDirection)
+
+    def flattenOntoPlane(self, direction):
+        if(direction is None):
+            return np.zeros(3)
+
+        endNormal = self.planeNormal.reshape(-1, 3)[-1]
+
+        return direction - endNormal * direction.dot(endNormal)
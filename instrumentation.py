@@ -0,0 +1,359 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import functools
+import json
+import timeit
+
+#only in Python 3, allocations just aren't tracked without it
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+"""
+Optional instrumentation for finding out where the time goes in an Apply or a plane update.
+Code marks out nested spans of work with span() or the instrumented() decorator, and counts every call it makes into the scene with countSceneCall().
+
+Nothing is recorded until a session is started, and while there's no session all of those are a global check and a return, so they can stay in the hot paths.
+Everything is kept in memory while the session runs and only turned into a report or written to a JSON lines file once it's stopped, so writing it out doesn't show up in the timings.
+
+import CoplanarJointOrient.instrumentation
+with CoplanarJointOrient.instrumentation.InstrumentationSession(traceMemory=True, jsonLinesPath="apply.jsonl") as session:
+    tool.apply(None)
+print(session.formatReport())
+"""
+
+#categories of scene calls
+HIERARCHY = "hierarchy"
+NAME_LOOKUP = "nameLookup"
+TRANSFORM_READ = "transformRead"
+ATTRIBUTE_READ = "attributeRead"
+SELECTION = "selection"
+WRITE = "write"
+
+#session everything is recorded into, None while instrumentation is off
+_session = None
+
+def isEnabled():
+    return _session is not None
+
+def getSession():
+    return _session
+
+"""
+Starts recording into a new session and returns it.  Takes the same arguments as InstrumentationSession.
+"""
+def startSession(*args, **kwargs):
+    return InstrumentationSession(*args, **kwargs).start()
+
+"""
+Stops the current session and returns it, or None if there wasn't one
+"""
+def stopSession():
+    session = _session
+    
+    if(session is not None):
+        session.stop()
+        
+    return session
+
+"""
+One timed piece of work, with the spans started inside it as its children
+"""
+class Span(object):
+    def __init__(self, name, parent, start):
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.start = start
+        self.duration = 0.0
+        
+        #scene calls made directly in this span, not counting its children
+        self.sceneCalls = {}
+        
+        #bytes allocated and not freed by the time the span ended, None unless memory is traced
+        self.memoryBefore = None
+        self.memoryDelta = None
+        
+    def getPath(self):
+        return self.name if self.parent is None else self.parent.getPath() + "/" + self.name
+        
+    def getDepth(self):
+        return 0 if self.parent is None else self.parent.getDepth() + 1
+    
+    def getSelfTime(self):
+        return self.duration - sum(child.duration for child in self.children)
+    
+    def toDict(self, sessionStart):
+        return {"name" : self.name, "start" : self.start - sessionStart, "duration" : self.duration, "selfTime" : self.getSelfTime(), 
+                "sceneCalls" : dict(self.sceneCalls), "memoryDelta" : self.memoryDelta, "children" : [child.toDict(sessionStart) for child in self.children]}
+
+"""
+Everything recorded between start and stop.
+If traceMemory is set, tracemalloc tracks how much memory each span leaves allocated and the top allocation sites are compared between the start and end of the session.
+If jsonLinesPath is set, every span and a summary are written there as one JSON object per line when the session stops.
+"""
+class InstrumentationSession(object):
+    def __init__(self, traceMemory=False, jsonLinesPath=None, numTopAllocations=10):
+        self.traceMemory = traceMemory and tracemalloc is not None
+        self.jsonLinesPath = jsonLinesPath
+        self.numTopAllocations = numTopAllocations
+        
+        #spans that aren't inside any other span
+        self.rootSpans = []
+        self.currentSpan = None
+        
+        #every span in the order it ended, for the JSON lines file
+        self.finishedSpans = []
+        
+        self.sceneCalls = {}
+        
+        self.startTime = None
+        self.duration = None
+        
+        self.startSnapshot = None
+        self.topAllocations = None
+        self.peakMemory = None
+        
+        #tracemalloc is only stopped at the end if this started it
+        self.startedTracing = False
+        
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        self.stop()
+        return False
+        
+    def start(self):
+        global _session
+        
+        if(_session is not None):
+            raise RuntimeError("An instrumentation session is already running")
+        
+        if(self.traceMemory):
+            if(not tracemalloc.is_tracing()):
+                tracemalloc.start()
+                self.startedTracing = True
+                
+            self.startSnapshot = tracemalloc.take_snapshot()
+            
+        self.startTime = timeit.default_timer()
+        _session = self
+        
+        return self
+    
+    def stop(self):
+        global _session
+        
+        if(_session is not self):
+            return self
+        
+        _session = None
+        self.duration = timeit.default_timer() - self.startTime
+        
+        #spans left open by an exception still get their time up to now
+        while self.currentSpan is not None:
+            self.endSpan(self.currentSpan)
+        
+        if(self.traceMemory):
+            self.peakMemory = tracemalloc.get_traced_memory()[1]
+            
+            differences = tracemalloc.take_snapshot().compare_to(self.startSnapshot, "lineno")[:self.numTopAllocations]
+            self.topAllocations = [{"location" : str(difference.traceback), "sizeDiff" : difference.size_diff, "countDiff" : difference.count_diff} for difference in differences]
+            self.startSnapshot = None
+            
+            if(self.startedTracing):
+                tracemalloc.stop()
+                self.startedTracing = False
+                
+        if(self.jsonLinesPath is not None):
+            self.writeJsonLines(self.jsonLinesPath)
+            
+        return self
+        
+    def beginSpan(self, name):
+        span = Span(name, self.currentSpan, timeit.default_timer())
+        
+        if(self.currentSpan is None):
+            self.rootSpans.append(span)
+        else:
+            self.currentSpan.children.append(span)
+            
+        if(self.traceMemory):
+            span.memoryBefore = tracemalloc.get_traced_memory()[0]
+            
+        self.currentSpan = span
+        
+        return span
+    
+    def endSpan(self, span):
+        span.duration = timeit.default_timer() - span.start
+        
+        if(self.traceMemory):
+            span.memoryDelta = tracemalloc.get_traced_memory()[0] - span.memoryBefore
+            
+        self.finishedSpans.append(span)
+        self.currentSpan = span.parent
+        
+    def countSceneCall(self, category, count):
+        self.sceneCalls[category] = self.sceneCalls.get(category, 0) + count
+        
+        if(self.currentSpan is not None):
+            self.currentSpan.sceneCalls[category] = self.currentSpan.sceneCalls.get(category, 0) + count
+            
+    """
+    Totals for every span name: how many times it ran, its total and self time and the scene calls made directly in it
+    """
+    def getTotals(self):
+        totals = {}
+        
+        for span in self.finishedSpans:
+            total = totals.setdefault(span.name, {"count" : 0, "totalTime" : 0.0, "selfTime" : 0.0, "sceneCalls" : {}})
+            total["count"] += 1
+            total["totalTime"] += span.duration
+            total["selfTime"] += span.getSelfTime()
+            
+            for category, count in span.sceneCalls.items():
+                total["sceneCalls"][category] = total["sceneCalls"].get(category, 0) + count
+                
+        return totals
+    
+    """
+    Everything recorded as a dictionary: the span tree, totals per span name, scene calls per category, and allocations if memory was traced.
+    Times are in seconds and span start times are from the start of the session.
+    """
+    def getReport(self):
+        return {"duration" : self.duration, "spans" : [span.toDict(self.startTime) for span in self.rootSpans], "totals" : self.getTotals(), 
+                "sceneCalls" : dict(self.sceneCalls), "peakMemory" : self.peakMemory, "topAllocations" : self.topAllocations}
+    
+    """
+    Readable version of the report, with span names totaled and sorted by self time
+    """
+    def formatReport(self):
+        lines = []
+        
+        if(self.duration is not None):
+            lines.append("Session: %.3f ms" % (self.duration * 1000.0))
+            
+        lines.append("%-48s %8s %12s %12s  %s" % ("Span", "Count", "Total ms", "Self ms", "Scene calls"))
+        
+        for name, total in sorted(self.getTotals().items(), key=lambda item: -item[1]["selfTime"]):
+            lines.append("%-48s %8d %12.3f %12.3f  %s" % (name, total["count"], total["totalTime"] * 1000.0, total["selfTime"] * 1000.0, formatSceneCalls(total["sceneCalls"])))
+            
+        lines.append("Scene calls: " + (formatSceneCalls(self.sceneCalls) or "none"))
+        
+        if(self.peakMemory is not None):
+            lines.append("Peak traced memory: %d bytes" % self.peakMemory)
+            
+        for allocation in self.topAllocations or []:
+            lines.append("%+12d bytes %+8d blocks  %s" % (allocation["sizeDiff"], allocation["countDiff"], allocation["location"]))
+            
+        return "\n".join(lines)
+    
+    """
+    Writes every span in the order it ended and then a summary, one JSON object per line
+    """
+    def writeJsonLines(self, path):
+        with open(path, "w") as jsonLinesFile:
+            for span in self.finishedSpans:
+                jsonLinesFile.write(json.dumps({"type" : "span", "name" : span.name, "path" : span.getPath(), "depth" : span.getDepth(), 
+                                                "start" : span.start - self.startTime, "duration" : span.duration, "selfTime" : span.getSelfTime(), 
+                                                "sceneCalls" : span.sceneCalls, "memoryDelta" : span.memoryDelta}, sort_keys=True) + "\n")
+                
+            jsonLinesFile.write(json.dumps({"type" : "summary", "duration" : self.duration, "sceneCalls" : self.sceneCalls, 
+                                            "peakMemory" : self.peakMemory, "topAllocations" : self.topAllocations}, sort_keys=True) + "\n")
+
+def formatSceneCalls(sceneCalls):
+    return ", ".join(category + " " + str(count) for category, count in sorted(sceneCalls.items()))
+
+"""
+Context manager for a span while a session is running
+"""
+class ActiveSpan(object):
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+        self.span = None
+        
+    def __enter__(self):
+        self.span = self.session.beginSpan(self.name)
+        return self.span
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        #a session stopped inside the span already closed it
+        if(_session is self.session):
+            self.session.endSpan(self.span)
+            
+        return False
+
+"""
+Does nothing, handed out by span() while instrumentation is off so there's nothing to allocate
+"""
+class NullSpan(object):
+    def __enter__(self):
+        return None
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        return False
+
+_nullSpan = NullSpan()
+
+"""
+Context manager marking out a span of work
+"""
+def span(name):
+    if(_session is None):
+        return _nullSpan
+    
+    return ActiveSpan(_session, name)
+
+"""
+Decorator that runs every call of a function in a span with the given name
+"""
+def instrumented(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            session = _session
+            
+            if(session is None):
+                return func(*args, **kwargs)
+            
+            functionSpan = session.beginSpan(name)
+            
+            try:
+                return func(*args, **kwargs)
+            finally:
+                #a session stopped inside the call already closed its spans
+                if(_session is session):
+                    session.endSpan(functionSpan)
+                    
+        return wrapper
+    
+    return decorator
+
+"""
+Counts calls into the scene under a category, like HIERARCHY or TRANSFORM_READ
+"""
+def countSceneCall(category, count=1):
+    if(_session is not None):
+        _session.countSceneCall(category, count)
@@ -0,0 +1,196 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import CoplanarJointOrient.batchMathUtil
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.instrumentation
+
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+"""
+Now that the UI did all the hard work of configuring the alignment plane, requiring like > 1000 lines of code, all the real work happens here in this one function
+(Well technically a few outside util methods are called as well...)
+
+Joints that would move less than positionEpsilon and turn less than angleEpsilon (in radians) are left alone, so rerunning on an already fixed chain writes nothing.
+
+Returns how many joints of the chain were written and how many were skipped.
+"""
+def coplanarizeJoints(chainEnd, chainRoot, plane, forwardAxis = CoplanarJointOrient.batchMathUtil.Axis(axis=0), rotationAxis = CoplanarJointOrient.batchMathUtil.Axis(axis=2), 
+                      positionEpsilon = CoplanarJointOrient.chainSolver.DEFAULT_POSITION_EPSILON, angleEpsilon = CoplanarJointOrient.chainSolver.DEFAULT_ANGLE_EPSILON, jointPlanes = None, backend = None):    
+    return coplanarizeJointChains([ChainSpec(chainEnd, chainRoot, plane, forwardAxis, rotationAxis, jointPlanes)], positionEpsilon, angleEpsilon, backend)[0]
+
+"""
+One joint chain to coplanarize along with the plane and axes to do it with.
+plane is an MPlane or a (normal, distance) pair in UI units.
+jointPlanes optionally gives each joint of the chain its own plane, from root to end, as (normals, distances) from PlaneMode.getJointPlanes.
+The chain ends can be names or nodes from the scene backend, like the NodeHandles the UI holds so a queued chain still works if its joints get renamed.
+"""
+class ChainSpec(object):
+    def __init__(self, chainEnd, chainRoot, plane, forwardAxis = CoplanarJointOrient.batchMathUtil.Axis(axis=0), rotationAxis = CoplanarJointOrient.batchMathUtil.Axis(axis=2), jointPlanes = None):
+        self.chainEnd = chainEnd
+        self.chainRoot = chainRoot
+        self.plane = plane
+        self.forwardAxis = forwardAxis
+        self.rotationAxis = rotationAxis
+        self.jointPlanes = jointPlanes
+
+"""
+Coplanarizes a batch of joint chains, each with its own plane and axes, as a single undoable step.
+
+Each chain is solved at once by chainSolver.  Chains are solved parents before children so nested or overlapping chains see the results of the chains above them.
+The scene is only read up front, reads are shared between chains, and everything is written at the end as one undoable command.
+Children stay where they are by getting compensating local transforms instead of being unparented and parented back.
+
+Everything goes through the scene backend, the current one from SceneBackend.getSceneBackend unless one is passed in.
+
+Returns (written, skipped) joint counts for each chain spec in the order they were passed in.
+"""
+@CoplanarJointOrient.instrumentation.instrumented("coplanarizeJointChains")
+def coplanarizeJointChains(chainSpecs, positionEpsilon = CoplanarJointOrient.chainSolver.DEFAULT_POSITION_EPSILON, angleEpsilon = CoplanarJointOrient.chainSolver.DEFAULT_ANGLE_EPSILON, backend = None):
+    if(backend is None):
+        backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+        
+    results = [(0, 0)] * len(chainSpecs)
+    chains = {}
+    
+    with CoplanarJointOrient.instrumentation.span("findChains"):
+        for specIndex, spec in enumerate(chainSpecs):
+            if(spec.chainRoot is None or spec.chainEnd is None or spec.plane is None):
+                continue
+            
+            #long names ordered from root to end
+            joints = backend.getWholeParentChain(spec.chainRoot, spec.chainEnd)
+            
+            #one of the joints might have been deleted or reparented out of the chain since a batch chain was added
+            if(joints is None):
+                continue
+            
+            joints.reverse()
+            chains[specIndex] = joints
+        
+    #a chain's root is deeper in the DAG than the root of any chain it's nested under, so this puts parents first
+    solveOrder = sorted(chains.keys(), key=lambda specIndex: chains[specIndex][0].count("|"))
+    
+    #world matrices by long name, read once and then replaced by solved results as chains are solved
+    worldMatrices = {}
+    parents = {}
+    
+    #world matrices of the joints that change, and whether they were oriented by the last chain that changed them
+    solvedJoints = {}
+    
+    for specIndex in solveOrder:
+        spec = chainSpecs[specIndex]
+        joints = chains[specIndex]
+        
+        with CoplanarJointOrient.instrumentation.span("readChainTransforms"):
+            unread = [joint for joint in joints if joint not in worldMatrices]
+            worldMatrices.update(zip(unread, backend.getWorldMatrices(unread)))
+            
+            endHasChildren = backend.hasChildren(joints[-1])
+        
+        for index in range(1, len(joints)):
+            parents[joints[index]] = joints[index - 1]
+        
+        oldWorldMatrices = [worldMatrices[joint] for joint in joints]
+        positions = [matrix[12:15] for matrix in oldWorldMatrices]
+        
+        #don't orient if this is the last child in the chain and it has children of its own
+        #otherwise the last child keeps its previous aim direction projected onto the plane
+        endAimDirection = None
+        
+        if(not endHasChildren):
+            endAimDirection = CoplanarJointOrient.chainSolver.worldAxisDirections(oldWorldMatrices[-1], spec.forwardAxis)[0]
+            
+        #per joint planes only make sense if they were computed for this exact chain
+        if(spec.jointPlanes is not None and len(spec.jointPlanes[1]) == len(joints)):
+            planeNormal, planeDistance = spec.jointPlanes
+        else:
+            planeNormal, planeDistance = getPlaneNormalAndDistance(spec.plane)
+            
+        #planes are set up in UI units but world matrices are in internal units
+        planeDistance = planeDistance * backend.uiToInternal()
+        
+        with CoplanarJointOrient.instrumentation.span("solveChain"):
+            newPositions, newRotations, oriented = CoplanarJointOrient.chainSolver.solveChain(positions, planeNormal, planeDistance, spec.forwardAxis, spec.rotationAxis, endAimDirection)
+            
+            changed = CoplanarJointOrient.chainSolver.changedJoints(oldWorldMatrices, newPositions, newRotations, oriented, positionEpsilon, angleEpsilon)
+            newWorldMatrices = CoplanarJointOrient.chainSolver.solvedWorldMatrices(oldWorldMatrices, newPositions, newRotations, oriented, changed)
+        
+        for index in range(len(joints)):
+            if(changed[index]):
+                worldMatrices[joints[index]] = newWorldMatrices[index].flatten().tolist()
+                solvedJoints[joints[index]] = bool(oriented[index])
+                
+        #a joint needs writing if it changed or if its parent in the chain changed underneath it
+        written = changed.copy()
+        written[1:] |= changed[:-1]
+        numWritten = int(written.sum())
+        
+        results[specIndex] = (numWritten, len(joints) - numWritten)
+        
+    #everything parented under a changed joint stays where it is in world space
+    nodes = list(solvedJoints.keys())
+    
+    with CoplanarJointOrient.instrumentation.span("findChildren"):
+        for joint in list(solvedJoints.keys()):
+            for child in backend.getTransformChildren(joint):
+                parents[child] = joint
+                
+                #changed joints are already being written, and children driven by constraints and such follow whatever drives them
+                if(child in solvedJoints or not backend.isTransformSettable(child)):
+                    continue
+                
+                nodes.append(child)
+                
+    if(not nodes):
+        return results
+    
+    with CoplanarJointOrient.instrumentation.span("readChildTransforms"):
+        unread = [node for node in nodes if node not in worldMatrices]
+        worldMatrices.update(zip(unread, backend.getWorldMatrices(unread)))
+        
+        #parents that didn't change are still where they are in the scene
+        unsolvedParents = [node for node in nodes if parents.get(node) not in solvedJoints]
+        sceneParentWorldMatrices = dict(zip(unsolvedParents, backend.getParentWorldMatrices(unsolvedParents)))
+    
+    parentWorldMatrices = [worldMatrices[parents[node]] if node not in sceneParentWorldMatrices else sceneParentWorldMatrices[node] for node in nodes]
+    
+    #work out all the new channel values and write them in one undoable command
+    with CoplanarJointOrient.instrumentation.span("computeChannels"):
+        localMatrices = CoplanarJointOrient.chainSolver.compensatingLocalMatrices([worldMatrices[node] for node in nodes], parentWorldMatrices)
+        values = backend.getTransformChannelsForLocalMatrices(nodes, localMatrices.reshape(-1, 16).tolist(), [solvedJoints.get(node, False) for node in nodes])
+        
+    with CoplanarJointOrient.instrumentation.span("writeChannels"):
+        backend.applyTransformChannels(nodes, values)
+
+    return results
+
+
+
+"""
+Normal as an [x, y, z] list and distance of an MPlane or a (normal, distance) pair
+"""
+def getPlaneNormalAndDistance(plane):
+    if(hasattr(plane, "normal")):
+        normal = plane.normal()
+        
+        return [normal.x, normal.y, normal.z], plane.distance()
+    
+    normal, distance = plane
+    
+    return list(normal), distance
@@ -0,0 +1,360 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import timeit
+
+import numpy as np
+
+import CoplanarJointOrient.batchMathUtil
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.instrumentation
+import CoplanarJointOrient.latestJobWorker
+
+"""
+Shows how a chain would end up oriented without touching the scene.
+
+The chain's world matrices are read once into a snapshot and every refresh solves that snapshot with chainSolver, so editing values never reads or writes the scene.
+The last solution is kept, so a refresh after moving the plane along its normal or moving a few joints only re-solves the joints that change.
+The result is a frame of line segments, a bone from each joint to the next and its three local axes, for something that draws in the viewport like jointPreviewLocator.
+
+Each refresh is timed.  When one goes over the frame budget the next ones only solve and draw every so many joints, always keeping both ends,
+and once refreshes are well under budget again the joints come back.  Everything in here works on plain arrays so it doesn't need Maya.
+
+With a worker started, refreshes are solved on a worker thread instead so the UI doesn't wait on big chains.  The worker only sees the snapshot, which never changes once it's made,
+and copies of everything else, so the scene and the tool's values are only ever touched on the main thread.  Newer refreshes cancel older ones and only the newest frame is drawn.
+"""
+
+#seconds a refresh is allowed to take before the preview drops joints
+FRAME_BUDGET = 1.0 / 60.0
+
+#refreshes faster than this fraction of the budget bring dropped joints back
+LOD_RAISE_FRACTION = 0.25
+
+#never drop below this many joints, ends included
+MIN_LOD_JOINTS = 16
+
+#colors of the bones and of the x, y and z axes as rgba
+BONE_COLOR = [1.0, 0.8, 0.2, 1.0]
+AXIS_COLORS = [[1.0, 0.0, 0.0, 1.0], [0.0, 1.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]]
+
+#frame the viewport draws, None when there's nothing to show
+_drawFrame = None
+
+def getDrawFrame():
+    return _drawFrame
+
+def setDrawFrame(frame):
+    global _drawFrame
+    _drawFrame = frame
+
+"""
+Indices of at most maxJoints joints spread evenly along a chain of numJoints, always including both ends.  Every joint if maxJoints is None.
+"""
+def decimatedIndices(numJoints, maxJoints):
+    if(maxJoints is None or numJoints <= maxJoints):
+        return np.arange(numJoints)
+    
+    return np.unique(np.linspace(0, numJoints - 1, max(maxJoints, 2)).round().astype(np.int64))
+
+"""
+What the viewport draws for one refresh.  Everything is in world space in internal units.
+"""
+class PreviewFrame(object):
+    def __init__(self, jointPositions, linePoints, lineColors, numJoints):
+        #Nx3 positions of the joints that were solved
+        self.jointPositions = jointPositions
+        
+        #Mx3 line segment end points two at a time, and an Mx4 rgba color for each
+        self.linePoints = linePoints
+        self.lineColors = lineColors
+        
+        #joints in the whole chain, more than the joints shown when the preview dropped some
+        self.numJoints = numJoints
+        
+    def isDecimated(self):
+        return len(self.jointPositions) < self.numJoints
+    
+"""
+Chain world matrices read at one point in time.  Nothing in here changes after it's made so a worker thread can solve it while the main thread moves on.
+"""
+class ChainSnapshot(object):
+    def __init__(self, joints, worldMatrices, endHasChildren):
+        #names or nodes from root to end
+        self.joints = tuple(joints)
+        
+        self.worldMatrices = np.array(worldMatrices, dtype=float).reshape(-1, 4, 4)
+        self.worldMatrices.flags.writeable = False
+        
+        self.endHasChildren = endHasChildren
+        
+        #length the axes are drawn at, half the average bone length of the chain
+        self.axisLength = 1.0
+        
+        positions = self.worldMatrices[:, 3, :3]
+        
+        if(len(positions) > 1):
+            self.axisLength = max(float(np.linalg.norm(positions[1:] - positions[:-1], axis=1).mean()) * 0.5, CoplanarJointOrient.chainSolver.DEGENERATE_EPSILON)
+            
+    def __len__(self):
+        return len(self.worldMatrices)
+    
+"""
+Last solution of the preview, so a refresh only re-solves the joints whose inputs changed since the one before it.
+Moving the plane along its normal only shifts the joints, and moving some joints only re-aims them and their parents.
+Belongs to whichever thread is solving refreshes, which only ever solves one at a time.
+"""
+class PreviewSolution(object):
+    def __init__(self):
+        self.solver = CoplanarJointOrient.chainSolver.IncrementalChainSolver()
+        
+        #which joints of the chain were solved, their world matrices from the snapshot and their solved world matrices
+        self.indices = None
+        self.oldWorldMatrices = None
+        self.newWorldMatrices = None
+        
+    """
+    Brings the solution up to date with new inputs and returns the solved world matrices of the joints at indices
+    """
+    def update(self, indices, oldWorldMatrices, planeNormal, planeDistance, forwardAxis, rotationAxis, endAimDirection):
+        positions = oldWorldMatrices[:, 3, :3]
+        
+        if(self.indices is None or not np.array_equal(indices, self.indices)):
+            self.solver.solve(positions, planeNormal, planeDistance, forwardAxis, rotationAxis, endAimDirection)
+            changed = np.arange(len(indices))
+        else:
+            changed = self.solver.update(positions, planeNormal, planeDistance, forwardAxis, rotationAxis, endAimDirection, endAimChanged=True)
+            
+            #scale and the rotation of joints that aren't oriented come straight from the snapshot
+            changed = np.union1d(changed, np.flatnonzero(np.any(oldWorldMatrices != self.oldWorldMatrices, axis=(1, 2))))
+            
+        solver = self.solver
+        
+        if(len(changed) == len(indices)):
+            self.newWorldMatrices = CoplanarJointOrient.chainSolver.solvedWorldMatrices(oldWorldMatrices, solver.projected, solver.rotations, solver.oriented)
+        elif(len(changed) > 0):
+            #frames already handed out share the old array so it can't be changed in place
+            self.newWorldMatrices = self.newWorldMatrices.copy()
+            self.newWorldMatrices[changed] = CoplanarJointOrient.chainSolver.solvedWorldMatrices(oldWorldMatrices[changed], solver.projected[changed], solver.rotations[changed], solver.oriented[changed])
+            
+        self.indices = indices
+        self.oldWorldMatrices = oldWorldMatrices
+        
+        return self.newWorldMatrices
+    
+"""
+Everything one refresh needs, copied so the values it came from can keep changing while a worker solves it.
+The solution is the exception, it's only ever used by the thread solving the request.
+"""
+class PreviewRequest(object):
+    def __init__(self, snapshot, planeNormal, planeDistance, forwardAxis, rotationAxis, jointPlanes, maxJoints, solution = None):
+        self.snapshot = snapshot
+        self.planeNormal = np.array(planeNormal, dtype=float)
+        self.planeDistance = planeDistance
+        self.forwardAxis = CoplanarJointOrient.batchMathUtil.Axis(axis=forwardAxis.axis, negative=forwardAxis.negative)
+        self.rotationAxis = CoplanarJointOrient.batchMathUtil.Axis(axis=rotationAxis.axis, negative=rotationAxis.negative)
+        self.jointPlanes = None if jointPlanes is None else (np.array(jointPlanes[0], dtype=float), np.array(jointPlanes[1], dtype=float))
+        self.maxJoints = maxJoints
+        self.solution = solution
+
+"""
+Result of solving a PreviewRequest, with how long it took and how many joints it showed for adjusting the level of detail
+"""
+class PreviewResult(object):
+    def __init__(self, request, frame, refreshTime):
+        self.request = request
+        self.frame = frame
+        self.refreshTime = refreshTime
+
+"""
+Solves a request into a PreviewResult, starting from the request's solution if it has one.
+Safe to run on a worker thread, and gives up with None as soon as isStale says a newer request came in.
+"""
+def solvePreview(request, isStale = None):
+    start = timeit.default_timer()
+    snapshot = request.snapshot
+    
+    #dropped before it even started
+    if(isStale is not None and isStale()):
+        return None
+    
+    numJoints = len(snapshot)
+    indices = decimatedIndices(numJoints, request.maxJoints)
+    
+    planeNormal = request.planeNormal
+    planeDistance = request.planeDistance
+    
+    #per joint planes only make sense if they were computed for this exact chain
+    if(request.jointPlanes is not None and len(request.jointPlanes[1]) == numJoints):
+        planeNormal = request.jointPlanes[0][indices]
+        planeDistance = request.jointPlanes[1][indices]
+        
+    oldWorldMatrices = snapshot.worldMatrices[indices]
+    
+    endAimDirection = None
+    
+    if(not snapshot.endHasChildren):
+        endAimDirection = CoplanarJointOrient.chainSolver.worldAxisDirections(oldWorldMatrices[-1], request.forwardAxis)[0]
+        
+    if(request.solution is None):
+        newPositions, newRotations, oriented = CoplanarJointOrient.chainSolver.solveChain(oldWorldMatrices[:, 3, :3], planeNormal, planeDistance, request.forwardAxis, request.rotationAxis, endAimDirection)
+        newWorldMatrices = CoplanarJointOrient.chainSolver.solvedWorldMatrices(oldWorldMatrices, newPositions, newRotations, oriented)
+    else:
+        newWorldMatrices = request.solution.update(indices, oldWorldMatrices, planeNormal, planeDistance, request.forwardAxis, request.rotationAxis, endAimDirection)
+        
+    #checked only once the solution is up to date so it's never left half updated
+    if(isStale is not None and isStale()):
+        return None
+    
+    frame = buildFrame(newWorldMatrices, numJoints, snapshot.axisLength)
+    
+    return PreviewResult(request, frame, timeit.default_timer() - start)
+
+def buildFrame(worldMatrices, numJoints, axisLength):
+    positions = worldMatrices[:, 3, :3]
+    
+    #rows of the rotation part are the local axes, scale taken out so every joint's axes are the same length
+    axes = worldMatrices[:, :3, :3]
+    axes = axes / np.maximum(np.linalg.norm(axes, axis=2), CoplanarJointOrient.chainSolver.DEGENERATE_EPSILON)[:, :, np.newaxis]
+    
+    numBones = len(positions) - 1
+    numLines = numBones + len(positions) * 3
+    
+    linePoints = np.empty((numLines * 2, 3))
+    lineColors = np.empty((numLines * 2, 4))
+    
+    linePoints[0:numBones * 2:2] = positions[:-1]
+    linePoints[1:numBones * 2:2] = positions[1:]
+    lineColors[:numBones * 2] = BONE_COLOR
+    
+    for axis in range(3):
+        first = (numBones + len(positions) * axis) * 2
+        last = first + len(positions) * 2
+        
+        linePoints[first:last:2] = positions
+        linePoints[first + 1:last:2] = positions + axes[:, axis] * axisLength
+        lineColors[first:last] = AXIS_COLORS[axis]
+        
+    return PreviewFrame(positions, linePoints, lineColors, numJoints)
+    
+class JointPreview(object):
+    def __init__(self, frameBudget = FRAME_BUDGET):
+        self.frameBudget = frameBudget
+        
+        #ChainSnapshot of the chain, None until a chain is set
+        self.snapshot = None
+        
+        #last solution, so refreshes only re-solve what changed
+        self.solution = PreviewSolution()
+        
+        #how many joints are solved and drawn, None for all of them
+        self.maxJoints = None
+        self.lastRefreshTime = None
+        
+        #solves refreshes off the main thread once startWorker is called, and what gets the newest frame
+        self.worker = None
+        self.onFrameFunc = None
+        
+    """
+    Reads a chain from root to end into a new snapshot, or clears it if joints is None
+    """
+    def setChain(self, joints, backend):
+        if(joints is None):
+            self.snapshot = None
+            return
+        
+        joints = list(joints)
+        self.snapshot = ChainSnapshot(joints, backend.getWorldMatrices(joints), backend.hasChildren(joints[-1]))
+        
+    def hasChain(self):
+        return self.snapshot is not None
+    
+    def getJoints(self):
+        return list(self.snapshot.joints) if self.snapshot is not None else None
+    
+    """
+    Solves the snapshot right away and returns a PreviewFrame, then adjusts how many joints the next refresh shows by how long this one took.
+    Planes are like ChainSpec takes them, with distances in internal units.  None if there's no chain.
+    """
+    @CoplanarJointOrient.instrumentation.instrumented("JointPreview.refresh")
+    def refresh(self, planeNormal, planeDistance, forwardAxis, rotationAxis, jointPlanes = None):
+        if(self.snapshot is None):
+            return None
+        
+        result = solvePreview(PreviewRequest(self.snapshot, planeNormal, planeDistance, forwardAxis, rotationAxis, jointPlanes, self.maxJoints, self.solution))
+        self.updateLevelOfDetail(result)
+        
+        return result.frame
+    
+    """
+    Solves refreshes on a worker thread from now on.  onFrameFunc gets the newest PreviewFrame on the main thread, through dispatchFunc like maya.utils.executeDeferred.
+    """
+    def startWorker(self, onFrameFunc, dispatchFunc):
+        self.onFrameFunc = onFrameFunc
+        self.worker = CoplanarJointOrient.latestJobWorker.LatestJobWorker(self.onWorkerResult, dispatchFunc)
+        
+    def stopWorker(self):
+        if(self.worker is not None):
+            self.worker.stop()
+            self.worker = None
+            
+    """
+    Same as refresh but solved on the worker, and the frame goes to the onFrameFunc given to startWorker unless another refresh is requested first
+    """
+    def requestRefresh(self, planeNormal, planeDistance, forwardAxis, rotationAxis, jointPlanes = None):
+        if(self.snapshot is None):
+            self.cancelRefresh()
+            self.onFrameFunc(None)
+            return
+        
+        self.worker.submit(solvePreview, PreviewRequest(self.snapshot, planeNormal, planeDistance, forwardAxis, rotationAxis, jointPlanes, self.maxJoints, self.solution))
+        
+    """
+    Drops any refresh that's still being solved
+    """
+    def cancelRefresh(self):
+        if(self.worker is not None):
+            self.worker.cancel()
+            
+    def onWorkerResult(self, result):
+        #the chain was changed or reread while this was being solved
+        if(result is None or result.request.snapshot is not self.snapshot):
+            return
+        
+        self.updateLevelOfDetail(result)
+        self.onFrameFunc(result.frame)
+        
+    """
+    Halves the joints shown after a refresh over budget and doubles them after one well under it
+    """
+    def updateLevelOfDetail(self, result):
+        self.lastRefreshTime = result.refreshTime
+        numShown = len(result.frame.jointPositions)
+        numJoints = result.frame.numJoints
+        
+        if(self.lastRefreshTime > self.frameBudget):
+            if(numShown > MIN_LOD_JOINTS):
+                self.maxJoints = max(MIN_LOD_JOINTS, numShown // 2)
+        elif(self.maxJoints is not None and self.lastRefreshTime < self.frameBudget * LOD_RAISE_FRACTION):
+            self.maxJoints *= 2
+            
+            if(self.maxJoints >= numJoints):
+                self.maxJoints = None
@@ -0,0 +1,210 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaRender as omr
+import maya.api.OpenMayaUI as omui
+import maya.cmds as cmds
+
+import os
+
+#Maya loads this file on its own rather than as part of the package, so these are imported through the package to share the draw frame with the tool
+import CoplanarJointOrient.jointPreview
+import CoplanarJointOrient.nodeHandle
+import CoplanarJointOrient.previewPlane
+
+"""
+Plugin with a locator that draws the joint preview from jointPreview in Viewport 2.0.
+
+Viewport 2.0 only draws things that belong to a node, so the preview gets one locator that's made with undo off and never saved with the scene.
+It has no attributes and nothing is ever set on it.  Each frame it draws whatever jointPreview.getDrawFrame has through MUIDrawManager,
+and the joints themselves are never touched.
+
+Loaded automatically by JointPreviewDisplay so there's no need to load it by hand.
+"""
+
+NODE_NAME = "coplanarJointOrientPreview"
+
+#from the range Maya leaves for local use
+NODE_ID = om.MTypeId(0x0007F3C0)
+
+DRAW_CLASSIFICATION = "drawdb/geometry/coplanarJointOrientPreview"
+DRAW_REGISTRANT_ID = "CoplanarJointOrientPreviewOverride"
+
+JOINT_PREVIEW_PLUGIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jointPreviewLocator.py")
+
+#size of the dots drawn at each joint in pixels
+JOINT_POINT_SIZE = 6.0
+
+def maya_useNewAPI():
+    pass
+
+class JointPreviewLocator(omui.MPxLocatorNode):
+    def __init__(self):
+        super(JointPreviewLocator, self).__init__()
+        
+    @staticmethod
+    def creator():
+        return JointPreviewLocator()
+    
+    @staticmethod
+    def initialize():
+        pass
+    
+    def isBounded(self):
+        return False
+    
+"""
+A frame converted to Maya arrays, kept between draws and only converted again when jointPreview has a new frame
+"""
+class JointPreviewDrawData(om.MUserData):
+    def __init__(self):
+        super(JointPreviewDrawData, self).__init__(False)
+        
+        self.frame = None
+        self.jointPoints = None
+        self.linePoints = None
+        self.lineColors = None
+        
+    def setFrame(self, frame):
+        self.frame = frame
+        
+        if(frame is None):
+            return
+        
+        self.jointPoints = om.MPointArray(frame.jointPositions.tolist())
+        self.linePoints = om.MPointArray(frame.linePoints.tolist())
+        self.lineColors = om.MColorArray([om.MColor(color) for color in frame.lineColors.tolist()])
+        
+class JointPreviewDrawOverride(omr.MPxDrawOverride):
+    def __init__(self, obj):
+        #always dirty so a new frame shows up on the next refresh without anything being set on the node
+        super(JointPreviewDrawOverride, self).__init__(obj, None, True)
+        
+    @staticmethod
+    def creator(obj):
+        return JointPreviewDrawOverride(obj)
+    
+    def supportedDrawAPIs(self):
+        return omr.MRenderer.kAllDevices
+    
+    def isBounded(self, unusedObjPath, unusedCameraPath):
+        return False
+    
+    def boundingBox(self, unusedObjPath, unusedCameraPath):
+        return om.MBoundingBox()
+    
+    def hasUIDrawables(self):
+        return True
+    
+    def prepareForDraw(self, unusedObjPath, unusedCameraPath, unusedFrameContext, oldData):
+        data = oldData if isinstance(oldData, JointPreviewDrawData) else JointPreviewDrawData()
+        frame = CoplanarJointOrient.jointPreview.getDrawFrame()
+        
+        if(frame is not data.frame):
+            data.setFrame(frame)
+            
+        return data
+    
+    def addUIDrawables(self, unusedObjPath, drawManager, unusedFrameContext, data):
+        if(not isinstance(data, JointPreviewDrawData) or data.frame is None):
+            return
+        
+        drawManager.beginDrawable()
+        
+        drawManager.mesh(omr.MUIDrawManager.kLines, data.linePoints, None, data.lineColors)
+        
+        drawManager.setColor(om.MColor(CoplanarJointOrient.jointPreview.BONE_COLOR))
+        drawManager.setPointSize(JOINT_POINT_SIZE)
+        drawManager.points(data.jointPoints, False)
+        
+        drawManager.endDrawable()
+        
+"""
+Shows jointPreview frames in the viewport through one JointPreviewLocator, made the first time there's something to show
+"""
+class JointPreviewDisplay(object):
+    def __init__(self, name = "coplanarJointPreview"):
+        self.name = name
+        
+        #NodeHandle of the locator's transform while it exists
+        self.node = None
+        
+    def show(self, frame):
+        if(frame is None):
+            self.hide()
+            return
+        
+        if(self.node is None or not self.node.isValid()):
+            self.createNode()
+            
+        CoplanarJointOrient.jointPreview.setDrawFrame(frame)
+        scheduleRefresh()
+        
+    def hide(self):
+        if(CoplanarJointOrient.jointPreview.getDrawFrame() is not None):
+            CoplanarJointOrient.jointPreview.setDrawFrame(None)
+            scheduleRefresh()
+            
+    def delete(self):
+        CoplanarJointOrient.jointPreview.setDrawFrame(None)
+        
+        if(self.node is not None and self.node.isValid()):
+            name = self.node.longName()
+            
+            with CoplanarJointOrient.previewPlane.UndoDisabled():
+                cmds.delete(name)
+                
+        self.node = None
+        
+    def createNode(self):
+        if(not cmds.pluginInfo(os.path.splitext(os.path.basename(JOINT_PREVIEW_PLUGIN))[0], query=True, loaded=True)):
+            cmds.loadPlugin(JOINT_PREVIEW_PLUGIN, quiet=True)
+            
+        with CoplanarJointOrient.previewPlane.UndoDisabled():
+            transform = cmds.createNode("transform", name=self.name, skipSelect=True)
+            shape = cmds.createNode(NODE_NAME, name=self.name + "Shape", parent=transform, skipSelect=True)
+            
+            #make it unselectable so users can't accidentally delete it and break things
+            cmds.toggle(transform, state=True, template=True)
+            
+        self.node = CoplanarJointOrient.nodeHandle.NodeHandle.fromName(transform)
+        
+        #never saved with the scene
+        for name in [transform, shape]:
+            selection = om.MSelectionList()
+            selection.add(name)
+            om.MFnDependencyNode(selection.getDependNode(0)).setDoNotWrite(True)
+            
+def scheduleRefresh():
+    try:
+        omui.M3dView.active3dView().scheduleRefresh()
+    except RuntimeError:
+        #no viewport, like in mayapy
+        pass
+    
+def initializePlugin(plugin):
+    fnPlugin = om.MFnPlugin(plugin, "Ilya Seletsky", "0.9.0")
+    fnPlugin.registerNode(NODE_NAME, NODE_ID, JointPreviewLocator.creator, JointPreviewLocator.initialize, om.MPxNode.kLocatorNode, DRAW_CLASSIFICATION)
+    omr.MDrawRegistry.registerDrawOverrideCreator(DRAW_CLASSIFICATION, DRAW_REGISTRANT_ID, JointPreviewDrawOverride.creator)
+    
+def uninitializePlugin(plugin):
+    omr.MDrawRegistry.deregisterDrawOverrideCreator(DRAW_CLASSIFICATION, DRAW_REGISTRANT_ID)
+    om.MFnPlugin(plugin).deregisterNode(NODE_ID)
@@ -0,0 +1,107 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import functools
+import threading
+import traceback
+
+"""
+Runs jobs one at a time on a worker thread where only the newest job matters, like recomputing a preview while values are still being edited.
+
+Submitting a job makes every job before it stale.  A stale job that hasn't started yet is dropped, one that's running can check the isStale function it's given
+and give up early, and if it finishes anyway its result is thrown away.  Results of the newest job are handed to dispatchFunc to get them back to the main thread,
+like maya.utils.executeDeferred, and checked once more there in case something newer came in on the way.
+
+Jobs get their own arguments plus an isStale keyword argument and shouldn't touch anything the main thread might change while they run.
+Exceptions in a job are printed and otherwise ignored.
+"""
+class LatestJobWorker(object):
+    def __init__(self, onResultFunc, dispatchFunc):
+        #called on the main thread with the result of the newest job
+        self.onResultFunc = onResultFunc
+        self.dispatchFunc = dispatchFunc
+        
+        self.condition = threading.Condition()
+        self.pendingJob = None
+        self.latestJobId = 0
+        self.stopped = False
+        
+        #made the first time a job is submitted
+        self.thread = None
+        
+    """
+    Queues func(*args, isStale=isStale) to run on the worker thread, replacing any job that hasn't started yet
+    """
+    def submit(self, func, *args):
+        with self.condition:
+            self.latestJobId += 1
+            self.pendingJob = (self.latestJobId, func, args)
+            self.condition.notify()
+            
+        if(self.thread is None):
+            self.thread = threading.Thread(target=self.run, name="LatestJobWorker")
+            self.thread.daemon = True
+            self.thread.start()
+            
+    """
+    Makes every job submitted so far stale
+    """
+    def cancel(self):
+        with self.condition:
+            self.latestJobId += 1
+            self.pendingJob = None
+            
+    """
+    Cancels everything and lets the worker thread end
+    """
+    def stop(self):
+        with self.condition:
+            self.latestJobId += 1
+            self.pendingJob = None
+            self.stopped = True
+            self.condition.notify()
+            
+    def isStale(self, jobId):
+        return jobId != self.latestJobId
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pendingJob is None and not self.stopped:
+                    self.condition.wait()
+                    
+                if(self.stopped):
+                    return
+                
+                jobId, func, args = self.pendingJob
+                self.pendingJob = None
+                
+            try:
+                result = func(*args, isStale=functools.partial(self.isStale, jobId))
+            except Exception:
+                traceback.print_exc()
+                continue
+            
+            if(not self.isStale(jobId)):
+                self.dispatchFunc(functools.partial(self.deliver, jobId, result))
+                
+    def deliver(self, jobId, result):
+        if(not self.isStale(jobId)):
+            self.onResultFunc(result)
@@ -18,15 +18,14 @@ Stretch goals:
 -Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
+from __future__ import absolute_import
+
 import maya.api.OpenMaya as om
 
-"""
-Axis is used to track if something is on the x, y, or z axis and if it's pointing in the negative direction
-"""
-class Axis(object):
-    def __init__(self, axis=0, negative=False):
-        self.axis = axis
-        self.negative = negative
+import CoplanarJointOrient.batchMathUtil
+
+#lives in batchMathUtil so things that run without Maya can use it too
+Axis = CoplanarJointOrient.batchMathUtil.Axis
 
 """
 Given a rotation order string like xyz, zxy, etc...
@@ -56,6 +55,23 @@ def forwardVector(axis=Axis()):
     
     return om.MVector(components[0], components[1], components[2])
 
+"""
+Normalized sum of a bunch of direction vectors given as MVectors or [x, y, z] lists, the x axis if they cancel out or there aren't any
+"""
+def getAverageDirectionVector(directions):
+    averageDir = om.MVector()
+    
+    for direction in directions:
+        averageDir += om.MVector(direction)
+        
+    averageDir.normalize()
+    
+    #force a direction vector if one isn't found
+    if(averageDir.x == 0 and averageDir.y == 0 and averageDir.z == 0):
+        averageDir.x = 1
+        
+    return averageDir
+
 """
 Returns a normal for a plane that would be formed from 3 points
 """
@@ -112,3 +128,27 @@ def setPlaneWorldPosition(plane, position):
     plane.setPlane(plane.normal(), -plane.normal() * position)
 
     return plane
+
+
+"""
+Returns the translation part of an MMatrix as an MVector
+"""
+def matrixTranslation(matrix):
+    return om.MVector(matrix.getElement(3, 0), matrix.getElement(3, 1), matrix.getElement(3, 2))
+
+"""
+Returns an MMatrix as a flat list of 16 values in row order
+"""
+def matrixToList(matrix):
+    return [matrix.getElement(row, column) for row in range(4) for column in range(4)]
+
+"""
+Returns a copy of an MMatrix with its translation zeroed out
+"""
+def matrixWithoutTranslation(matrix):
+    result = om.MMatrix(matrix)
+    result.setElement(3, 0, 0)
+    result.setElement(3, 1, 0)
+    result.setElement(3, 2, 0)
+
+    return result
\ No newline at end of file
@@ -18,11 +18,35 @@ Stretch goals:
 -Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
 -Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
 """
+from __future__ import absolute_import
+
 import maya.api.OpenMaya as om
 import maya.cmds as cmds
-import mayaMathUtil
+import numpy as np
+
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.instrumentation
+import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.nodeHandle
+import CoplanarJointOrient.skeletonIndex
+import CoplanarJointOrient.worldTransformCache
+
+import json
+import os
+
+#plugin with the undoable command that writes all the transform channels of an Apply at once
+APPLY_CHANNELS_PLUGIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "applyChannelsCommand.py")
+
+#index of the scene's transform hierarchy, rebuilt lazily after anything in the DAG changes
+_skeletonIndex = None
+_skeletonIndexCallbacks = []
+
+#world matrices shared between everything that reads the same joints, with node dirty callbacks on every cached node and its ancestors by skeleton index position
+_worldTransformCache = CoplanarJointOrient.worldTransformCache.WorldTransformCache()
+_worldTransformCallbacks = {}
 
-import math
+#callbacks of nodes that were renamed, reparented or deleted, removed the next time the cache is read rather than from inside a scene callback
+_staleWorldTransformCallbacks = []
 
 """
 Gets the first selected object
@@ -36,19 +60,30 @@ def getFirstSelectedObject():
         return None
 
 """
-Name of an object's parent or None if no parent
+NodeHandle for a node name, resolved once where a name comes in from the UI so everything after works off the handle.
+Handles are passed through as is.  None if the name doesn't resolve to exactly one DAG node.
 """
-def getObjectParent(joint):
-    if(joint is None):
-        return None
+def getNodeHandle(node):
+    if(node is None or isinstance(node, CoplanarJointOrient.nodeHandle.NodeHandle)):
+        return node
 
-    parents = cmds.listRelatives(joint, parent=True)
+    return CoplanarJointOrient.nodeHandle.NodeHandle.fromName(node)
+
+"""
+NodeHandles for a list of node names, looked up through a single selection list
+"""
+def getNodeHandles(nodes):
+    return [CoplanarJointOrient.nodeHandle.NodeHandle(dagPath) for dagPath in getNodeDagPaths(nodes)]
+
+"""
+Current long name of a NodeHandle for the places that need a name like cmds calls, names are passed through as is
+"""
+def getNodeName(node):
+    if(isinstance(node, CoplanarJointOrient.nodeHandle.NodeHandle)):
+        return node.longName()
+
+    return node
 
-    if(parents):
-        return parents[0]
-    else:
-        return None
-       
 """
 Name of an object's children as a list, or empty if no children
 """
@@ -56,7 +91,134 @@ def getObjectChildren(joint):
     if(joint is None):
         return None
 
-    return cmds.listRelatives(joint, children=True)
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.HIERARCHY)
+
+    return cmds.listRelatives(getNodeName(joint), children=True)
+
+"""
+Index of every transform in the scene, joints included, built with a single ls the first time it's needed after the DAG changes.
+Registers scene callbacks the first time it's called that mark the index dirty on any reparent, rename, node creation or deletion, or scene change.
+"""
+def getSkeletonIndex():
+    global _skeletonIndex
+
+    if(not _skeletonIndexCallbacks):
+        _skeletonIndexCallbacks.extend([om.MDagMessage.addAllDagChangesCallback(invalidateSkeletonIndex),
+                                        om.MNodeMessage.addNameChangedCallback(om.MObject(), invalidateSkeletonIndex),
+                                        om.MDGMessage.addNodeAddedCallback(invalidateSkeletonIndex, "dagNode"),
+                                        om.MDGMessage.addNodeRemovedCallback(invalidateSkeletonIndex, "dagNode"),
+                                        om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, invalidateSkeletonIndex),
+                                        om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, invalidateSkeletonIndex)])
+
+    if(_skeletonIndex is None):
+        with CoplanarJointOrient.instrumentation.span("buildSkeletonIndex"):
+            CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.HIERARCHY)
+            _skeletonIndex = CoplanarJointOrient.skeletonIndex.SkeletonIndex(cmds.ls(dag=True, long=True, type="transform") or [])
+
+    return _skeletonIndex
+
+"""
+Index of the scene's transform hierarchy with the given nodes in it.
+A transform that exists but isn't in the index means a DAG change got past the callbacks so the index gets rebuilt once.
+"""
+def getSkeletonIndexFor(*nodes):
+    index = getSkeletonIndex()
+    names = [getNodeName(node) for node in nodes]
+
+    if(any(index.indexOf(name) is None and cmds.objExists(name) and cmds.objectType(name, isAType="transform") for name in names if name is not None)):
+        invalidateSkeletonIndex()
+        index = getSkeletonIndex()
+
+    return index
+
+"""
+Throws away the skeleton index so the next query rebuilds it.  Has the signature of a scene callback.
+Cached world transforms go too since the names they're cached by might not mean the same nodes anymore.
+"""
+def invalidateSkeletonIndex(*unused):
+    global _skeletonIndex
+    _skeletonIndex = None
+
+    _worldTransformCache.clear()
+    _staleWorldTransformCallbacks.extend(_worldTransformCallbacks.values())
+    _worldTransformCallbacks.clear()
+
+"""
+Throws away the skeleton index and world transform cache and removes their scene callbacks
+"""
+def releaseSkeletonIndex():
+    invalidateSkeletonIndex()
+
+    if(_skeletonIndexCallbacks):
+        om.MMessage.removeCallbacks(_skeletonIndexCallbacks)
+        del _skeletonIndexCallbacks[:]
+
+    removeStaleWorldTransformCallbacks()
+
+"""
+The shared world transform cache, mostly for looking at its hit and miss counters
+"""
+def getWorldTransformCache():
+    return _worldTransformCache
+
+"""
+Node dirty callback for a node whose world matrix or its descendants' might be cached.  The node's (start, end) subtree interval in the skeleton index is passed in as the client data.
+A stale callback that fires before it's removed only drops an interval of the rebuilt index's entries, which just get read again.
+"""
+def onWorldTransformDirty(unusedNode, unusedPlug, subtree):
+    _worldTransformCache.invalidate(*subtree)
+
+def removeStaleWorldTransformCallbacks():
+    for callbackId in _staleWorldTransformCallbacks:
+        try:
+            om.MMessage.removeCallback(callbackId)
+        except RuntimeError:
+            #the node was deleted along with its callbacks
+            pass
+
+    del _staleWorldTransformCallbacks[:]
+
+"""
+World matrices of a bunch of nodes as flat lists of 16 values, read from the shared cache where possible.
+Whatever isn't cached is read in one go and gets dirty callbacks on it and its ancestors so it stays cached until something moves it.
+"""
+@CoplanarJointOrient.instrumentation.instrumented("getCachedWorldMatrices")
+def getCachedWorldMatrices(nodes):
+    if(not nodes):
+        return []
+
+    removeStaleWorldTransformCallbacks()
+
+    index = getSkeletonIndexFor(*nodes)
+    nodeIndices = [index.indexOf(getNodeName(node)) for node in nodes]
+
+    res = _worldTransformCache.lookup(nodeIndices)
+    missing = [position for position in range(len(res)) if res[position] is None]
+
+    if(missing):
+        CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.TRANSFORM_READ, len(missing))
+        readMatrices = [CoplanarJointOrient.mayaMathUtil.matrixToList(dagPath.inclusiveMatrix()) for dagPath in getNodeDagPaths([nodes[position] for position in missing])]
+
+        for position, matrix in zip(missing, readMatrices):
+            res[position] = matrix
+
+        #only nodes the index knows about can be watched, anything else just gets read every time
+        indexed = [position for position in missing if nodeIndices[position] is not None]
+        _worldTransformCache.store([nodeIndices[position] for position in indexed], [res[position] for position in indexed])
+
+        for position in indexed:
+            watchWorldTransform(index, nodeIndices[position])
+
+    return res
+
+"""
+Adds dirty callbacks to a node and its ancestors in the skeleton index, stopping at the first one that's already watched
+"""
+def watchWorldTransform(index, nodeIndex):
+    while(nodeIndex >= 0 and nodeIndex not in _worldTransformCallbacks):
+        subtree = (nodeIndex, nodeIndex + int(index.subtreeSizes[nodeIndex]))
+        _worldTransformCallbacks[nodeIndex] = om.MNodeMessage.addNodeDirtyPlugCallback(getNodeObject(index.names[nodeIndex]), onWorldTransformDirty, subtree)
+        nodeIndex = int(index.parents[nodeIndex])
 
 """
 Returns whether or not a child is a descendant of a parent object
@@ -64,138 +226,344 @@ Returns whether or not a child is a descendant of a parent object
 def isDescendant(child, parent):
     if(parent is None or child is None or parent == child):
         return False
-    
-    currJoint = child
 
-    while currJoint:
-        currJoint = getObjectParent(currJoint)
-
-        if(currJoint == parent):
-            return True
-
-    return False
+    return getSkeletonIndexFor(child, parent).isDescendant(getNodeName(child), getNodeName(parent))
 
 """
 Returns a list of object names between the root and end of a parent heirarchy in order from end to root.
-Doesn't include end and root.
+Doesn't include end and root.  None if the parent isn't an ancestor of the child.
 """
 def getInnerParentChain(parent, child):
     if(parent is None or child is None or parent == child):
         return None
-    
-    currNode = getObjectParent(child)
-    
-    res = []
 
-    while currNode and currNode != parent:
-        res.append(currNode)    
-        currNode = getObjectParent(currNode)
-        
-    return res
+    return getSkeletonIndexFor(parent, child).getInnerParentChain(getNodeName(parent), getNodeName(child))
 
 """
 Returns a list of object names between the root and end of a parent heirarchy in order from end to root.
-Includes end and root.
+Includes end and root.  None if the parent isn't an ancestor of the child.
 """
 def getWholeParentChain(parent, child):
     if(parent is None or child is None or parent == child):
         return None
-        
-    currNode = getObjectParent(child)
-    
-    res = [child]
 
-    while currNode and currNode != parent:
-        res.append(currNode)
-        currNode = getObjectParent(currNode)
-        
-    res.append(parent)
-    
-    return res
+    return getSkeletonIndexFor(parent, child).getWholeParentChain(getNodeName(parent), getNodeName(child))
 
-def getAverageNodePositions(nodes):
-    centroid = om.MVector()
-    numPoints = 0
-    
-    for node in nodes:
-        position = cmds.xform(node, query=True, translation=True, absolute=True, worldSpace = True)
-        centroid.x += position[0]
-        centroid.y += position[1]
-        centroid.z += position[2]
-        numPoints += 1
-        
-    if(numPoints > 0):
-        centroid /= numPoints
-        
-    return centroid
-
-def getAverageNodeDirectionVector(nodes, axis = mayaMathUtil.Axis()):
-    averageDir = om.MVector()
-    
-    for node in nodes:
-        orientation = mayaMathUtil.eulerToDirectionVector(getObjectWorldOrientation(node), axis)
-        averageDir.x += orientation[0]
-        averageDir.y += orientation[1]
-        averageDir.z += orientation[2]
-                    
-    averageDir.normalize()
+"""
+World positions of a bunch of nodes read in one go, as a list of [x, y, z] lists in UI units like the rest of the plane settings
+"""
+def getNodeWorldPositions(nodes):
+    if(not nodes):
+        return []
+
+    toUI = om.MDistance.internalToUI(1.0)
+
+    return [[value * toUI for value in matrix[12:15]] for matrix in getCachedWorldMatrices(nodes)]
+
+"""
+Average of an Nx3 array of points as an MVector, or the origin if there aren't any
+"""
+def getAveragePoint(points):
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+
+    if(len(points) == 0):
+        return om.MVector()
+
+    return om.MVector(*points.mean(axis=0))
+
+"""
+Everything currently selected split into whole objects and component points.
+Returns a list of the long names of the selected objects and an Nx3 numpy array of the world positions of every selected component in UI units.
+Mesh vertices are read with one getPoints per mesh, edges and faces count as the vertices they're made of, and any other components like CVs are read with a single xform.
+"""
+@CoplanarJointOrient.instrumentation.instrumented("getSelectionPoints")
+def getSelectionPoints():
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.SELECTION)
+    selection = om.MGlobal.getActiveSelectionList()
+
+    nodes = []
+    meshComponents = []
+    otherComponents = []
+
+    for index in range(selection.length()):
+        try:
+            dagPath, component = selection.getComponent(index)
+        except TypeError:
+            #not a DAG node so it has no position
+            continue
+
+        if(component.isNull()):
+            #a selected shape stands in for its transform
+            if(not dagPath.node().hasFn(om.MFn.kTransform)):
+                dagPath.pop()
+
+            nodes.append(dagPath.fullPathName())
+        elif(dagPath.hasFn(om.MFn.kMesh)):
+            meshComponents.extend(selection.getSelectionStrings(index))
+        else:
+            otherComponents.extend(selection.getSelectionStrings(index))
+
+    points = []
+
+    if(meshComponents):
+        #edges and faces become the vertices they use, and shared vertices only count once per mesh
+        vertexSelection = om.MSelectionList()
+
+        for vertices in cmds.polyListComponentConversion(meshComponents, toVertex=True):
+            vertexSelection.add(vertices)
+
+        meshVertices = {}
+
+        for index in range(vertexSelection.length()):
+            dagPath, component = vertexSelection.getComponent(index)
+            dagPath.extendToShape()
+            meshVertices.setdefault(dagPath.fullPathName(), (dagPath, []))[1].append(np.array(om.MFnSingleIndexedComponent(component).getElements(), dtype=np.int64))
+
+        for dagPath, vertexIndices in meshVertices.values():
+            meshPoints = np.array(om.MFnMesh(dagPath).getPoints(om.MSpace.kWorld))[:, :3]
+            points.append(meshPoints[np.unique(np.concatenate(vertexIndices))] * om.MDistance.internalToUI(1.0))
+
+    if(otherComponents):
+        points.append(np.array(cmds.xform(otherComponents, query=True, translation=True, absolute=True, worldSpace=True), dtype=float).reshape(-1, 3))
+
+    return nodes, (np.concatenate(points) if points else np.zeros((0, 3)))
+
+"""
+Average position of the selection, with whole objects and component points all weighted the same
+"""
+def getSelectionAveragePosition():
+    nodes, points = getSelectionPoints()
+
+    return getAveragePoint(np.concatenate([np.asarray(getNodeWorldPositions(nodes), dtype=float).reshape(-1, 3), points]))
+
+"""
+Direction vector of the selection.
+Selected objects give their average axis direction like getAverageNodeDirectionVector.  Selected components give the normal of the plane that best fits their points,
+flipped to agree with the objects if there are any.
+"""
+def getSelectionDirectionVector(axis = CoplanarJointOrient.mayaMathUtil.Axis()):
+    nodes, points = getSelectionPoints()
+
+    nodeDirection = getAverageNodeDirectionVector(nodes, axis) if nodes else None
+
+    if(len(points) < 3):
+        return nodeDirection if nodeDirection is not None else getAverageNodeDirectionVector([], axis)
+
+    normal = CoplanarJointOrient.chainSolver.fitPlane(points)[0]
+
+    if(nodeDirection is not None):
+        if(np.dot(normal, [nodeDirection.x, nodeDirection.y, nodeDirection.z]) < 0):
+            normal = -normal
+    elif(normal[np.argmax(np.abs(normal))] < 0):
+        #with nothing else to go on keep the sign stable by pointing the biggest component positive
+        normal = -normal
+
+    return om.MVector(*normal)
+
+def getAverageNodeDirectionVector(nodes, axis = CoplanarJointOrient.mayaMathUtil.Axis()):
+    directions = []
     
-    #force a direction vector if one isn't found
-    if(averageDir.x == 0 and averageDir.y == 0 and averageDir.z == 0):
-        averageDir.x = 1
+    if(nodes):
+        forward = CoplanarJointOrient.mayaMathUtil.forwardVector(axis)
+        directions = [forward.rotateBy(rotation) for rotation in getObjectWorldRotations(nodes)]
                     
-    return averageDir
+    return CoplanarJointOrient.mayaMathUtil.getAverageDirectionVector(directions)
 
 def isJoint(node):
     if(node is None):
         return None
     
+    if(isinstance(node, CoplanarJointOrient.nodeHandle.NodeHandle)):
+        return node.isValid() and node.getObject().hasFn(om.MFn.kJoint)
+
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.NAME_LOOKUP)
+
     return cmds.objectType(node, isAType="joint")
 
 """
-World position of a joint
+Name of an object's transform children (joints included) as long names, or empty if no children.
+Unlike getObjectChildren this skips shapes since they just follow their transform.
 """
-def getJointWorldPosition(joint):
-    if(joint is None):
-        return None
+def getObjectTransformChildren(node):
+    if(node is None):
+        return []
 
-    jointPos = cmds.joint(joint, query=True, position=True, absolute=True)
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.HIERARCHY)
+    children = cmds.listRelatives(getNodeName(node), children=True, type="transform", fullPath=True)
 
-    return om.MVector(jointPos[0], jointPos[1], jointPos[2])
+    return children if children else []
 
 """
-Returns an MEulerRotation representing the world orientation of a joint
+World matrices of a bunch of objects as flat lists of 16 values, read through the shared world transform cache.
+If parents is set, returns the world matrices of their parents instead.
 """
-def getJointWorldOrientation(joint):
-    if(joint is None):
+def getObjectWorldMatrices(nodes, parents=False):
+    if(not nodes):
+        return []
+
+    if(parents):
+        CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.TRANSFORM_READ, len(nodes))
+        return [CoplanarJointOrient.mayaMathUtil.matrixToList(dagPath.exclusiveMatrix()) for dagPath in getNodeDagPaths(nodes)]
+
+    return getCachedWorldMatrices(nodes)
+
+"""
+World rotations of a bunch of objects as MQuaternions, read from their cached world matrices so nothing in the scene changes and nothing goes in the undo queue
+"""
+def getObjectWorldRotations(nodes):
+    if(not nodes):
+        return []
+
+    return [om.MTransformationMatrix(om.MMatrix(matrix)).rotation(asQuaternion=True) for matrix in getCachedWorldMatrices(nodes)]
+
+"""
+MObject for a node name or NodeHandle
+"""
+def getNodeObject(node):
+    if(isinstance(node, CoplanarJointOrient.nodeHandle.NodeHandle)):
+        return node.getObject()
+
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.NAME_LOOKUP)
+    selection = om.MSelectionList()
+    selection.add(node)
+
+    return selection.getDependNode(0)
+
+"""
+MDagPath for a node name or NodeHandle
+"""
+def getNodeDagPath(node):
+    if(isinstance(node, CoplanarJointOrient.nodeHandle.NodeHandle)):
+        return node.getDagPath()
+
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.NAME_LOOKUP)
+    selection = om.MSelectionList()
+    selection.add(node)
+
+    return selection.getDagPath(0)
+
+"""
+MDagPaths for a list of node names or NodeHandles.  Handles already have theirs and the names are looked up through a single selection list.
+"""
+def getNodeDagPaths(nodes):
+    selection = om.MSelectionList()
+    selectionIndices = {}
+
+    #the selection list merges duplicates so keep track of where each name ended up
+    for node in nodes:
+        if(node in selectionIndices or isinstance(node, CoplanarJointOrient.nodeHandle.NodeHandle)):
+            continue
+
+        previousLength = selection.length()
+        selection.add(node)
+
+        #a different name for something already in the list doesn't add anything, so it gets looked up on its own
+        selectionIndices[node] = previousLength if selection.length() > previousLength else None
+
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.NAME_LOOKUP, len(selectionIndices))
+
+    return [selection.getDagPath(selectionIndices[node]) if selectionIndices.get(node) is not None else getNodeDagPath(node) for node in nodes]
+
+"""
+Child values of a compound double attribute like translate or rotate, in internal units (centimeters and radians)
+"""
+def getPlugValues(fnNode, attribute):
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.ATTRIBUTE_READ)
+    plug = fnNode.findPlug(attribute, False)
+
+    return [plug.child(index).asDouble() for index in range(plug.numChildren())]
+
+"""
+Computes the translate, rotate and jointOrient channel values that would give a transform some local matrix.
+Scale, shear, rotate axis and pivots are left alone and taken into account.
+
+For joints the difference goes into jointOrient and rotate is left as is, or zeroed if zeroRotate is set, which is how oriented joints are normally stored.
+For other transforms the difference goes into rotate.
+
+Returns the 9 values translate, rotate, jointOrient in internal units (centimeters and radians).  jointOrient is all 0 for non joints.
+"""
+def getTransformChannelsForLocalMatrix(node, localMatrix, zeroRotate=False):
+    if(node is None or localMatrix is None):
         return None
 
-    #small hack to create a duplicate joint so we don't mess with the original to get its world orientation
-    #TODO: turns out I might not need to do this?  Since world orientation is object world transformed by joint orientation.  Investigate later...
-    dupJoint = cmds.duplicate(joint, upstreamNodes=False, inputConnections=False, parentOnly=True)
+    fnNode = om.MFnDependencyNode(getNodeObject(node))
+
+    localMatrix = om.MMatrix(localMatrix)
+
+    #the matrix and rotate order, the other attributes count themselves in getPlugValues
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.ATTRIBUTE_READ, 2)
+    oldLocalMatrix = om.MFnMatrixData(fnNode.findPlug("matrix", False).asMObject()).matrix()
+
+    scale = getPlugValues(fnNode, "scale")
+    shear = getPlugValues(fnNode, "shear")
 
-    if(getObjectParent(dupJoint) is not None):
-        cmds.parent(dupJoint, world=True)
+    #scale * shear, the part of the matrix before the rotate axis
+    scaleShearMatrix = om.MMatrix([scale[0], 0, 0, 0,
+                                   shear[0] * scale[1], scale[1], 0, 0,
+                                   shear[1] * scale[2], shear[2] * scale[2], scale[2], 0,
+                                   0, 0, 0, 1])
 
-    jointRot = cmds.joint(dupJoint, query=True, position=False, orientation=True)
-    jointRotOrder = mayaMathUtil.nodeRotOrderToEulerRotOrder(cmds.joint(dupJoint, query=True, rotationOrder=True, absolute=True))
+    preRotateMatrix = scaleShearMatrix * om.MEulerRotation(getPlugValues(fnNode, "rotateAxis")).asMatrix()
 
-    cmds.delete(dupJoint)
+    rotOrder = fnNode.findPlug("rotateOrder", False).asInt()
+    rotate = getPlugValues(fnNode, "rotate")
+    rotateMatrix = om.MEulerRotation(rotate, rotOrder).asMatrix()
 
-    return om.MEulerRotation(math.radians(jointRot[0]), math.radians(jointRot[1]), math.radians(jointRot[2]), jointRotOrder)
+    if(fnNode.hasAttribute("jointOrient")):
+        jointOrientMatrix = om.MEulerRotation(getPlugValues(fnNode, "jointOrient")).asMatrix()
+
+        #whatever comes after the joint orient, the inverse parent scale for segment scale compensation
+        postOrientMatrix = (preRotateMatrix * rotateMatrix * jointOrientMatrix).inverse() * CoplanarJointOrient.mayaMathUtil.matrixWithoutTranslation(oldLocalMatrix)
+
+        if(zeroRotate):
+            rotate = [0, 0, 0]
+            rotateMatrix = om.MMatrix()
+
+        newOrientMatrix = (preRotateMatrix * rotateMatrix).inverse() * CoplanarJointOrient.mayaMathUtil.matrixWithoutTranslation(localMatrix) * postOrientMatrix.inverse()
+        newOrient = om.MTransformationMatrix(newOrientMatrix).rotation()
+
+        return list(CoplanarJointOrient.mayaMathUtil.matrixTranslation(localMatrix)) + list(rotate) + [newOrient.x, newOrient.y, newOrient.z]
+
+    newRotateMatrix = preRotateMatrix.inverse() * CoplanarJointOrient.mayaMathUtil.matrixWithoutTranslation(localMatrix)
+    newRotate = om.MTransformationMatrix(newRotateMatrix).rotation().reorder(rotOrder)
+
+    #the pivots add an offset to the translation that depends on the rotation
+    scalePivot = om.MVector(getPlugValues(fnNode, "scalePivot"))
+    scalePivotTranslate = om.MVector(getPlugValues(fnNode, "scalePivotTranslate"))
+    rotatePivot = om.MVector(getPlugValues(fnNode, "rotatePivot"))
+    rotatePivotTranslate = om.MVector(getPlugValues(fnNode, "rotatePivotTranslate"))
+
+    #rotateAxis * rotate is the local matrix without scale and shear
+    pivotOffset = (-scalePivot * scaleShearMatrix + scalePivot + scalePivotTranslate - rotatePivot) * (scaleShearMatrix.inverse() * CoplanarJointOrient.mayaMathUtil.matrixWithoutTranslation(localMatrix)) + rotatePivot + rotatePivotTranslate
+
+    return list(CoplanarJointOrient.mayaMathUtil.matrixTranslation(localMatrix) - pivotOffset) + [newRotate.x, newRotate.y, newRotate.z] + [0, 0, 0]
 
 """
-Gets an MEulerRotation representing the world orientation of an object
+Whether or not translate and rotate of a transform can be set directly, they can't if they're locked or driven by something like a constraint
 """
-def getObjectWorldOrientation(node):
+def isTransformSettable(node):
     if(node is None):
-        return None
-        
-    jointRot = getJointWorldOrientation(node) if isJoint(node) else om.MEulerRotation()
-    
-    rot = cmds.xform(node, query=True, translation=False, rotation=True, absolute=True)
-    rotOrder = mayaMathUtil.nodeRotOrderToEulerRotOrder(cmds.xform(node, query=True, rotateOrder=True, absolute=True))
-    
-    objRot = om.MEulerRotation(math.radians(rot[0]), math.radians(rot[1]), math.radians(rot[2]), rotOrder)
-    
-    return objRot * jointRot
\ No newline at end of file
+        return False
+
+    name = getNodeName(node)
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.ATTRIBUTE_READ, 2)
+
+    return cmds.getAttr(name + ".translate", settable=True) and cmds.getAttr(name + ".rotate", settable=True)
+
+"""
+Writes translate, rotate and jointOrient values from getTransformChannelsForLocalMatrix for a batch of nodes.
+Goes through the applyChannelsCommand plugin so the whole batch is a single undoable command.
+"""
+@CoplanarJointOrient.instrumentation.instrumented("applyTransformChannels")
+def applyTransformChannels(nodes, values):
+    if(not nodes):
+        return
+
+    CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.WRITE, len(nodes))
+
+    if(not cmds.pluginInfo(os.path.splitext(os.path.basename(APPLY_CHANNELS_PLUGIN))[0], query=True, loaded=True)):
+        cmds.loadPlugin(APPLY_CHANNELS_PLUGIN, quiet=True)
+
+    changes = {"nodes" : [getNodeName(node) for node in nodes], "values" : [list(nodeValues) for nodeValues in values]}
+
+    cmds.coplanarJointOrientApplyChannels(json.dumps(changes))
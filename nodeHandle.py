@@ -0,0 +1,78 @@
+import maya.api.OpenMaya as om
+
+"""
+Stable reference to a DAG node that survives renames and reparenting.
+Names are resolved to one of these once where they come in from the UI, and everything after that works off the handle instead of asking Maya to look the name up again.
+"""
+class NodeHandle(object):
+    def __init__(self, dagPath):
+        self.dagPath = om.MDagPath(dagPath)
+        self.handle = om.MObjectHandle(dagPath.node())
+
+        #for saving a reference to the node somewhere a handle can't go
+        self.uuid = om.MFnDependencyNode(dagPath.node()).uuid().asString()
+
+    """
+    Handle for a node name, or None if the name doesn't exist, isn't a DAG node or matches more than one node
+    """
+    @staticmethod
+    def fromName(name):
+        if(not name):
+            return None
+
+        selection = om.MSelectionList()
+
+        try:
+            selection.add(name)
+            return NodeHandle(selection.getDagPath(0))
+        except (RuntimeError, TypeError):
+            return None
+
+    def isValid(self):
+        return self.handle.isValid()
+
+    def getObject(self):
+        return self.handle.object() if self.isValid() else None
+
+    """
+    MDagPath to the node, found again if the node was reparented since the handle was made.  None if the node was deleted.
+    """
+    def getDagPath(self):
+        if(not self.isValid()):
+            return None
+
+        if(not self.dagPath.isValid() or self.dagPath.node() != self.handle.object()):
+            self.dagPath = om.MDagPath.getAPathTo(self.handle.object())
+
+        return self.dagPath
+
+    """
+    Current long name of the node, or None if it was deleted
+    """
+    def longName(self):
+        dagPath = self.getDagPath()
+
+        return dagPath.fullPathName() if dagPath is not None else None
+
+    """
+    Current shortest unique name of the node, or None if it was deleted
+    """
+    def shortName(self):
+        dagPath = self.getDagPath()
+
+        return dagPath.partialPathName() if dagPath is not None else None
+
+    def __eq__(self, other):
+        return isinstance(other, NodeHandle) and self.handle == other.handle
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self.handle.hashCode()
+
+    def __str__(self):
+        return self.longName() or ""
+
+    def __repr__(self):
+        return "NodeHandle(%r)" % self.longName()
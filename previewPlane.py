@@ -0,0 +1,141 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import numpy as np
+
+import CoplanarJointOrient.instrumentation
+import CoplanarJointOrient.mayaMathUtil
+import CoplanarJointOrient.nodeHandle
+
+#size of the preview plane in UI units when there's no chain to size it from
+DEFAULT_SIZE = 100.0
+
+#how much bigger than the chain's bounding box the preview plane is
+CHAIN_PADDING = 1.5
+
+"""
+Plane in the scene that shows where the joints are going to be lined up.
+
+The node is made once and after that only its transform is changed through the API, which takes microseconds and doesn't touch the undo queue.
+Making and deleting it is kept off the undo queue too, so undo and redo never bring back or take away the preview.
+If the node goes away anyway, like when a new scene is opened, it's made again the next time it's shown.
+"""
+class PreviewPlane(object):
+    def __init__(self, name = "coplanarPreviewPlane"):
+        self.name = name
+        
+        #NodeHandle of the plane while it exists
+        self.node = None
+        
+    """
+    Shows the plane lined up with an MPlane.
+    With chain positions, a list of [x, y, z] in UI units, the plane sits where the middle of the chain lands on it and is sized to fit the chain's bounding box.
+    Otherwise it's at position, or wherever the plane crosses an axis if that's None, and DEFAULT_SIZE across.
+    """
+    def update(self, plane, position = None, chainPositions = None):
+        if(plane is None):
+            self.hide()
+            return
+        
+        size = DEFAULT_SIZE
+        
+        if(chainPositions):
+            points = np.asarray(chainPositions, dtype=float).reshape(-1, 3)
+            boxMin = points.min(axis=0)
+            boxMax = points.max(axis=0)
+            
+            position = CoplanarJointOrient.mayaMathUtil.closestPointOnPlane(om.MVector(*((boxMin + boxMax) * 0.5)), plane)
+            size = max(float(np.linalg.norm(boxMax - boxMin)) * CHAIN_PADDING, 1.0)
+        elif(position is None):
+            position = getPlaneOrigin(plane)
+        else:
+            position = CoplanarJointOrient.mayaMathUtil.closestPointOnPlane(om.MVector(position), plane)
+            
+        dagPath = self.getDagPath()
+        
+        CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.WRITE)
+        
+        #the plane was made flat along Y and 1 unit across
+        fnTransform = om.MFnTransform(dagPath)
+        fnTransform.setTranslation(position * om.MDistance.uiToInternal(1.0), om.MSpace.kTransform)
+        fnTransform.setRotation(om.MVector.kYaxisVector.rotateTo(plane.normal()), om.MSpace.kTransform)
+        fnTransform.setScale([size, 1.0, size])
+        
+        fnTransform.findPlug("visibility", False).setBool(True)
+        
+    def hide(self):
+        if(self.node is not None and self.node.isValid()):
+            CoplanarJointOrient.instrumentation.countSceneCall(CoplanarJointOrient.instrumentation.WRITE)
+            om.MFnDependencyNode(self.node.getObject()).findPlug("visibility", False).setBool(False)
+            
+    def delete(self):
+        if(self.node is not None and self.node.isValid()):
+            name = self.node.longName()
+            
+            with UndoDisabled():
+                cmds.delete(name)
+                
+        self.node = None
+        
+    """
+    MDagPath to the plane, making it first if it doesn't exist
+    """
+    def getDagPath(self):
+        if(self.node is None or not self.node.isValid()):
+            with UndoDisabled():
+                name = cmds.polyPlane(name=self.name, width=1, height=1, subdivisionsX=1, subdivisionsY=1, axis=[0, 1, 0], constructionHistory=False)[0]
+                
+                #make plane unselectable so users can't accidentally delete it and break things
+                cmds.toggle(name, state=True, template=True)
+                
+            self.node = CoplanarJointOrient.nodeHandle.NodeHandle.fromName(name)
+            
+        return self.node.getDagPath()
+    
+"""
+Where a plane crosses the first axis its normal isn't perpendicular to, or the origin if the normal is all 0
+"""
+def getPlaneOrigin(plane):
+    normal = plane.normal()
+    
+    for axis in range(3):
+        if(normal[axis] != 0):
+            res = om.MVector()
+            res[axis] = -plane.distance() / normal[axis]
+            
+            return res
+        
+    return om.MVector()
+
+"""
+Turns off undo for whatever runs inside it without flushing the undo queue, and turns it back on after if it was on
+"""
+class UndoDisabled(object):
+    def __enter__(self):
+        self.wasEnabled = cmds.undoInfo(query=True, stateWithoutFlush=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+        
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        cmds.undoInfo(stateWithoutFlush=self.wasEnabled)
+        return False
@@ -0,0 +1,392 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import argparse
+import functools
+import json
+import sys
+import timeit
+
+import CoplanarJointOrient.batchMathUtil
+import CoplanarJointOrient.instrumentation
+
+import CoplanarJointOrient.SceneBackend.SceneBackend
+
+"""
+Records what an artist does in the tool to a trace file so the session can be replayed headless and profiled offline.
+
+While recording, every value change that comes from the UI and every button press like Apply is written to the trace as it happens, along with how long it took.
+Value changes set off by other value changes, like the turn axis flipping when the aim axis is set to the same axis, aren't recorded since replaying the first one sets them off again.
+The trace starts with the values everything had when recording started and optionally a snapshot of the scene's transforms so it can be replayed without the scene file.
+
+The trace is JSON lines, a header and then one line per event.  Replaying needs mayapy since the tool's values are OpenMaya types:
+mayapy -m CoplanarJointOrient.sessionTrace session.jsonl --memory --profile replay.jsonl
+"""
+
+TRACE_VERSION = 1
+
+#recorder everything is written to, None while not recording
+_recorder = None
+
+def getRecorder():
+    return _recorder
+
+"""
+Starts recording a tool's session to a trace file and returns the recorder
+"""
+def startRecording(tool, path, snapshotScene=True):
+    global _recorder
+    
+    stopRecording()
+    
+    #the header should have what's in the UI, not what's still waiting to go into the values.  Done before recording so it isn't recorded as changes.
+    tool.flushChanges()
+    
+    _recorder = SessionRecorder(tool, path)
+    _recorder.start(snapshotScene)
+    
+    return _recorder
+
+def stopRecording():
+    global _recorder
+    
+    if(_recorder is not None):
+        _recorder.stop()
+        _recorder = None
+
+"""
+Paths of every value of a tool, like "turnAxis" or "advancedPlaneMode.planePosition", to the values.
+Values are anything with callChangeFunc and plane modes anything with updatePlane, found by walking the tool's attributes.
+"""
+def getValuePaths(tool):
+    res = {}
+    
+    for name, attribute in sorted(vars(tool).items()):
+        if(hasattr(attribute, "callChangeFunc")):
+            res[name] = attribute
+        elif(hasattr(attribute, "updatePlane")):
+            for valueName, value in sorted(vars(attribute).items()):
+                if(hasattr(value, "callChangeFunc")):
+                    res[name + "." + valueName] = value
+                    
+    return res
+
+"""
+Names of the tool's plane mode attributes to the plane modes
+"""
+def getPlaneModePaths(tool):
+    return dict((name, attribute) for name, attribute in vars(tool).items() if hasattr(attribute, "updatePlane"))
+
+"""
+A value's value as something JSON can hold.  Vectors become lists, axes dictionaries and nodes their long names.
+"""
+def serializeValue(value):
+    if(value is None or isinstance(value, (bool, int, float))):
+        return value
+    
+    if(hasattr(value, "axis") and hasattr(value, "negative")):
+        return {"axis" : value.axis, "negative" : bool(value.negative)}
+    
+    if(hasattr(value, "longName")):
+        return {"node" : value.longName()}
+    
+    if(hasattr(value, "x")):
+        return {"vector" : [value.x, value.y, value.z]}
+    
+    return {"string" : str(value)}
+
+def deserializeValue(value):
+    if(not isinstance(value, dict)):
+        return value
+    
+    if("axis" in value):
+        return CoplanarJointOrient.batchMathUtil.Axis(axis=value["axis"], negative=value["negative"])
+    
+    if("vector" in value):
+        import maya.api.OpenMaya as om
+        return om.MVector(value["vector"])
+    
+    #joint values take names
+    if("node" in value):
+        return value["node"]
+    
+    return value["string"]
+
+"""
+Writes a tool's session to a trace file
+"""
+class SessionRecorder(object):
+    def __init__(self, tool, path):
+        self.tool = tool
+        self.path = path
+        self.traceFile = None
+        
+        #value objects and plane modes to their paths
+        self.valuePaths = {}
+        self.planeModePaths = {}
+        
+        #how many events are running, only the outermost one is recorded
+        self.depth = 0
+        self.startTime = None
+        
+    def start(self, snapshotScene=True):
+        valuePaths = getValuePaths(self.tool)
+        self.valuePaths = dict((id(value), path) for path, value in valuePaths.items())
+        
+        self.planeModePaths = dict((id(planeMode), path) for path, planeMode in getPlaneModePaths(self.tool).items())
+        backend = CoplanarJointOrient.SceneBackend.SceneBackend.getSceneBackend()
+        
+        header = {"type" : "header", "version" : TRACE_VERSION, "sceneFile" : getSceneFile(), 
+                  "values" : dict((path, serializeValue(value.value)) for path, value in valuePaths.items()),
+                  "currentPlaneMode" : self.planeModePaths.get(id(self.tool.currentPlaneMode)), 
+                  "snapshot" : backend.getSnapshot() if snapshotScene else None}
+        
+        self.traceFile = open(self.path, "w")
+        self.write(header)
+        self.startTime = timeit.default_timer()
+        
+    def stop(self):
+        if(self.traceFile is not None):
+            self.traceFile.close()
+            self.traceFile = None
+            
+    def write(self, event):
+        self.traceFile.write(json.dumps(event, sort_keys=True) + "\n")
+        self.traceFile.flush()
+        
+    """
+    Starts an event, returning it if it's the outermost one and should be recorded
+    """
+    def beginEvent(self, event):
+        self.depth += 1
+        
+        if(self.depth > 1):
+            return None
+        
+        event["time"] = timeit.default_timer() - self.startTime
+        
+        return event
+    
+    def endEvent(self, event):
+        self.depth -= 1
+        
+        if(event is not None and self.traceFile is not None):
+            event["duration"] = timeit.default_timer() - self.startTime - event["time"]
+            self.write(event)
+            
+    def beginValueChange(self, value):
+        path = self.valuePaths.get(id(value))
+        
+        #values the tool made after recording started can't be found on replay
+        if(path is None):
+            self.depth += 1
+            return None
+        
+        return self.beginEvent({"type" : "value", "path" : path, "value" : serializeValue(value.value)})
+    
+    def beginAction(self, name, args):
+        return self.beginEvent({"type" : "action", "name" : name, "args" : [self.serializeArgument(arg) for arg in args]})
+    
+    def serializeArgument(self, arg):
+        if(id(arg) in self.planeModePaths):
+            return {"planeMode" : self.planeModePaths[id(arg)]}
+        
+        return serializeValue(arg)
+
+"""
+Context manager for recording one event, does nothing while not recording
+"""
+class RecordedEvent(object):
+    def __init__(self, recorder, beginFunc, *args):
+        self.recorder = recorder
+        self.beginFunc = beginFunc
+        self.args = args
+        self.event = None
+        
+    def __enter__(self):
+        self.event = self.beginFunc(*self.args)
+        return self.event
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        self.recorder.endEvent(self.event)
+        return False
+
+class NotRecording(object):
+    def __enter__(self):
+        return None
+    
+    def __exit__(self, unusedType, unusedValue, unusedTraceback):
+        return False
+    
+_notRecording = NotRecording()
+
+"""
+Wraps a ValueBase calling its change function
+"""
+def recordValueChange(value):
+    if(_recorder is None):
+        return _notRecording
+    
+    return RecordedEvent(_recorder, _recorder.beginValueChange, value)
+
+"""
+Decorator for tool methods that buttons call, like apply, so they're recorded and called again with the same arguments on replay.
+Arguments can be anything serializeValue handles or one of the tool's plane modes.
+"""
+def recordedAction(func):
+    @functools.wraps(func)
+    def wrapper(tool, *args):
+        if(_recorder is None):
+            return func(tool, *args)
+        
+        with RecordedEvent(_recorder, _recorder.beginAction, func.__name__, args):
+            return func(tool, *args)
+        
+    return wrapper
+
+def getSceneFile():
+    try:
+        import maya.cmds as cmds
+    except ImportError:
+        return None
+    
+    return cmds.file(query=True, sceneName=True) or None
+
+"""
+Header and events of a trace file
+"""
+def loadTrace(path):
+    with open(path, "r") as traceFile:
+        lines = [json.loads(line) for line in traceFile if line.strip()]
+        
+    if(not lines or lines[0].get("type") != "header"):
+        raise ValueError(path + " isn't a session trace")
+    
+    if(lines[0]["version"] > TRACE_VERSION):
+        raise ValueError(path + " was recorded by a newer version of the tool")
+    
+    return lines[0], lines[1:]
+
+"""
+Replays a trace on a headless tool and returns the timings of every event, with the duration it had when it was recorded.
+The scene has to be set up already, either the scene file opened or a MemorySceneBackend loaded from the trace's snapshot and set as the scene backend.
+Each event also runs in an instrumentation span named after it, so running this inside an InstrumentationSession breaks down where each event's time went.
+"""
+def replayTrace(header, events):
+    #the tool needs Maya so it's only imported when replaying
+    import CoplanarJointOrient.CoplanarJointOrient
+    
+    tool = CoplanarJointOrient.CoplanarJointOrient.CoplanarJointOrient(showUI=False)
+    valuePaths = getValuePaths(tool)
+    planeModes = getPlaneModePaths(tool)
+    
+    try:
+        #where everything was when recording started, joints last so the chain is only set up once
+        for path, value in sorted(header["values"].items(), key=lambda item: (type(valuePaths.get(item[0])).__name__ == "JointValue", item[0])):
+            if(path in valuePaths):
+                valuePaths[path].setValue(deserializeValue(value))
+                
+        if(header["currentPlaneMode"] is not None):
+            tool.updatePlaneMode(planeModes[header["currentPlaneMode"]], None)
+            
+        timings = []
+        
+        for index, event in enumerate(events):
+            name = event["path"] if event["type"] == "value" else event["name"]
+            
+            with CoplanarJointOrient.instrumentation.span(event["type"] + " " + name):
+                start = timeit.default_timer()
+                
+                if(event["type"] == "value"):
+                    valuePaths[event["path"]].setValue(deserializeValue(event["value"]))
+                else:
+                    getattr(tool, event["name"])(*[planeModes[arg["planeMode"]] if isinstance(arg, dict) and "planeMode" in arg else deserializeValue(arg) for arg in event["args"]])
+                    
+                duration = timeit.default_timer() - start
+                
+            timings.append({"index" : index, "type" : event["type"], "name" : name, "recordedDuration" : event.get("duration"), "duration" : duration})
+    finally:
+        tool.cancel()
+        
+    return timings
+
+def formatTimings(timings, numSlowest=10):
+    lines = ["%d events, %.3f ms replayed, %.3f ms recorded" % (len(timings), sum(timing["duration"] for timing in timings) * 1000.0, 
+                                                               sum(timing["recordedDuration"] or 0.0 for timing in timings) * 1000.0)]
+    
+    for timing in sorted(timings, key=lambda timing: -timing["duration"])[:numSlowest]:
+        lines.append("%6d %-8s %-48s %10.3f ms (recorded %.3f ms)" % (timing["index"], timing["type"], timing["name"], timing["duration"] * 1000.0, 
+                                                                     (timing["recordedDuration"] or 0.0) * 1000.0))
+        
+    return "\n".join(lines)
+
+"""
+Replays a trace from the command line in mayapy
+"""
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Replays a recorded coplanar joint orient session headless")
+    parser.add_argument("trace", help="trace file recorded with startRecording")
+    parser.add_argument("--scene", help="scene file to replay in, the one the trace was recorded in by default")
+    parser.add_argument("--memory", action="store_true", help="replay on the scene snapshot in the trace held in memory instead of a Maya scene")
+    parser.add_argument("--profile", help="JSON lines file to write instrumentation spans for the replay to")
+    parser.add_argument("--output", help="JSON file to write the timing of every event to")
+    options = parser.parse_args(args)
+    
+    import maya.standalone
+    maya.standalone.initialize()
+    
+    import maya.cmds as cmds
+    import CoplanarJointOrient.SceneBackend.MemorySceneBackend
+    
+    header, events = loadTrace(options.trace)
+    
+    if(options.memory):
+        if(header["snapshot"] is None):
+            raise ValueError(options.trace + " was recorded without a scene snapshot")
+        
+        #the preview plane still goes in an empty Maya scene
+        cmds.file(new=True, force=True)
+        
+        backend = CoplanarJointOrient.SceneBackend.MemorySceneBackend.MemorySceneBackend()
+        backend.loadSnapshot(header["snapshot"])
+        CoplanarJointOrient.SceneBackend.SceneBackend.setSceneBackend(backend)
+    else:
+        cmds.file(options.scene or header["sceneFile"], open=True, force=True)
+        
+    session = CoplanarJointOrient.instrumentation.startSession(jsonLinesPath=options.profile) if options.profile else None
+    
+    try:
+        timings = replayTrace(header, events)
+    finally:
+        if(session is not None):
+            session.stop()
+            
+    print(formatTimings(timings))
+    
+    if(options.output):
+        with open(options.output, "w") as outputFile:
+            json.dump(timings, outputFile, indent=1)
+            
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
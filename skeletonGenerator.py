@@ -0,0 +1,148 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+from __future__ import absolute_import
+
+import math
+import random
+
+"""
+Made up skeletons for benchmarks, described as plain lists so the same skeleton can be built into any scene.
+Every character is a root joint with branchingFactor chains of chainLength joints hanging off it like limbs, and every chain joint gets childrenPerJoint extra leaf joints like twist or helper joints.
+Joints are placed with a seeded random walk that wanders off the plane, so every chain actually has something to coplanarize and the same seed always gives the same skeleton.
+"""
+
+class SkeletonDescription(object):
+    def __init__(self):
+        #per node, a node's index is its position in these lists and parents always come before their children
+        self.names = []
+        self.parents = []
+        
+        #in UI units, degrees for the angles
+        self.translates = []
+        self.rotates = []
+        self.jointOrients = []
+        
+        #(root index, end index) of every chain, in order of character then branch
+        self.chains = []
+        
+        #index of each character's root joint
+        self.characterRoots = []
+        
+    def __len__(self):
+        return len(self.names)
+        
+    def addNode(self, name, parent, translate, rotate=(0, 0, 0), jointOrient=(0, 0, 0)):
+        self.names.append(name)
+        self.parents.append(parent)
+        self.translates.append(list(translate))
+        self.rotates.append(list(rotate))
+        self.jointOrients.append(list(jointOrient))
+        
+        return len(self.names) - 1
+
+"""
+Generates a SkeletonDescription.  chainLength is the number of joints in each chain including its root and end.
+"""
+def generateSkeleton(chainLength=10, branchingFactor=1, childrenPerJoint=0, numCharacters=1, seed=0):
+    if(chainLength < 2):
+        raise ValueError("Chains need at least 2 joints")
+    
+    rand = random.Random(seed)
+    description = SkeletonDescription()
+    
+    for characterIndex in range(numCharacters):
+        characterRoot = description.addNode("character" + str(characterIndex), -1, (characterIndex * 100.0, 0, 0))
+        description.characterRoots.append(characterRoot)
+        
+        for branchIndex in range(branchingFactor):
+            #limbs fan out around the character
+            angle = 360.0 * branchIndex / branchingFactor
+            parent = description.addNode("branch" + str(branchIndex), characterRoot, (0, 10.0, 0), jointOrient=(0, angle, 0))
+            chainRoot = parent
+            
+            for jointIndex in range(1, chainLength):
+                addLeafChildren(description, parent, childrenPerJoint, rand)
+                
+                #chain joints can all have the same short name since their long names are what's used, which keeps long names short on really long chains
+                length = rand.uniform(1.0, 3.0)
+                translate = (length, rand.uniform(-0.3, 0.3) * length, rand.uniform(-0.3, 0.3) * length)
+                parent = description.addNode("j", parent, translate, randomAngles(rand, 10.0), randomAngles(rand, 20.0))
+            
+            addLeafChildren(description, parent, childrenPerJoint, rand)
+            description.chains.append((chainRoot, parent))
+            
+    return description
+
+def addLeafChildren(description, parent, numChildren, rand):
+    for childIndex in range(numChildren):
+        description.addNode("c" + str(childIndex), parent, (rand.uniform(0.2, 1.0), rand.uniform(-1.0, 1.0), rand.uniform(-1.0, 1.0)), randomAngles(rand, 45.0))
+        
+def randomAngles(rand, maxAngle):
+    return [rand.uniform(-maxAngle, maxAngle) for unused in range(3)]
+
+"""
+Builds a skeleton into a MemorySceneBackend, a new one unless one is passed in.
+Returns the backend and the long name of every node in the description's order.
+"""
+def buildMemorySkeleton(description, backend=None):
+    #only imported when it's needed like getSceneBackend does, these need the package on the path
+    import CoplanarJointOrient.SceneBackend.MemorySceneBackend
+    
+    if(backend is None):
+        backend = CoplanarJointOrient.SceneBackend.MemorySceneBackend.MemorySceneBackend()
+    
+    longNames = []
+    
+    for index, name in enumerate(description.names):
+        parentIndex = description.parents[index]
+        
+        longNames.append(backend.addNode(name, longNames[parentIndex] if parentIndex >= 0 else None, description.translates[index], 
+                                         [math.radians(value) for value in description.rotates[index]],
+                                         [math.radians(value) for value in description.jointOrients[index]]))
+        
+    return backend, longNames
+
+"""
+Builds a skeleton into the current Maya scene as joints.  Returns the long name of every node in the description's order.
+"""
+def buildMayaSkeleton(description):
+    import maya.cmds as cmds
+    
+    longNames = []
+    
+    for index, name in enumerate(description.names):
+        parentIndex = description.parents[index]
+        
+        if(parentIndex >= 0):
+            node = cmds.createNode("joint", name=name, parent=longNames[parentIndex], skipSelect=True)
+        else:
+            node = cmds.createNode("joint", name=name, skipSelect=True)
+            
+        #Maya might have renamed it to keep it unique, and the short name it gives back might match other nodes
+        node = (longNames[parentIndex] if parentIndex >= 0 else "") + "|" + node.rsplit("|", 1)[-1]
+        
+        cmds.setAttr(node + ".translate", *description.translates[index])
+        cmds.setAttr(node + ".rotate", *description.rotates[index])
+        cmds.setAttr(node + ".jointOrient", *description.jointOrients[index])
+        
+        longNames.append(node)
+        
+    return longNames
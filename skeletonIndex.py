@@ -0,0 +1,135 @@
+import numpy as np
+
+"""
+Compact index of a DAG hierarchy built from a list of long names, so ancestry and chain queries don't have to go back to Maya one step at a time.
+Everything in here works on plain names and arrays so it doesn't need Maya.  Keeping it up to date with the scene is up to the caller.
+
+Nodes are stored in sorted long name order.  Every node's descendants share its long name plus a "|" as a prefix so they sit in one contiguous block right after it,
+which makes the sorted position and subtree size an interval numbering of the hierarchy.
+"""
+
+class SkeletonIndex(object):
+    def __init__(self, longNames = ()):
+        #long names in sorted order, a node's index is its position in here
+        #"|" sorts before any character allowed in a name so a node's descendants come before siblings like "joint1_end" that share its name as a prefix
+        self.names = sorted(set(longNames), key=lambda name: name.replace("|", "\x01"))
+
+        #long name to index
+        self.indices = dict(zip(self.names, range(len(self.names))))
+
+        #leaf name to indices of every node with that leaf name, for looking up short and partial names
+        self.leafIndices = {}
+
+        for index, name in enumerate(self.names):
+            self.leafIndices.setdefault(name.rsplit("|", 1)[-1], []).append(index)
+
+        numNodes = len(self.names)
+
+        #index of each node's parent, -1 for nodes under the world
+        self.parents = np.full(numNodes, -1, dtype=np.int64)
+
+        #how many ancestors each node has
+        self.depths = np.zeros(numNodes, dtype=np.int64)
+
+        for index, name in enumerate(self.names):
+            parentName = name.rsplit("|", 1)[0]
+            self.depths[index] = name.count("|") - 1
+
+            #the parent of something might not be in the list if only part of the DAG was given
+            self.parents[index] = self.indices.get(parentName, -1)
+
+        #number of nodes in each node's subtree including itself, summed up into the parents one level at a time from the deepest level
+        self.subtreeSizes = np.ones(numNodes, dtype=np.int64)
+
+        for depth in range(int(self.depths.max()) if numNodes else 0, 0, -1):
+            level = np.nonzero((self.depths == depth) & (self.parents >= 0))[0]
+            np.add.at(self.subtreeSizes, self.parents[level], self.subtreeSizes[level])
+
+    def __len__(self):
+        return len(self.names)
+
+    """
+    Index of a node from its long name, short name or partial path, or None if it isn't in the index or the name is ambiguous
+    """
+    def indexOf(self, name):
+        if(name is None):
+            return None
+
+        if(name.startswith("|")):
+            return self.indices.get(name)
+
+        candidates = self.leafIndices.get(name.rsplit("|", 1)[-1], [])
+
+        if("|" in name):
+            candidates = [index for index in candidates if self.names[index].endswith("|" + name)]
+
+        return candidates[0] if len(candidates) == 1 else None
+
+    """
+    Whether the node at childIndex is somewhere below the node at parentIndex
+    """
+    def isDescendantIndex(self, childIndex, parentIndex):
+        return parentIndex < childIndex < parentIndex + self.subtreeSizes[parentIndex]
+
+    """
+    Returns whether or not a child is a descendant of a parent object, False if either isn't in the index
+    """
+    def isDescendant(self, child, parent):
+        childIndex = self.indexOf(child)
+        parentIndex = self.indexOf(parent)
+
+        if(childIndex is None or parentIndex is None):
+            return False
+
+        return self.isDescendantIndex(childIndex, parentIndex)
+
+    """
+    Long name of a node's parent or None if it has no parent in the index
+    """
+    def getParent(self, node):
+        index = self.indexOf(node)
+
+        if(index is None or self.parents[index] < 0):
+            return None
+
+        return self.names[self.parents[index]]
+
+    """
+    Indices from the child's parent up to but not including parentIndex, in order from end to root.
+    If the parent isn't an ancestor this runs all the way up to the top of the hierarchy.
+    """
+    def innerChainIndices(self, parentIndex, childIndex):
+        res = []
+        currIndex = self.parents[childIndex]
+
+        while currIndex >= 0 and currIndex != parentIndex:
+            res.append(int(currIndex))
+            currIndex = self.parents[currIndex]
+
+        return res
+
+    """
+    Long names between the root and end of a parent heirarchy in order from end to root, not including end and root.
+    None if either isn't in the index or the parent isn't an ancestor of the child.
+    """
+    def getInnerParentChain(self, parent, child):
+        parentIndex = self.indexOf(parent)
+        childIndex = self.indexOf(child)
+
+        if(parentIndex is None or childIndex is None or not self.isDescendantIndex(childIndex, parentIndex)):
+            return None
+
+        return [self.names[index] for index in self.innerChainIndices(parentIndex, childIndex)]
+
+    """
+    Long names between the root and end of a parent heirarchy in order from end to root, including end and root.
+    None if either isn't in the index or the parent isn't an ancestor of the child.
+    """
+    def getWholeParentChain(self, parent, child):
+        parentIndex = self.indexOf(parent)
+        childIndex = self.indexOf(child)
+
+        if(parentIndex is None or childIndex is None or not self.isDescendantIndex(childIndex, parentIndex)):
+            return None
+
+        return [self.names[childIndex]] + [self.names[index] for index in self.innerChainIndices(parentIndex, childIndex)] + [self.names[parentIndex]]
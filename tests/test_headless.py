@@ -0,0 +1,162 @@
+"""
+Coplanar joint orient tool 0.9.0
+Ilya Seletsky 2015
+
+TODO (known issues):
+-Preview plane size setting (Width and Height)
+-Handle when scene is closed while window open to reset things if possible
+-Make the preview plane creation somehow not contribute to the undo history if possible or find a different way to display a preview plane
+-Save settings between runs.
+-Fix window not shrinking properly when switching between plane modes.
+-Figure out what else crashes
+
+Stretch goals:
+-Joint preview.  Preview of how the joints will be oriented in real time without hitting apply button.
+-Interactive plane mode.  Move a plane around in real time
+-See if I can make UI more intuitive/self documenting and with a bunch of pretty pictures
+-Auto compute preview plane size and position based on selected joints.
+-Optimize UI change code to prevent unnecessary updates.  Not a real huge issue.
+-Redo UI with pyQt to make the UI be more versatile and resizeable and strings localizeable, etc...
+"""
+import numpy as np
+
+import CoplanarJointOrient.batchMathUtil
+import CoplanarJointOrient.chainSolver
+import CoplanarJointOrient.jointCoplanarizer
+import CoplanarJointOrient.skeletonGenerator
+import CoplanarJointOrient.skeletonIndex
+
+import CoplanarJointOrient.SceneBackend.CountingSceneBackend
+
+"""
+Checks for the parts of the tool that run without Maya, against the memory scene backend.
+"""
+
+FORWARD_AXIS = CoplanarJointOrient.batchMathUtil.Axis(axis=0)
+ROTATION_AXIS = CoplanarJointOrient.batchMathUtil.Axis(axis=2)
+
+"""
+Random walk of numJoints world positions that wanders off any one plane
+"""
+def randomChainPositions(numJoints, seed=0):
+    rand = np.random.RandomState(seed)
+    
+    return np.cumsum(rand.uniform(-1.0, 1.0, (numJoints, 3)) + [2.0, 0.0, 0.0], axis=0)
+
+def randomPlane(seed=0):
+    rand = np.random.RandomState(seed)
+    normal = rand.uniform(-1.0, 1.0, 3)
+    
+    return normal / np.linalg.norm(normal), rand.uniform(-1.0, 1.0)
+
+def assertSameSolution(solver, expected):
+    projected, rotations, oriented = expected
+    
+    np.testing.assert_allclose(solver.projected, projected, atol=1e-9)
+    np.testing.assert_allclose(solver.rotations, rotations, atol=1e-9)
+    np.testing.assert_array_equal(solver.oriented, oriented)
+
+def test_incrementalChainSolverMatchesSolveChain():
+    solveChain = CoplanarJointOrient.chainSolver.solveChain
+    positions = randomChainPositions(20)
+    normal, distance = randomPlane()
+    endAim = np.array([0.0, 1.0, 0.0])
+    
+    solver = CoplanarJointOrient.chainSolver.IncrementalChainSolver()
+    solver.solve(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim)
+    assertSameSolution(solver, solveChain(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim))
+    
+    #a few joints moving, including the end
+    positions = positions.copy()
+    positions[[0, 7, 19]] += [[0.5, -0.2, 0.3], [-0.1, 0.4, 0.2], [0.3, 0.3, -0.6]]
+    changed = solver.update(positions=positions)
+    assertSameSolution(solver, solveChain(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim))
+    np.testing.assert_array_equal(changed, [0, 6, 7, 18, 19])
+    
+    #the plane sliding along its normal
+    distance += 0.75
+    solver.update(planeDistance=distance)
+    assertSameSolution(solver, solveChain(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim))
+    
+    #the end aim turning
+    endAim = np.array([0.0, 0.0, 1.0])
+    solver.update(endAimDirection=endAim, endAimChanged=True)
+    assertSameSolution(solver, solveChain(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim))
+    
+    #a new normal solves everything again
+    normal, unusedDistance = randomPlane(1)
+    solver.update(planeNormal=normal)
+    assertSameSolution(solver, solveChain(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim))
+    
+    #moving joints directly
+    positions[[3, 4]] += 0.25
+    solver.moveJoints([3, 4], positions[[3, 4]])
+    assertSameSolution(solver, solveChain(positions, normal, distance, FORWARD_AXIS, ROTATION_AXIS, endAim))
+
+def test_fitPlaneKeepEndsPassesThroughEnds():
+    positions = randomChainPositions(12, seed=3)
+    normal, point = CoplanarJointOrient.chainSolver.fitPlane(positions, keepEnds=True)
+    
+    np.testing.assert_allclose(np.linalg.norm(normal), 1.0)
+    np.testing.assert_allclose((positions[[0, -1]] - point).dot(normal), 0.0, atol=1e-9)
+
+def test_skeletonIndexIntervals():
+    description = CoplanarJointOrient.skeletonGenerator.generateSkeleton(chainLength=6, branchingFactor=3, childrenPerJoint=2, numCharacters=2)
+    unusedBackend, longNames = CoplanarJointOrient.skeletonGenerator.buildMemorySkeleton(description)
+    index = CoplanarJointOrient.skeletonIndex.SkeletonIndex(longNames)
+    
+    for nodeIndex, name in enumerate(index.names):
+        subtreeEnd = nodeIndex + int(index.subtreeSizes[nodeIndex])
+        
+        for otherIndex, otherName in enumerate(index.names):
+            isUnder = otherName.startswith(name + "|")
+            
+            #a node's descendants are exactly the nodes right after it in its subtree interval
+            assert isUnder == (nodeIndex < otherIndex < subtreeEnd)
+            assert isUnder == index.isDescendantIndex(otherIndex, nodeIndex)
+            
+        parentIndex = int(index.parents[nodeIndex])
+        assert parentIndex == -1 or index.names[parentIndex] == name.rsplit("|", 1)[0]
+        
+    assert int(index.subtreeSizes.sum()) == sum(int(depth) + 1 for depth in index.depths)
+    
+    #chains between nodes that aren't ancestor and descendant don't exist
+    firstRoot, firstEnd = description.chains[0]
+    secondRoot, unusedEnd = description.chains[1]
+    assert index.getWholeParentChain(longNames[secondRoot], longNames[firstEnd]) is None
+    assert index.getInnerParentChain(longNames[secondRoot], longNames[firstEnd]) is None
+    
+    #chains run from the end up to the root
+    chain = index.getWholeParentChain(longNames[firstRoot], longNames[firstEnd])
+    assert chain[0] == longNames[firstEnd] and chain[-1] == longNames[firstRoot]
+    assert index.getInnerParentChain(longNames[firstRoot], longNames[firstEnd]) == chain[1:-1]
+
+def test_coplanarizeJointsOnMemoryBackend():
+    description = CoplanarJointOrient.skeletonGenerator.generateSkeleton(chainLength=8, branchingFactor=2, childrenPerJoint=2, numCharacters=2)
+    memoryBackend, longNames = CoplanarJointOrient.skeletonGenerator.buildMemorySkeleton(description)
+    backend = CoplanarJointOrient.SceneBackend.CountingSceneBackend.CountingSceneBackend(memoryBackend)
+    
+    chainRoot, chainEnd = description.chains[1]
+    chain = memoryBackend.getWholeParentChain(longNames[chainRoot], longNames[chainEnd])
+    normal, point = CoplanarJointOrient.chainSolver.fitPlane(memoryBackend.getWorldPositions(chain))
+    plane = (normal.tolist(), -float(normal.dot(point)))
+    
+    oldWorldMatrices = np.array(memoryBackend.getAllWorldMatrices())
+    written, unusedSkipped = CoplanarJointOrient.jointCoplanarizer.coplanarizeJoints(longNames[chainEnd], longNames[chainRoot], plane, backend=backend)
+    newWorldMatrices = np.array(memoryBackend.getAllWorldMatrices())
+    
+    assert written > 0
+    
+    #the chain lands on the plane and everything off the chain, its other children included, stays where it was in the world
+    chainIndices = memoryBackend.nodeIndices(chain)
+    np.testing.assert_allclose(newWorldMatrices[chainIndices, 3, :3].dot(normal) + plane[1], 0.0, atol=1e-6)
+    
+    offChain = np.setdiff1d(np.arange(len(longNames)), chainIndices)
+    np.testing.assert_allclose(newWorldMatrices[offChain], oldWorldMatrices[offChain], atol=1e-6)
+    
+    #running again on the fixed chain writes nothing
+    with backend.counting() as sceneCalls:
+        written, unusedSkipped = CoplanarJointOrient.jointCoplanarizer.coplanarizeJoints(longNames[chainEnd], longNames[chainRoot], plane, backend=backend)
+        
+    assert written == 0
+    assert sceneCalls.writes == 0
@@ -0,0 +1,112 @@
+from __future__ import absolute_import
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+
+import bisect
+
+import CoplanarJointOrient.mayaUtil
+
+"""
+Calls a function when any of a list of nodes moves, whether it was moved itself or one of its ancestors was.
+Callbacks are on the nodes themselves rather than their names so renames don't matter.
+
+Each watched node and each of its ancestors gets one callback, however many watched nodes are under it.  The watched nodes are kept in skeleton index order,
+where the watched nodes under any node are one contiguous run, so each callback only carries the start and end of its run.
+
+A drag or a whole chain moving at once sends a flood of dirty notifications.  Those are collected and handed over in one call once Maya goes idle,
+with the indices of the watched nodes that moved, so whoever is watching can recompute just what depends on those.
+"""
+class TransformWatcher(object):
+    def __init__(self, onChangeFunc):
+        #called with a sorted list of indices into the watched nodes
+        self.onChangeFunc = onChangeFunc
+
+        self.callbackIds = []
+
+        #indices into the watched nodes in skeleton index order, the runs the callbacks carry are slices of this
+        self.order = []
+
+        #(start, end) runs of order that moved since the last flush
+        self.pendingRanges = set()
+        self.flushScheduled = False
+
+    """
+    Starts watching a list of node names or NodeHandles, replacing anything watched before
+    """
+    def watch(self, nodes):
+        self.clear()
+
+        names = [CoplanarJointOrient.mayaUtil.getNodeName(node) for node in nodes]
+        index = CoplanarJointOrient.mayaUtil.getSkeletonIndexFor(*names)
+        positions = [index.indexOf(name) for name in names]
+
+        #every watched node is a transform so it's in the index unless it was deleted, and then there's nothing to watch
+        watched = sorted((position, nodeIndex) for nodeIndex, position in enumerate(positions) if position is not None)
+        sortedPositions = [position for position, unusedNodeIndex in watched]
+        self.order = [nodeIndex for unusedPosition, nodeIndex in watched]
+
+        #skeleton index positions of every node that already has a callback
+        visited = set()
+
+        for nodeIndex, dagPath in enumerate(CoplanarJointOrient.mayaUtil.getNodeDagPaths(nodes)):
+            position = positions[nodeIndex]
+
+            if(position is None):
+                continue
+
+            dagPath = om.MDagPath(dagPath)
+
+            #the ancestors above one that's already watched are watched too
+            while(dagPath.length() > 0 and position >= 0 and position not in visited):
+                visited.add(position)
+
+                #the watched nodes in this node's subtree
+                subtreeEnd = position + int(index.subtreeSizes[position])
+                watchedRange = (bisect.bisect_left(sortedPositions, position), bisect.bisect_left(sortedPositions, subtreeEnd))
+
+                self.callbackIds.append(om.MNodeMessage.addNodeDirtyPlugCallback(dagPath.node(), self.onNodeDirty, watchedRange))
+
+                dagPath.pop()
+                position = int(index.parents[position])
+
+    def clear(self):
+        for callbackId in self.callbackIds:
+            try:
+                om.MMessage.removeCallback(callbackId)
+            except RuntimeError:
+                #the node was deleted along with its callbacks
+                pass
+
+        self.callbackIds = []
+        self.order = []
+        self.pendingRanges.clear()
+
+    def onNodeDirty(self, unusedNode, unusedPlug, watchedRange):
+        self.pendingRanges.add(watchedRange)
+
+        if(not self.flushScheduled):
+            self.flushScheduled = True
+            cmds.evalDeferred(self.flush, lowestPriority=True)
+
+    def flush(self):
+        self.flushScheduled = False
+
+        #could have been cleared while waiting for idle
+        if(not self.pendingRanges):
+            return
+
+        changedIndices = []
+        coveredEnd = 0
+
+        #a moved node's descendants send their own runs nested inside its run, so only the part past what's already covered is added
+        for start, end in sorted(self.pendingRanges):
+            start = max(start, coveredEnd)
+
+            if(end > start):
+                changedIndices.extend(self.order[start:end])
+                coveredEnd = end
+
+        self.pendingRanges.clear()
+
+        self.onChangeFunc(sorted(changedIndices))
@@ -0,0 +1,77 @@
+import bisect
+
+"""
+Cache of world matrices keyed by position in the skeleton index, shared by everything that reads joint positions and orientations while handling one UI change.
+This only stores what it's given and keeps count of hits and misses.  Reading the scene and deciding when entries go stale is up to the caller,
+and so is clearing it whenever the skeleton index is rebuilt since the positions won't mean the same nodes anymore.
+
+A node's subtree is the interval of positions from the node up to its position plus its subtree size, so dropping everything under a node that moved
+only has to find where that interval starts and ends among the cached positions.
+"""
+
+class WorldTransformCache(object):
+    def __init__(self):
+        #skeleton index position to world matrix as a flat list of 16 values in internal units
+        self.matrices = {}
+
+        #the keys of matrices in sorted order
+        self.positions = []
+
+        #how many lookups were answered from the cache and how many had to go to the scene
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.matrices)
+
+    def __contains__(self, position):
+        return position in self.matrices
+
+    """
+    Cached world matrices for a list of positions, None for the ones that aren't cached or are None.  Counts a hit or miss for each position.
+    """
+    def lookup(self, positions):
+        res = [self.matrices.get(position) for position in positions]
+        numMisses = res.count(None)
+
+        self.misses += numMisses
+        self.hits += len(res) - numMisses
+
+        return res
+
+    def store(self, positions, matrices):
+        newPositions = sorted(set(position for position in positions if position not in self.matrices))
+        self.matrices.update(zip(positions, matrices))
+
+        if(newPositions):
+            #two sorted runs, which sort merges in one pass
+            self.positions.extend(newPositions)
+            self.positions.sort()
+
+    """
+    Drops every position in [start, end), which for a node's subtree interval is the node and everything under it since moving a node moves all of its descendants
+    """
+    def invalidate(self, start, end):
+        first = bisect.bisect_left(self.positions, start)
+        last = bisect.bisect_left(self.positions, end)
+
+        for position in self.positions[first:last]:
+            del self.matrices[position]
+
+        del self.positions[first:last]
+
+    def clear(self):
+        self.matrices.clear()
+        del self.positions[:]
+
+    def resetCounters(self):
+        self.hits = 0
+        self.misses = 0
+
+    """
+    Hit rate between 0 and 1, or None if nothing was looked up yet
+    """
+    def hitRate(self):
+        total = self.hits + self.misses
+
+        return float(self.hits) / total if total > 0 else None